@@ -0,0 +1,6 @@
+"""
+Benchmarks for Loula's SQLite Viewer
+
+Run from the repository root:
+    python -m benchmarks.run --rows 1000000 --output results.json
+"""
@@ -0,0 +1,158 @@
+"""
+Synthetic database generator for the benchmarks
+
+Rows are produced inside SQLite with a recursive CTE, a million per
+INSERT, so even 100M-row files are generated without building rows in
+Python. Values are derived from the row number, so two files generated
+with the same settings hold the same data.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+
+
+BENCH_TABLE = 'bench'
+GENERATE_BATCH_ROWS = 1000000
+INDEX_LAYOUTS = ('none', 'single', 'composite', 'all')
+
+
+def column_names(columns):
+    """Names of the generated value columns"""
+    return [f"c{i:03d}" for i in range(columns)]
+
+
+def _column_type(i):
+    return ('INTEGER', 'REAL', 'TEXT')[i % 3]
+
+
+def _column_expression(i, text_size):
+    """Deterministic value of column i for row number i"""
+    if _column_type(i) == 'INTEGER':
+        return f"(i * {2654435761 + i}) % 1000003"
+    if _column_type(i) == 'REAL':
+        return f"((i * {40503 + i}) % 100000) / 100.0"
+    return f"substr(printf('%d-%x-', i, (i * {69069 + i}) % 4294967296) || hex(zeroblob({text_size})), 1, {text_size})"
+
+
+def _index_statements(layout, names):
+    if layout == 'single' and names:
+        return [f"CREATE INDEX idx_{BENCH_TABLE}_{names[0]} ON {BENCH_TABLE} ({names[0]})"]
+    if layout == 'composite' and len(names) > 1:
+        return [f"CREATE INDEX idx_{BENCH_TABLE}_{names[0]}_{names[1]} ON {BENCH_TABLE} ({names[0]}, {names[1]})"]
+    if layout == 'all':
+        return [f"CREATE INDEX idx_{BENCH_TABLE}_{name} ON {BENCH_TABLE} ({name})" for name in names]
+    return []
+
+
+def generate_database(path, rows=100000, columns=10, text_size=32, blob_size=0, indexes='single',
+                      extra_tables=100, progress=None):
+    """Create a benchmark database at path, replacing any existing file
+
+    The 'bench' table has an INTEGER PRIMARY KEY, columns value columns
+    cycling INTEGER/REAL/TEXT (text_size characters), and a 'payload'
+    BLOB of blob_size bytes when blob_size > 0. extra_tables small
+    tables stress the table list. The settings are stored in a
+    'bench_meta' table. progress, if given, is called as
+    progress(rows_done, rows).
+    """
+    if indexes not in INDEX_LAYOUTS:
+        raise ValueError(f"unknown index layout '{indexes}'")
+    settings = {'rows': rows, 'columns': columns, 'text_size': text_size, 'blob_size': blob_size,
+                'indexes': indexes, 'extra_tables': extra_tables}
+    for suffix in ('', '-journal', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    names = column_names(columns)
+    definitions = [f"{name} {_column_type(i)}" for i, name in enumerate(names)]
+    expressions = [_column_expression(i, text_size) for i in range(columns)]
+    if blob_size > 0:
+        definitions.append("payload BLOB")
+        expressions.append(f"zeroblob({int(blob_size)})")
+
+    connection = sqlite3.connect(path, isolation_level=None)
+    try:
+        # A throwaway file: no journal, no fsync
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+        connection.execute(f"CREATE TABLE {BENCH_TABLE} (id INTEGER PRIMARY KEY, {', '.join(definitions)})")
+        insert = (f"WITH RECURSIVE n(i) AS (SELECT ? UNION ALL SELECT i + 1 FROM n WHERE i < ?) "
+                  f"INSERT INTO {BENCH_TABLE} SELECT i, {', '.join(expressions)} FROM n")
+        done = 0
+        while done < rows:
+            end = min(rows, done + GENERATE_BATCH_ROWS)
+            connection.execute("BEGIN")
+            connection.execute(insert, (done + 1, end))
+            connection.execute("COMMIT")
+            done = end
+            if progress:
+                progress(done, rows)
+        for sql in _index_statements(indexes, names):
+            connection.execute(sql)
+
+        connection.execute("BEGIN")
+        for number in range(extra_tables):
+            connection.execute(f"CREATE TABLE extra_{number:05d} (id INTEGER PRIMARY KEY, name TEXT, value REAL)")
+        connection.execute("COMMIT")
+        connection.execute("CREATE TABLE bench_meta (settings TEXT)")
+        connection.execute("INSERT INTO bench_meta VALUES (?)", (json.dumps(settings, sort_keys=True),))
+    finally:
+        connection.close()
+    return settings
+
+
+def read_settings(path):
+    """Settings a benchmark database was generated with, or None"""
+    if not os.path.exists(path):
+        return None
+    try:
+        connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            row = connection.execute("SELECT settings FROM bench_meta").fetchone()
+        finally:
+            connection.close()
+    except sqlite3.Error:
+        return None
+    return json.loads(row[0]) if row else None
+
+
+def add_generate_arguments(parser):
+    """Add the database shape options shared by generate and run"""
+    parser.add_argument('--rows', type=int, default=100000, help="rows in the bench table (up to 100M)")
+    parser.add_argument('--columns', type=int, default=10, help="value columns in the bench table")
+    parser.add_argument('--text-size', type=int, default=32, help="characters per TEXT value")
+    parser.add_argument('--blob-size', type=int, default=0, help="bytes per BLOB value (0 for no BLOB column)")
+    parser.add_argument('--indexes', choices=INDEX_LAYOUTS, default='single', help="index layout")
+    parser.add_argument('--extra-tables', type=int, default=100, help="small tables added for table listing")
+
+
+def settings_from_arguments(args):
+    return {'rows': args.rows, 'columns': args.columns, 'text_size': args.text_size,
+            'blob_size': args.blob_size, 'indexes': args.indexes, 'extra_tables': args.extra_tables}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic benchmark database")
+    parser.add_argument('path', help="database file to create (replaced if it exists)")
+    add_generate_arguments(parser)
+    args = parser.parse_args(argv)
+
+    def report(done, total):
+        print(f"\r  {done:,}/{total:,} rows", end="", flush=True)
+
+    started_at = time.perf_counter()
+    try:
+        generate_database(args.path, progress=report, **settings_from_arguments(args))
+    except (sqlite3.Error, ValueError, OSError) as e:
+        print(f"\nError: {e}")
+        return 1
+    print(f"\nGenerated {args.path} in {time.perf_counter() - started_at:.1f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,336 @@
+"""
+Benchmark runner for Loula's SQLite Viewer
+
+Times the viewer's hot paths headlessly against a generated database:
+table listing, page fetches at the start, middle and end of a table,
+sorted pages, page formatting, large results through execute_sql and
+stream_sql, and export/import throughput. Each benchmark is timed over
+several runs plus one run under tracemalloc for its peak memory, and
+the results are written to a JSON file that later runs can be compared
+against:
+
+    python -m benchmarks.run --rows 1000000 --output baseline.json
+    python -m benchmarks.run --rows 1000000 --compare baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.generate import BENCH_TABLE, add_generate_arguments, column_names, generate_database, \
+    read_settings, settings_from_arguments
+from src.database.database import DatabaseManager
+from src.database.row_source import parse_filter, parse_sort
+from src.tools.exporter import DataExporter
+from src.tools.importer import DataImporter
+from src.ui.ui_utils import UIUtils
+
+
+PAGE_ROWS = 40
+VISIBLE_COLUMNS = 8
+SCROLL_PAGES = 50
+SCREEN_WIDTH = 200
+
+BENCHMARKS = []
+
+
+def benchmark(name):
+    """Register a benchmark
+
+    The decorated function does the untimed setup and returns the timed
+    part as a callable, which returns the number of rows it handled.
+    """
+    def register(setup):
+        BENCHMARKS.append((name, setup))
+        return setup
+    return register
+
+
+class BenchContext:
+    """Shared state for one benchmark run"""
+
+    def __init__(self, db_path, settings, result_rows, workdir):
+        self.db_path = db_path
+        self.settings = settings
+        self.result_rows = result_rows
+        self.workdir = workdir
+        self.db = DatabaseManager()
+        if not self.db.connect(db_path, 'bench'):
+            raise RuntimeError(f"cannot open {db_path}")
+        self.ui = UIUtils(self.db, None)
+        self.columns = ['id'] + column_names(settings['columns'])
+        self.visible = self.columns[:VISIBLE_COLUMNS]
+        self.csv_path = os.path.join(workdir, 'bench.csv')
+        self._scratch = None
+
+    def row_source(self, filters=None, sort=None):
+        row_source = self.db.get_row_source(BENCH_TABLE, PAGE_ROWS, columns=self.visible, preview_length=40)
+        row_source.set_query(filters, sort)
+        return row_source
+
+    def scratch_db(self):
+        """A database in the work directory for benchmarks that write, keeping the benchmark file unchanged"""
+        if self._scratch is None:
+            self._scratch = DatabaseManager()
+            if not self._scratch.connect(os.path.join(self.workdir, 'scratch.db'), 'scratch'):
+                raise RuntimeError("cannot open the scratch database")
+        return self._scratch
+
+    def close(self):
+        self.db.disconnect()
+        if self._scratch is not None:
+            self._scratch.disconnect()
+
+
+@benchmark('connect')
+def bench_connect(ctx):
+    db = DatabaseManager()
+
+    def run():
+        db.connect(ctx.db_path, 'bench')
+        db.disconnect()
+        return 0
+    return run
+
+
+@benchmark('table_list')
+def bench_table_list(ctx):
+    ctx.db.catalog.clear()
+    return lambda: len(ctx.db.get_tables())
+
+
+@benchmark('table_filter')
+def bench_table_filter(ctx):
+    ctx.db.get_tables()
+    return lambda: len(ctx.db.get_tables('extra_000'))
+
+
+@benchmark('page_first')
+def bench_page_first(ctx):
+    row_source = ctx.row_source()
+    return lambda: len(row_source.get_page(0))
+
+
+@benchmark('page_middle')
+def bench_page_middle(ctx):
+    # A key filter is how the browser jumps into a table
+    middle = parse_filter(f"id >= {max(1, ctx.settings['rows'] // 2)}", ctx.columns)
+    row_source = ctx.row_source(filters=[middle])
+    return lambda: len(row_source.get_page(0))
+
+
+@benchmark('page_end')
+def bench_page_end(ctx):
+    end = parse_filter(f"id >= {max(1, ctx.settings['rows'] - PAGE_ROWS + 1)}", ctx.columns)
+    row_source = ctx.row_source(filters=[end])
+    return lambda: len(row_source.get_page(0))
+
+
+@benchmark('page_scroll')
+def bench_page_scroll(ctx):
+    row_source = ctx.row_source()
+    return lambda: sum(len(row_source.get_page(page)) for page in range(SCROLL_PAGES))
+
+
+@benchmark('page_sorted_indexed')
+def bench_page_sorted_indexed(ctx):
+    row_source = ctx.row_source(sort=parse_sort(ctx.columns[1], ctx.columns))
+    return lambda: len(row_source.get_page(0))
+
+
+@benchmark('page_sorted_unindexed')
+def bench_page_sorted_unindexed(ctx):
+    row_source = ctx.row_source(sort=parse_sort(ctx.columns[-1], ctx.columns))
+    return lambda: len(row_source.get_page(0))
+
+
+@benchmark('format_page')
+def bench_format_page(ctx):
+    page = ctx.row_source().get_page(0)
+    schema = [col for col in ctx.db.get_table_schema(BENCH_TABLE) if col[1] in ctx.visible]
+    ctx.ui.table_formatter.clear()
+    return lambda: len(ctx.ui.format_table_data(page, schema, SCREEN_WIDTH)[1])
+
+
+@benchmark('execute_sql_large')
+def bench_execute_sql(ctx):
+    sql = f"SELECT * FROM {BENCH_TABLE} LIMIT {ctx.result_rows}"
+    return lambda: len(ctx.db.execute_sql(sql))
+
+
+@benchmark('stream_sql_large')
+def bench_stream_sql(ctx):
+    sql = f"SELECT * FROM {BENCH_TABLE} LIMIT {ctx.result_rows}"
+
+    def run():
+        stream = ctx.db.stream_sql(sql)
+        rows = sum(1 for _ in stream)
+        stream.close()
+        return rows
+    return run
+
+
+@benchmark('export_csv')
+def bench_export(ctx):
+    exporter = DataExporter(ctx.db)
+    sql = f"SELECT * FROM {BENCH_TABLE} LIMIT ?"
+    return lambda: exporter.export_query(sql, ctx.csv_path, params=[ctx.result_rows], file_format='csv')['rows']
+
+
+@benchmark('import_csv')
+def bench_import(ctx):
+    if not os.path.exists(ctx.csv_path):
+        DataExporter(ctx.db).export_query(f"SELECT * FROM {BENCH_TABLE} LIMIT ?", ctx.csv_path,
+                                          params=[ctx.result_rows], file_format='csv')
+    scratch = ctx.scratch_db()
+    scratch.execute_sql("DROP TABLE IF EXISTS bench_import")
+    importer = DataImporter(scratch)
+    return lambda: importer.import_file(ctx.csv_path, 'bench_import', file_format='csv', fast=True)['rows']
+
+
+def measure(ctx, setup, repeat):
+    """Time a benchmark repeat times, then once more under tracemalloc"""
+    timings = []
+    rows = 0
+    for _ in range(repeat):
+        run = setup(ctx)
+        started_at = time.perf_counter()
+        rows = run()
+        timings.append(time.perf_counter() - started_at)
+
+    run = setup(ctx)
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        'seconds': statistics.median(timings),
+        'min_seconds': min(timings),
+        'rows': rows,
+        'peak_bytes': peak,
+    }
+
+
+def run_benchmarks(ctx, repeat, names=None, progress=None):
+    """Run the registered benchmarks (or the named ones), returning {name: result}"""
+    results = {}
+    for name, setup in BENCHMARKS:
+        if names and name not in names:
+            continue
+        try:
+            results[name] = measure(ctx, setup, repeat)
+        except (sqlite3.Error, OSError, ValueError, TypeError) as e:
+            results[name] = {'error': f"Error: {e}"}
+        if progress:
+            progress(name, results[name])
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Compare results with a baseline; returns (lines, regressions)
+
+    A benchmark regresses when its median time grew by more than
+    threshold (a fraction) and by at least a millisecond.
+    """
+    lines = []
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base or 'seconds' not in base or 'seconds' not in result:
+            lines.append(f"{name:24} (no baseline)")
+            continue
+        change = (result['seconds'] - base['seconds']) / base['seconds'] if base['seconds'] > 0 else 0.0
+        memory = result['peak_bytes'] - base.get('peak_bytes', 0)
+        marker = ""
+        if change > threshold and result['seconds'] - base['seconds'] > 0.001:
+            marker = "  REGRESSION"
+            regressions.append(name)
+        lines.append(f"{name:24} {base['seconds'] * 1000:10.2f} ms -> {result['seconds'] * 1000:10.2f} ms "
+                     f"({change:+.0%}), peak memory {memory / 1024:+,.0f} KB{marker}")
+    return lines, regressions
+
+
+def format_result(name, result):
+    if 'error' in result:
+        return f"{name:24} {result['error']}"
+    rate = result['rows'] / result['seconds'] if result['seconds'] > 0 and result['rows'] else 0
+    rate_text = f", {rate:,.0f} rows/sec" if rate else ""
+    return (f"{name:24} {result['seconds'] * 1000:10.2f} ms (min {result['min_seconds'] * 1000:.2f}), "
+            f"peak {result['peak_bytes'] / 1024:,.0f} KB{rate_text}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the viewer's hot paths")
+    add_generate_arguments(parser)
+    parser.add_argument('--db', default=os.path.join(tempfile.gettempdir(), 'loula_bench.db'),
+                        help="benchmark database (generated when missing or built with other settings)")
+    parser.add_argument('--regenerate', action='store_true', help="generate the database even if it matches")
+    parser.add_argument('--result-rows', type=int, default=100000, help="rows for result, export and import runs")
+    parser.add_argument('--repeat', type=int, default=5, help="timed runs per benchmark")
+    parser.add_argument('--only', nargs='+', metavar='NAME', help="benchmarks to run")
+    parser.add_argument('--output', help="write results to this JSON file")
+    parser.add_argument('--compare', metavar='BASELINE', help="compare with a previous JSON result")
+    parser.add_argument('--threshold', type=float, default=0.10, help="slowdown counted as a regression")
+    args = parser.parse_args(argv)
+
+    settings = settings_from_arguments(args)
+    if args.regenerate or read_settings(args.db) != settings:
+        print(f"Generating {args.db} ({args.rows:,} rows)...")
+
+        def report(done, total):
+            print(f"\r  {done:,}/{total:,} rows", end="", flush=True)
+
+        generate_database(args.db, progress=report, **settings)
+        print()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        ctx = BenchContext(args.db, settings, min(args.result_rows, args.rows), workdir)
+        try:
+            results = run_benchmarks(ctx, max(1, args.repeat), args.only,
+                                     progress=lambda name, result: print(format_result(name, result)))
+        finally:
+            ctx.close()
+
+    report = {
+        'meta': {
+            'time': time.time(),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'settings': settings,
+            'result_rows': min(args.result_rows, args.rows),
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('meta', {}).get('settings') != settings:
+            print("Note: the baseline was recorded with different database settings")
+        lines, regressions = compare(results, baseline.get('results', {}), args.threshold)
+        print(f"Compared with {args.compare}:")
+        for line in lines:
+            print(f"  {line}")
+        if regressions:
+            print(f"{len(regressions)} regressions: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -97,9 +97,8 @@ def create_executable():
         cmd.remove("--noconsole")
 
     # Add data files
+    # The configuration lives in the user's config directory, so none is bundled
     data_files = []
-    if os.path.exists("db_config.json"):
-        data_files.append(("db_config.json", "."))
     if os.path.exists("README.md"):
         data_files.append(("README.md", "."))
     if os.path.exists("LICENSE"):
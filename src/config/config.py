@@ -2,41 +2,113 @@
 Configuration management for Loula's SQLite Viewer
 """
 
+import hashlib
 import json
 import os
+from .history import QueryHistory, read_history_file
+from .store import CONFIG_DB_NAME, ConfigStore, default_config_dir
+
+
+# Built-in connection profiles, see src/database/connection.py for the settings
+CONNECTION_PROFILES = {
+    # Browse without ever taking write locks: read-only URI, memory-mapped I/O
+    'inspect': {
+        'read_only': True,
+        'query_only': True,
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64 * 1024,
+        'temp_store': 'memory',
+        'busy_timeout': 5000,
+    },
+    # For snapshots nobody writes to: no locking or change detection at all
+    'immutable': {
+        'immutable': True,
+        'query_only': True,
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64 * 1024,
+        'temp_store': 'memory',
+    },
+    # Editing with the same caching, waiting for other writers
+    'readwrite': {
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64 * 1024,
+        'temp_store': 'memory',
+        'busy_timeout': 5000,
+    },
+    # Editing, switching the database to write-ahead logging
+    'wal': {
+        'journal_mode': 'wal',
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64 * 1024,
+        'temp_store': 'memory',
+        'busy_timeout': 5000,
+    },
+    # Plain sqlite3.connect() with SQLite defaults
+    'default': {},
+}
+
+DEFAULT_PROFILE = 'inspect'
+
+# Written by earlier versions to the current directory; imported once into the store
+LEGACY_CONFIG_FILE = 'db_config.json'
+LEGACY_HISTORY_FILE = 'query_history.jsonl'
 
 
 class ConfigManager:
-    """Manages application configuration and saved databases"""
+    """Manages application configuration and saved databases
 
-    def __init__(self, config_file='db_config.json'):
-        self.config_file = config_file
+    Everything, including the query history, is kept in a ConfigStore in
+    the per-user configuration directory, next to the search indexes.
+    """
+
+    def __init__(self, config_dir=None):
+        self.config_dir = config_dir or default_config_dir()
+        self.store = ConfigStore(os.path.join(self.config_dir, CONFIG_DB_NAME))
+        if self.store.is_empty():
+            self.import_legacy_config()
         self.saved_databases = []
         self.last_connected = None
+        self.default_profile = DEFAULT_PROFILE
+        self.custom_profiles = {}
         self.load_config()
+        self.history = QueryHistory(self.store)
 
     def load_config(self):
-        """Load configuration from file"""
-        if os.path.exists(self.config_file):
-            try:
-                with open(self.config_file, 'r') as f:
-                    config = json.load(f)
-                    self.saved_databases = config.get('saved_databases', [])
-                    self.last_connected = config.get('last_connected')
-            except json.JSONDecodeError:
-                pass
+        """Load configuration from the store"""
+        self.saved_databases = self.store.get_saved_databases()
+        self.last_connected = self.store.get('last_connected')
+        self.default_profile = self.store.get('default_profile', DEFAULT_PROFILE)
+        self.custom_profiles = self.store.get('connection_profiles', {})
 
     def save_config(self):
-        """Save configuration to file"""
-        config = {
-            'saved_databases': self.saved_databases,
-            'last_connected': self.last_connected
-        }
+        """Save all settings to the store"""
+        self.store.set('last_connected', self.last_connected)
+        self.store.set('default_profile', self.default_profile if self.default_profile != DEFAULT_PROFILE else None)
+        self.store.set('connection_profiles', self.custom_profiles or None)
+        for db_info in self.saved_databases:
+            self.store.update_database(db_info)
+
+    def import_legacy_config(self, legacy_file=LEGACY_CONFIG_FILE):
+        """Import db_config.json (and its query history) from the current directory"""
+        if not os.path.exists(legacy_file):
+            return False
         try:
-            with open(self.config_file, 'w') as f:
-                json.dump(config, f, indent=2)
-        except IOError:
-            pass
+            with open(legacy_file, 'r') as f:
+                config = json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return False
+        for db_info in config.get('saved_databases', []):
+            if db_info.get('path'):
+                self.store.save_database(db_info)
+        self.store.set('last_connected', config.get('last_connected'))
+        self.store.set('default_profile', config.get('default_profile'))
+        self.store.set('connection_profiles', config.get('connection_profiles'))
+        self.store.set('imported_from', os.path.abspath(legacy_file))
+
+        legacy_history = os.path.join(os.path.dirname(legacy_file), LEGACY_HISTORY_FILE)
+        if os.path.exists(legacy_history):
+            self.store.add_history(read_history_file(legacy_history))
+        return True
 
     def add_saved_database(self, db_info):
         """Add a database to saved databases"""
@@ -44,13 +116,13 @@ class ConfigManager:
         self.saved_databases = [db for db in self.saved_databases
                                if db['path'] != db_info['path']]
         self.saved_databases.append(db_info)
-        self.save_config()
+        self.store.save_database(db_info)
 
     def remove_saved_database(self, db_path):
         """Remove a database from saved databases"""
         self.saved_databases = [db for db in self.saved_databases
                                if db['path'] != db_path]
-        self.save_config()
+        self.store.remove_database(db_path)
 
     def get_saved_databases(self):
         """Get list of saved databases"""
@@ -59,8 +131,59 @@ class ConfigManager:
     def set_last_connected(self, db_info):
         """Set the last connected database"""
         self.last_connected = db_info
-        self.save_config()
+        self.store.set('last_connected', db_info)
 
     def get_last_connected(self):
         """Get the last connected database"""
         return self.last_connected
+
+    def get_profile_names(self):
+        """Get names of built-in and custom connection profiles"""
+        names = list(CONNECTION_PROFILES)
+        names.extend(name for name in self.custom_profiles if name not in names)
+        return names
+
+    def get_profile_settings(self, name):
+        """Get the settings of a connection profile by name"""
+        if name in self.custom_profiles:
+            return dict(self.custom_profiles[name])
+        if name in CONNECTION_PROFILES:
+            return dict(CONNECTION_PROFILES[name])
+        return dict(CONNECTION_PROFILES[DEFAULT_PROFILE])
+
+    def get_database_profile_name(self, db_info):
+        """Get the profile name used for a saved database"""
+        for db in self.saved_databases:
+            if db['path'] == db_info.get('path') and db.get('profile'):
+                return db['profile']
+        return db_info.get('profile') or self.default_profile
+
+    def get_connection_profile(self, db_info):
+        """Get the connection settings to open a saved database with"""
+        return self.get_profile_settings(self.get_database_profile_name(db_info))
+
+    def set_database_profile(self, db_path, profile_name):
+        """Set the connection profile of a saved database"""
+        for db in self.saved_databases:
+            if db['path'] == db_path:
+                db['profile'] = profile_name
+                self.store.update_database(db)
+        if self.last_connected and self.last_connected.get('path') == db_path:
+            self.last_connected['profile'] = profile_name
+            self.store.set('last_connected', self.last_connected)
+
+    def get_search_index_path(self, db_path):
+        """Get the sidecar file holding the full-text search index of a database"""
+        db_path = os.path.abspath(db_path)
+        digest = hashlib.sha1(db_path.encode('utf-8')).hexdigest()[:12]
+        name = os.path.splitext(os.path.basename(db_path))[0]
+        return os.path.join(self.config_dir, 'search_index', f"{name}-{digest}.db")
+
+    def get_session(self, db_path):
+        """Get the browser session state saved for a database"""
+        return self.store.get_session(db_path) if db_path else {}
+
+    def save_session(self, db_path, state):
+        """Save the browser session state of a database"""
+        if db_path and db_path != ':memory:':
+            self.store.save_session(db_path, state)
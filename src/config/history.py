@@ -0,0 +1,69 @@
+"""
+Query history for Loula's SQLite Viewer
+"""
+
+import json
+import time
+
+
+def read_history_file(history_file):
+    """Entries of a query_history.jsonl file written by earlier versions"""
+    entries = []
+    try:
+        with open(history_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(entry, dict) and entry.get('sql'):
+                    entries.append(entry)
+    except IOError:
+        pass
+    return entries
+
+
+class QueryHistory:
+    """Persistent list of executed SQL statements
+
+    Entries are rows of the ConfigStore's history table, so recording a
+    query never rewrites the whole history.
+    """
+
+    def __init__(self, store, max_entries=500):
+        self.store = store
+        self.max_entries = max_entries
+        self.entries = []
+        self.load_history()
+
+    def load_history(self):
+        """Load the most recent entries, dropping older ones from the store"""
+        self.store.trim_history(self.max_entries)
+        self.entries = self.store.get_history(self.max_entries)
+
+    def add(self, sql, db_path=None):
+        """Record an executed statement (consecutive duplicates are skipped)"""
+        sql = sql.strip()
+        if not sql:
+            return
+        if self.entries and self.entries[-1].get('sql') == sql and self.entries[-1].get('db') == db_path:
+            return
+        entry = {'sql': sql, 'db': db_path, 'time': time.time()}
+        self.entries.append(entry)
+        if len(self.entries) > self.max_entries:
+            del self.entries[:-self.max_entries]
+        self.store.add_history([entry])
+
+    def get_statements(self, db_path=None):
+        """Get distinct statements, oldest first, optionally for one database"""
+        seen = set()
+        statements = []
+        for entry in reversed(self.entries):
+            if db_path is not None and entry.get('db') not in (db_path, None):
+                continue
+            sql = entry.get('sql')
+            if sql and sql not in seen:
+                seen.add(sql)
+                statements.append(sql)
+        statements.reverse()
+        return statements
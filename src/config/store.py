@@ -0,0 +1,170 @@
+"""
+Configuration store for Loula's SQLite Viewer
+
+Settings, saved databases, the query history and per-database session
+state live in a small SQLite file in the user's configuration directory. Every change
+is a single-row write in its own transaction, so saving never rewrites
+the whole configuration and an interrupted write cannot corrupt it;
+several viewers running at once update their own rows.
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import time
+
+
+CONFIG_DB_NAME = 'config.db'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS saved_databases (path TEXT PRIMARY KEY, info TEXT, position INTEGER);
+CREATE TABLE IF NOT EXISTS sessions (path TEXT PRIMARY KEY, state TEXT, updated REAL);
+CREATE TABLE IF NOT EXISTS history (id INTEGER PRIMARY KEY, sql TEXT, db TEXT, time REAL);
+"""
+
+
+def default_config_dir():
+    """Per-user configuration directory (LOULA_CONFIG_DIR overrides it)"""
+    override = os.environ.get('LOULA_CONFIG_DIR')
+    if override:
+        return override
+    home = os.path.expanduser('~')
+    if os.name == 'nt':
+        base = os.environ.get('APPDATA') or home
+        return os.path.join(base, 'LoulaSQLiteViewer')
+    if sys.platform == 'darwin':
+        return os.path.join(home, 'Library', 'Application Support', 'LoulaSQLiteViewer')
+    base = os.environ.get('XDG_CONFIG_HOME') or os.path.join(home, '.config')
+    return os.path.join(base, 'loula-sqlite-viewer')
+
+
+class ConfigStore:
+    """Key/value settings, saved databases, query history and session state in SQLite
+
+    Values are stored as JSON. If the file cannot be created (e.g. a
+    read-only home directory) the store falls back to memory, so the
+    viewer still works without persisting anything.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = self._open(path)
+
+    @staticmethod
+    def _open(path):
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            connection = sqlite3.connect(path, timeout=5.0, isolation_level=None)
+            connection.executescript(_SCHEMA)
+            return connection
+        except (sqlite3.Error, OSError):
+            connection = sqlite3.connect(':memory:', isolation_level=None)
+            connection.executescript(_SCHEMA)
+            return connection
+
+    def is_empty(self):
+        """Check whether nothing was ever saved (a new store)"""
+        try:
+            return not (self.connection.execute("SELECT 1 FROM settings LIMIT 1").fetchone()
+                        or self.connection.execute("SELECT 1 FROM saved_databases LIMIT 1").fetchone())
+        except sqlite3.Error:
+            return False
+
+    def get(self, key, default=None):
+        """Get a setting"""
+        try:
+            row = self.connection.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error:
+            return default
+        return json.loads(row[0]) if row else default
+
+    def set(self, key, value):
+        """Save a setting; None removes it"""
+        try:
+            if value is None:
+                self.connection.execute("DELETE FROM settings WHERE key = ?", (key,))
+            else:
+                self.connection.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                                        (key, json.dumps(value)))
+        except sqlite3.Error:
+            pass
+
+    def get_saved_databases(self):
+        """Saved databases in the order they were last added"""
+        try:
+            rows = self.connection.execute("SELECT info FROM saved_databases ORDER BY position").fetchall()
+        except sqlite3.Error:
+            return []
+        return [json.loads(info) for info, in rows]
+
+    def save_database(self, db_info):
+        """Add or update a saved database, moving it to the end of the list"""
+        try:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO saved_databases (path, info, position) "
+                "VALUES (?, ?, (SELECT COALESCE(MAX(position), 0) + 1 FROM saved_databases))",
+                (db_info['path'], json.dumps(db_info)))
+        except sqlite3.Error:
+            pass
+
+    def update_database(self, db_info):
+        """Update a saved database in place"""
+        try:
+            self.connection.execute("UPDATE saved_databases SET info = ? WHERE path = ?",
+                                    (json.dumps(db_info), db_info['path']))
+        except sqlite3.Error:
+            pass
+
+    def remove_database(self, db_path):
+        """Forget a saved database"""
+        try:
+            self.connection.execute("DELETE FROM saved_databases WHERE path = ?", (db_path,))
+        except sqlite3.Error:
+            pass
+
+    def get_session(self, db_path):
+        """Session state saved for a database file, or an empty dict"""
+        try:
+            row = self.connection.execute("SELECT state FROM sessions WHERE path = ?",
+                                          (os.path.abspath(db_path),)).fetchone()
+        except sqlite3.Error:
+            return {}
+        return json.loads(row[0]) if row else {}
+
+    def save_session(self, db_path, state):
+        """Replace the session state of a database file"""
+        try:
+            self.connection.execute("INSERT OR REPLACE INTO sessions (path, state, updated) VALUES (?, ?, ?)",
+                                    (os.path.abspath(db_path), json.dumps(state), time.time()))
+        except (sqlite3.Error, TypeError, ValueError):
+            pass
+
+    def get_history(self, limit):
+        """The last limit history entries, oldest first"""
+        try:
+            rows = self.connection.execute("SELECT sql, db, time FROM history ORDER BY id DESC LIMIT ?",
+                                           (limit,)).fetchall()
+        except sqlite3.Error:
+            return []
+        return [{'sql': sql, 'db': db, 'time': when} for sql, db, when in reversed(rows)]
+
+    def add_history(self, entries):
+        """Append history entries ({'sql', 'db', 'time'} dicts)"""
+        try:
+            self.connection.executemany("INSERT INTO history (sql, db, time) VALUES (?, ?, ?)",
+                                        [(entry.get('sql'), entry.get('db'), entry.get('time'))
+                                         for entry in entries])
+        except sqlite3.Error:
+            pass
+
+    def trim_history(self, keep):
+        """Delete all but the last keep history entries"""
+        try:
+            self.connection.execute("DELETE FROM history WHERE id <= (SELECT MAX(id) FROM history) - ?", (keep,))
+        except sqlite3.Error:
+            pass
+
+    def close(self):
+        self.connection.close()
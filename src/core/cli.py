@@ -3,9 +3,14 @@ Command Line Interface for Loula's SQLite Viewer
 """
 
 import cmd
+import os
 import shlex
+import sqlite3
+import time
 import readline
-from src.database.database import DatabaseManager
+from src.database.database import DatabaseManager, ResultStream
+from src.database.profiler import format_plan
+from src.database.stats import format_size
 from src.config.config import ConfigManager
 
 # Fix for Python 3.13 on Windows: set readline.backend to avoid AttributeError
@@ -13,7 +18,11 @@ readline.backend = 'readline'
 
 
 class SQLiteCLI(cmd.Cmd):
-    """Command Line Interface for SQLite database management"""
+    """Command Line Interface for SQLite database management
+
+    Tool modules are imported by the commands that use them, so starting
+    the CLI for one command does not load every tool.
+    """
 
     intro = "Welcome to Loula's SQLite Viewer CLI. Type 'help' for commands."
     prompt = 'sqlite> '
@@ -22,32 +31,84 @@ class SQLiteCLI(cmd.Cmd):
         super().__init__()
         self.db = DatabaseManager()
         self.config = ConfigManager()
+        self.timer = False
 
         # Load last connected database
         last_db = self.config.get_last_connected()
         if last_db:
-            self.db.connect(last_db['path'], last_db['name'])
+            # Opened on a worker thread; the first command waits for it
+            self.db.connect_in_background(last_db['path'], last_db['name'],
+                                          self.config.get_connection_profile(last_db))
+
+    def precmd(self, line):
+        """Finish the startup reconnect before running a command that may need it"""
+        pending = self.db.pending_connect
+        if pending is not None and line.split(None, 1)[:1] not in (['quit'], ['help']):
+            if not pending.is_done():
+                print(f"Waiting for {pending.db_name} to open...")
+            pending.wait()
+            if pending.error:
+                print(pending.error)
+            self.db.pending_connect = None
+        return line
 
     def do_connect(self, arg):
-        """Connect to a SQLite database: connect <path> <name>"""
+        """Connect to a SQLite database: connect <path> <name> [profile]"""
         try:
             args = shlex.split(arg)
-            if len(args) != 2:
-                print("Usage: connect <path> <name>")
+            if len(args) not in (2, 3):
+                print("Usage: connect <path> <name> [profile]")
                 return
-            path, name = args
-            if not self.db.connect(path, name):
+            path, name = args[:2]
+            db_info = {'path': path, 'name': name, 'color': 3}
+            if len(args) == 3:
+                profile_name = args[2]
+                if profile_name not in self.config.get_profile_names():
+                    print(f"Unknown profile '{profile_name}'. Available: {', '.join(self.config.get_profile_names())}")
+                    return
+            elif not os.path.exists(path):
+                # A new database file can only be created by a writable connection
+                profile_name = 'readwrite'
+            else:
+                profile_name = self.config.get_database_profile_name(db_info)
+            db_info['profile'] = profile_name
+
+            if not self.db.connect(path, name, self.config.get_profile_settings(profile_name)):
                 return
 
             # Save to config
-            db_info = {'path': path, 'name': name, 'color': 3}
             self.config.add_saved_database(db_info)
             self.config.set_last_connected(db_info)
-            print(f"Connected to database: {name}")
+            print(f"Connected to database: {name} (profile: {profile_name})")
 
         except ValueError:
             print("Invalid arguments.")
 
+    def do_profile(self, arg):
+        """Show or change the connection profile of the current database: profile [name]"""
+        names = self.config.get_profile_names()
+        if not arg.strip():
+            if self.db.db_path:
+                current = self.config.get_database_profile_name({'path': self.db.db_path})
+                print(f"Current profile: {current}")
+            for name in names:
+                print(f"  {name}: {self.config.get_profile_settings(name)}")
+            return
+
+        profile_name = arg.strip()
+        if profile_name not in names:
+            print(f"Unknown profile '{profile_name}'. Available: {', '.join(names)}")
+            return
+        if not self.db.db_path:
+            print("No database connected.")
+            return
+
+        path, name = self.db.db_path, self.db.db_name
+        if not self.db.connect(path, name, self.config.get_profile_settings(profile_name)):
+            return
+        self.config.set_database_profile(path, profile_name)
+        print(f"Reconnected to {name} with profile '{profile_name}'")
+
     def do_disconnect(self, arg):
         """Disconnect from the current database."""
         self.db.disconnect()
@@ -63,6 +124,27 @@ class SQLiteCLI(cmd.Cmd):
         else:
             print("No tables found.")
 
+    def do_stats(self, arg):
+        """Show row counts, sizes and indexes, computed in parallel: stats [table ...]"""
+        if not self.db.connection:
+            print("No database connected.")
+            return
+        tables = arg.split() or self.db.get_tables()
+        started_at = time.perf_counter()
+        stats = self.db.table_stats.collect_all(tables)
+        seconds = time.perf_counter() - started_at
+        for table_name, table_stats in stats.items():
+            rows = table_stats['row_count']
+            line = f"  {table_name}: {rows if rows is not None else '?'} rows"
+            if table_stats['size_bytes'] is not None:
+                line += f", {format_size(table_stats['size_bytes'])}"
+            if table_stats['indexes']:
+                line += f", indexes: {', '.join(table_stats['indexes'])}"
+            if table_stats.get('error'):
+                line += f" ({table_stats['error']})"
+            print(line)
+        print(f"{len(stats)} tables in {seconds:.2f}s")
+
     def do_schema(self, arg):
         """Show schema of a table: schema <table_name>"""
         if not arg:
@@ -84,18 +166,319 @@ class SQLiteCLI(cmd.Cmd):
             print("Usage: sql <statement>")
             return
 
-        result = self.db.execute_sql(arg)
-        if isinstance(result, list):
-            for row in result:
-                print(row)
+        self.config.history.add(arg, self.db.db_path)
+        result = self.db.stream_sql(arg, use_cache=True)
+        if isinstance(result, ResultStream):
+            try:
+                for row in result:
+                    print(row)
+            finally:
+                result.close()
+            if result.error:
+                print(result.error)
         else:
             print(result)
 
+        profile = self.db.profiler.last
+        if self.timer and profile is not None:
+            print(f"Run Time: {profile.summary()}")
+
+    def do_timer(self, arg):
+        """Show timing after each sql statement: timer on|off"""
+        if arg.strip().lower() not in ('on', 'off'):
+            print(f"Usage: timer on|off (currently {'on' if self.timer else 'off'})")
+            return
+        self.timer = arg.strip().lower() == 'on'
+
+    def do_explain(self, arg):
+        """Show the query plan of a statement as a tree: explain <statement>"""
+        if not arg:
+            print("Usage: explain <statement>")
+            return
+
+        plan = self.db.explain_query_plan(arg)
+        if isinstance(plan, str):
+            print(plan)
+            return
+        for line in format_plan(plan):
+            print(line)
+
+    def do_import(self, arg):
+        """Bulk import a CSV/TSV/JSONL file: import <file> <table> [--format csv|tsv|jsonl] [--batch N] [--fast]"""
+        from src.tools.importer import DataImporter, IMPORT_FORMATS, format_rate
+        usage = "Usage: import <file> <table> [--format csv|tsv|jsonl] [--batch N] [--fast]"
+        try:
+            args = shlex.split(arg)
+        except ValueError:
+            print("Invalid arguments.")
+            return
+
+        positional = []
+        file_format = None
+        batch_size = None
+        fast = False
+        i = 0
+        while i < len(args):
+            if args[i] == '--format' and i + 1 < len(args):
+                file_format = args[i + 1].lower()
+                i += 2
+            elif args[i] == '--batch' and i + 1 < len(args):
+                try:
+                    batch_size = int(args[i + 1])
+                except ValueError:
+                    print(usage)
+                    return
+                i += 2
+            elif args[i] == '--fast':
+                fast = True
+                i += 1
+            else:
+                positional.append(args[i])
+                i += 1
+
+        if len(positional) != 2 or (file_format and file_format not in IMPORT_FORMATS):
+            print(usage)
+            return
+
+        def report(rows, seconds):
+            print(f"\r  {format_rate(rows, seconds)}", end="", flush=True)
+
+        file_path, table_name = positional
+        result = DataImporter(self.db).import_file(
+            file_path, table_name, file_format=file_format,
+            batch_size=batch_size, fast=fast, progress=report
+        )
+        if result['rows']:
+            print()
+        if result['error']:
+            print(result['error'])
+        else:
+            created = " (table created)" if result['created'] else ""
+            print(f"Imported {format_rate(result['rows'], result['seconds'])} into '{table_name}'{created}")
+            if result['skipped_keys']:
+                print(f"Keys not in the first rows were skipped: {', '.join(result['skipped_keys'])}")
+
+    def do_script(self, arg):
+        """Run a .sql file in batched transactions: script <file> [--batch N] [--continue]"""
+        from src.tools.script_runner import ScriptRunner, format_script_summary
+        usage = "Usage: script <file> [--batch N] [--continue]"
+        try:
+            args = shlex.split(arg)
+        except ValueError:
+            print("Invalid arguments.")
+            return
+
+        positional = []
+        batch_size = None
+        stop_on_error = True
+        i = 0
+        while i < len(args):
+            if args[i] == '--batch' and i + 1 < len(args):
+                try:
+                    batch_size = int(args[i + 1])
+                except ValueError:
+                    print(usage)
+                    return
+                i += 2
+            elif args[i] == '--continue':
+                stop_on_error = False
+                i += 1
+            else:
+                positional.append(args[i])
+                i += 1
+
+        if len(positional) != 1:
+            print(usage)
+            return
+
+        def report(statements, seconds):
+            rate = statements / seconds if seconds > 0 else 0
+            print(f"\r  {statements} statements ({rate:,.0f}/sec)", end="", flush=True)
+
+        runner = ScriptRunner(self.db)
+        try:
+            result = runner.run_file(positional[0], batch_size=batch_size, stop_on_error=stop_on_error,
+                                     progress=report)
+        except KeyboardInterrupt:
+            # Ctrl-C lands between statements; the open batch is rolled back
+            if self.db.connection and self.db.connection.in_transaction:
+                self.db.connection.rollback()
+            print()
+            print("Script interrupted.")
+            return
+        if result['batches'] > 1:
+            print()
+        for line, sql, error in result['failures']:
+            print(f"  line {line}: {error} - {sql}")
+        if result['error']:
+            print(result['error'])
+            if not result['statements']:
+                return
+        print(format_script_summary(result))
+        if result['slowest']:
+            print("Slowest statements:")
+            for seconds, line, sql in result['slowest'][:5]:
+                print(f"  {seconds * 1000:8.2f} ms  line {line}: {sql}")
+
+    def do_export(self, arg):
+        """Export a table or query: export <table|"SELECT ..."> <file> [--format csv|jsonl|columnar|parquet]"""
+        from src.tools.exporter import DataExporter, EXPORT_FORMATS, format_export_summary
+        from src.tools.importer import format_rate
+        usage = 'Usage: export <table|"SELECT ..."> <file> [--format csv|jsonl|columnar|parquet]'
+        try:
+            args = shlex.split(arg)
+        except ValueError:
+            print("Invalid arguments.")
+            return
+
+        file_format = None
+        if '--format' in args:
+            index = args.index('--format')
+            if index + 1 >= len(args):
+                print(usage)
+                return
+            file_format = args[index + 1].lower()
+            del args[index:index + 2]
+
+        if len(args) != 2 or (file_format and file_format not in EXPORT_FORMATS):
+            print(usage)
+            return
+
+        def report(rows, seconds):
+            print(f"\r  {format_rate(rows, seconds)}", end="", flush=True)
+
+        source, file_path = args
+        exporter = DataExporter(self.db)
+        result = exporter.export_source(source, file_path, file_format=file_format, progress=report)
+        if result['rows']:
+            print()
+        print(format_export_summary(result))
+
+    def do_search(self, arg):
+        """Search all tables for text: search [--rebuild] [--numeric] <words>"""
+        from src.tools.search import SearchIndex
+        if not self.db.connection:
+            print("No database connected.")
+            return
+        words = arg.split()
+        rebuild = '--rebuild' in words
+        include_numeric = '--numeric' in words
+        text = ' '.join(word for word in words if word not in ('--rebuild', '--numeric'))
+        if not text and not rebuild:
+            print("Usage: search [--rebuild] [--numeric] <words>")
+            return
+
+        def report(table_name, rows):
+            print(f"\r  Indexing {table_name}: {rows} rows", end="", flush=True)
+
+        index = SearchIndex(self.db, self.config.get_search_index_path(self.db.db_path))
+        try:
+            if rebuild or not index.is_built():
+                result = index.build(include_numeric=include_numeric, progress=report)
+            else:
+                result = index.update(progress=report)
+        except (sqlite3.Error, OSError) as e:
+            print(f"Error: {e}")
+            return
+        if result['rows']:
+            print()
+            print(f"Indexed {result['rows']} rows in {result['seconds']:.2f}s")
+        if result['error']:
+            print(result['error'])
+        elif text:
+            hits = index.search(text)
+            if isinstance(hits, str):
+                print(hits)
+            else:
+                for table_name, rowid, snippet in hits:
+                    print(f"{table_name} rowid={rowid}: {snippet}")
+                print(f"{len(hits)} hits")
+        index.close()
+
+    def do_space(self, arg):
+        """Show space used per table/index, or reclaim free space: space [vacuum|autovacuum|incremental [pages]]"""
+        from src.tools.space import SpaceAnalyzer, format_file_summary, format_object_line
+        if not self.db.connection:
+            print("No database connected.")
+            return
+        args = arg.split()
+        analyzer = SpaceAnalyzer(self.db)
+        if args and args[0] in ('vacuum', 'autovacuum'):
+            started_at = time.perf_counter()
+            for sql in analyzer.vacuum_sql(enable_incremental=args[0] == 'autovacuum'):
+                result = self.db.execute_sql(sql)
+                if isinstance(result, str):
+                    print(result)
+                    return
+            print(f"VACUUM finished in {time.perf_counter() - started_at:.2f}s")
+        elif args and args[0] == 'incremental':
+            if len(args) > 1 and not args[1].isdigit():
+                print("Usage: space incremental [pages]")
+                return
+
+            def report(released, total):
+                print(f"\r  Released {released}/{total} pages", end="", flush=True)
+
+            result = analyzer.incremental_vacuum(int(args[1]) if len(args) > 1 else None, progress=report)
+            if isinstance(result, str):
+                print(result)
+                return
+            if result:
+                print()
+            print(f"Released {result} free pages")
+        elif args:
+            print("Usage: space [vacuum|autovacuum|incremental [pages]]")
+            return
+
+        summary = analyzer.file_summary()
+        if isinstance(summary, str):
+            print(summary)
+            return
+        for line in format_file_summary(summary):
+            print(line)
+        if summary['dbstat']:
+            objects = analyzer.object_summary()
+            if isinstance(objects, str):
+                print(objects)
+            else:
+                for item in objects:
+                    print(f"  {format_object_line(item)}")
+
+    def do_advise(self, arg):
+        """Recommend indexes for executed statements, or for one: advise [--gain] [statement]"""
+        from src.tools.advisor import IndexAdvisor, format_gain
+        if not self.db.connection:
+            print("No database connected.")
+            return
+        estimate = arg.strip().startswith('--gain')
+        sql = arg.strip()[len('--gain'):].strip() if estimate else arg.strip()
+        advisor = IndexAdvisor(self.db)
+        statements = [sql] if sql else advisor.collect_statements(self.config.history)
+        recommendations = advisor.advise(statements)
+        if isinstance(recommendations, str):
+            print(recommendations)
+            return
+        for entry in recommendations:
+            print(f"{entry['sql']};")
+            count = len(entry['statements'])
+            print(f"  -- {', '.join(entry['reasons'])}; {count} statement{'s' if count != 1 else ''}")
+            if estimate:
+                print(f"  -- {format_gain(advisor.estimate_gain(entry))}")
+        print(f"{len(recommendations)} recommendations from {len(statements)} statements")
+
     def do_quit(self, arg):
         """Quit Loula's SQLite Viewer."""
-        self.db.disconnect()
+        # Quitting does not wait for a startup reconnect that is still running
+        if not self.db.is_connecting():
+            self.db.disconnect()
         print("Goodbye.")
         return True
 
     def default(self, line):
+        # sqlite3-shell style dot commands, e.g. ".timer on" or ".explain SELECT ..."
+        if line.startswith('.'):
+            command, _, arg = line[1:].partition(' ')
+            handler = getattr(self, f"do_{command}", None)
+            if handler is not None:
+                return handler(arg.strip())
         print(f"Unknown command: {line}. Type 'help' for available commands.")
@@ -5,6 +5,9 @@ Loula's SQLite Viewer - Main Entry Point
 
 import os
 import sys
+import time
+
+STARTED_AT = time.perf_counter()
 
 try:
     import curses
@@ -42,16 +45,32 @@ def can_use_curses():
     # than to always fall back to CLI
     return True
 
-from src.ui.tui import SQLiteTUI
-from src.core.cli import SQLiteCLI
 
+def main(argv=None):
+    """Main application entry point
+
+    Only the interface that is used gets imported. With
+    --startup-profile the viewer starts up to its first frame, then
+    prints how long that took and which imports it spent the time on.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    profiler = None
+    if '--startup-profile' in argv:
+        from src.core.startup import ImportProfiler
+        profiler = ImportProfiler(STARTED_AT)
+        profiler.install()
 
-def main():
-    """Main application entry point"""
     if can_use_curses():
         try:
+            from src.ui.tui import SQLiteTUI
+            if profiler:
+                profiler.mark('interface imported')
             tui = SQLiteTUI()
-            tui.run()
+            if profiler:
+                profiler.mark('interface ready')
+                tui.run(on_first_frame=lambda: profiler.mark('first frame') or True)
+            else:
+                tui.run()
         except KeyboardInterrupt:
             print("\nGoodbye!")
         except Exception as e:
@@ -63,6 +82,7 @@ def main():
                 print("For enhanced interface, try running in a proper terminal.")
                 print()
                 try:
+                    from src.core.cli import SQLiteCLI
                     cli = SQLiteCLI()
                     cli.cmdloop()
                 except Exception as cli_error:
@@ -79,12 +99,24 @@ def main():
             print("Note: Terminal environment not suitable for interactive interface.")
         print()
         try:
+            from src.core.cli import SQLiteCLI
+            if profiler:
+                profiler.mark('interface imported')
             cli = SQLiteCLI()
-            cli.cmdloop()
+            if profiler:
+                profiler.mark('interface ready')
+                print(cli.intro)
+                profiler.mark('first frame')
+            else:
+                cli.cmdloop()
         except Exception as e:
             print(f"CLI failed: {e}")
             print("Please check your Python environment and try again.")
 
+    if profiler:
+        profiler.uninstall()
+        print("\n".join(profiler.report()))
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,116 @@
+"""
+Startup profiling for Loula's SQLite Viewer
+
+ImportProfiler times every module imported after it is installed, the
+way `python -X importtime` does (self and cumulative time per module),
+and records named marks such as the first frame drawn, so
+`--startup-profile` can show where launch time goes.
+"""
+
+import sys
+import threading
+import time
+
+
+STARTUP_TARGET_MS = 100
+PROFILE_TOP_MODULES = 25
+
+
+class _TimedLoader:
+    """Wraps a loader to time exec_module; everything else is delegated"""
+
+    def __init__(self, loader, profiler, name):
+        self._loader = loader
+        self._profiler = profiler
+        self._name = name
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profiler._enter(self._name)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._leave()
+            # Leave the real loader on the module once it is loaded
+            module.__loader__ = self._loader
+            if getattr(module, '__spec__', None) is not None:
+                module.__spec__.loader = self._loader
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class ImportProfiler:
+    """A meta path finder that times the imports made after install()"""
+
+    def __init__(self, started_at=None):
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.imports = []   # (name, self seconds, cumulative seconds, depth) in load order
+        self.marks = []     # (label, seconds since started_at)
+        self._stack = []
+        self._thread = threading.get_ident()
+
+    def install(self):
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def mark(self, label):
+        """Record how long after the start label happened"""
+        self.marks.append((label, time.perf_counter() - self.started_at))
+
+    def find_spec(self, name, path, target=None):
+        # Only imports made by the startup thread are timed
+        if threading.get_ident() != self._thread:
+            return None
+        for finder in sys.meta_path:
+            if finder is self:
+                continue
+            find_spec = getattr(finder, 'find_spec', None)
+            if find_spec is None:
+                continue
+            spec = find_spec(name, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                spec.loader = _TimedLoader(spec.loader, self, name)
+            return spec
+        return None
+
+    def _enter(self, name):
+        # [name, start, time spent in nested imports]
+        self._stack.append([name, time.perf_counter(), 0.0])
+
+    def _leave(self):
+        name, start, nested = self._stack.pop()
+        cumulative = time.perf_counter() - start
+        if self._stack:
+            self._stack[-1][2] += cumulative
+        self.imports.append((name, cumulative - nested, cumulative, len(self._stack)))
+
+    def import_seconds(self):
+        """Total time spent in top-level imports"""
+        return sum(cumulative for _, _, cumulative, depth in self.imports if depth == 0)
+
+    def report(self, top=PROFILE_TOP_MODULES):
+        """Lines of the startup profile: marks, then the slowest imports"""
+        lines = ["Startup profile (ms since the entry point started):"]
+        for label, seconds in self.marks:
+            lines.append(f"  {label:24} {seconds * 1000:8.1f}")
+        frames = [seconds for label, seconds in self.marks if label == 'first frame']
+        if frames:
+            verdict = "within" if frames[0] * 1000 <= STARTUP_TARGET_MS else "over"
+            lines.append(f"  First frame {verdict} the {STARTUP_TARGET_MS} ms target")
+        lines.append("")
+        lines.append(f"Imports: {len(self.imports)} modules, {self.import_seconds() * 1000:.1f} ms "
+                     f"(interpreter startup not included; see python -X importtime)")
+        lines.append(f"  {'self ms':>8} | {'cumul. ms':>9} | module")
+        slowest = sorted(self.imports, key=lambda entry: entry[2], reverse=True)[:top]
+        for name, own, cumulative, depth in slowest:
+            lines.append(f"  {own * 1000:8.1f} | {cumulative * 1000:9.1f} | {'  ' * depth}{name}")
+        return lines
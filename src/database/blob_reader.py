@@ -0,0 +1,77 @@
+"""
+Incremental BLOB and TEXT reading for Loula's SQLite Viewer
+
+Large values are read one chunk at a time, with Connection.blobopen on
+Python 3.11+ (rowid tables) and substr() queries otherwise, so paging
+through a 200 MB BLOB never loads it into Python at once.
+"""
+
+import sqlite3
+
+from .row_source import quote_identifier
+
+
+HEX_BYTES_PER_LINE = 16
+
+
+class ValueReader:
+    """Random access to the bytes of one BLOB or TEXT value"""
+
+    def __init__(self, connection, table_name, column, row_clause, params, length, value_type):
+        self.connection = connection
+        self.table_name = table_name
+        self.column = column
+        # WHERE/LIMIT clause and parameters selecting the row (used without blobopen)
+        self.row_clause = row_clause
+        self.params = list(params)
+        self.length = length
+        self.value_type = value_type
+        self._blob = None
+
+    @classmethod
+    def open(cls, connection, table_name, column, row_clause, params, rowid=None):
+        """Open a reader for a cell, using blob I/O when a rowid is known"""
+        quoted_column = quote_identifier(column)
+        # length() of a BLOB column is read from the record header without loading the value
+        row = connection.execute(
+            f"SELECT typeof({quoted_column}), CASE typeof({quoted_column}) "
+            f"WHEN 'blob' THEN length({quoted_column}) ELSE length(CAST({quoted_column} AS BLOB)) END "
+            f"FROM {quote_identifier(table_name)} {row_clause}", params
+        ).fetchone()
+        if row is None:
+            raise ValueError("row no longer exists")
+        reader = cls(connection, table_name, column, row_clause, params, row[1] or 0, row[0])
+        if rowid is not None and hasattr(connection, 'blobopen') and row[0] in ('blob', 'text'):
+            try:
+                reader._blob = connection.blobopen(table_name, column, rowid, readonly=True)
+            except sqlite3.Error:
+                reader._blob = None
+        return reader
+
+    def read(self, offset, size):
+        """Read up to size bytes starting at offset"""
+        if offset >= self.length or size <= 0:
+            return b""
+        size = min(size, self.length - offset)
+        if self._blob is not None:
+            self._blob.seek(offset)
+            return self._blob.read(size)
+        column = quote_identifier(self.column)
+        row = self.connection.execute(
+            f"SELECT substr(CAST({column} AS BLOB), ?, ?) FROM {quote_identifier(self.table_name)} "
+            f"{self.row_clause}", [offset + 1, size] + self.params
+        ).fetchone()
+        return bytes(row[0]) if row and row[0] is not None else b""
+
+    def close(self):
+        """Release the blob handle"""
+        if self._blob is not None:
+            self._blob.close()
+            self._blob = None
+
+
+def hex_dump_line(offset, data):
+    """Format up to HEX_BYTES_PER_LINE bytes like 'hexdump -C'"""
+    hex_part = ' '.join(f"{byte:02x}" for byte in data)
+    text_part = ''.join(chr(byte) if 32 <= byte < 127 else '.' for byte in data)
+    return f"{offset:08x}  {hex_part:<{HEX_BYTES_PER_LINE * 3 - 1}}  |{text_part}|"
@@ -0,0 +1,130 @@
+"""
+Schema catalog for Loula's SQLite Viewer
+
+Loads tables, views, columns, indexes and foreign keys once and keeps
+them until PRAGMA schema_version changes, so UI code can ask for schema
+information on every redraw without re-querying sqlite_master.
+"""
+
+import sqlite3
+
+from .row_source import quote_identifier
+
+
+class SchemaCatalog:
+    """Cached schema metadata keyed on PRAGMA schema_version"""
+
+    def __init__(self, db_manager):
+        self.db = db_manager
+        self._version = None
+        self.tables = []
+        self.views = []
+        self._columns = {}
+        self._indexes = {}
+        self._foreign_keys = {}
+        self._index_columns = {}
+        # Last table filter (text, matches), narrowed incrementally while typing
+        self._filter = ('', [])
+
+    def _schema_version(self):
+        try:
+            return (self.db.db_path, self.db.connection.execute("PRAGMA schema_version").fetchone()[0])
+        except sqlite3.Error:
+            return None
+
+    def refresh(self, force=False):
+        """Reload the object lists if the schema changed (or when forced)"""
+        if not self.db.connection:
+            self.clear()
+            return
+        version = self._schema_version()
+        if not force and version is not None and version == self._version:
+            return
+
+        self.clear()
+        try:
+            rows = self.db.connection.execute(
+                "SELECT name, type FROM sqlite_master WHERE type IN ('table', 'view') ORDER BY rowid"
+            ).fetchall()
+        except sqlite3.Error:
+            rows = []
+        self.tables = [name for name, kind in rows if kind == 'table']
+        self.views = [name for name, kind in rows if kind == 'view']
+        self._version = version
+
+    def clear(self):
+        """Forget all cached metadata"""
+        self._version = None
+        self.tables = []
+        self.views = []
+        self._columns.clear()
+        self._indexes.clear()
+        self._foreign_keys.clear()
+        self._index_columns.clear()
+        self._filter = ('', [])
+
+    def get_tables(self):
+        """Get the table names"""
+        self.refresh()
+        return self.tables
+
+    def filter_tables(self, text):
+        """Get the table names containing text, ignoring case
+
+        When the new text extends the previous filter, only the previous
+        matches are searched, so typing one more character stays cheap
+        even with thousands of tables.
+        """
+        tables = self.get_tables()
+        text = text.lower()
+        if not text:
+            return tables
+        previous_text, previous_matches = self._filter
+        candidates = previous_matches if previous_text and text.startswith(previous_text) else tables
+        matches = [name for name in candidates if text in name.lower()]
+        self._filter = (text, matches)
+        return matches
+
+    def get_views(self):
+        """Get the view names"""
+        self.refresh()
+        return self.views
+
+    def _pragma(self, cache, pragma, name):
+        """Run a per-object PRAGMA once and cache its rows"""
+        self.refresh()
+        if name not in cache:
+            if not self.db.connection:
+                return []
+            try:
+                cache[name] = self.db.connection.execute(
+                    f"PRAGMA {pragma}({quote_identifier(name)})"
+                ).fetchall()
+            except sqlite3.Error:
+                return []
+        return cache[name]
+
+    def get_columns(self, name):
+        """Get PRAGMA table_info rows for a table or view"""
+        return self._pragma(self._columns, 'table_info', name)
+
+    def get_indexes(self, name):
+        """Get PRAGMA index_list rows for a table"""
+        return self._pragma(self._indexes, 'index_list', name)
+
+    def get_foreign_keys(self, name):
+        """Get PRAGMA foreign_key_list rows for a table"""
+        return self._pragma(self._foreign_keys, 'foreign_key_list', name)
+
+    def get_index_columns(self, index_name):
+        """Get PRAGMA index_info rows for an index"""
+        return self._pragma(self._index_columns, 'index_info', index_name)
+
+    def get_indexed_columns(self, name):
+        """Get the names of columns that lead some index of a table"""
+        columns = set()
+        for index in self.get_indexes(name):
+            info = self.get_index_columns(index[1])
+            if info and info[0][2] is not None:
+                columns.add(info[0][2])
+        return columns
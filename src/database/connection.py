@@ -0,0 +1,80 @@
+"""
+Connection setup for Loula's SQLite Viewer
+
+Opens SQLite connections according to a connection profile: read-only
+or immutable URIs, memory-mapped I/O, page cache size and other PRAGMAs
+applied at connect time.
+"""
+
+import os
+import sqlite3
+
+if os.name == 'nt':
+    from nturl2path import pathname2url
+else:
+    # What urllib.request.pathname2url does on POSIX, without importing
+    # urllib.request (http.client, email, ssl) at startup
+    from urllib.parse import quote as pathname2url
+
+
+TEMP_STORE_VALUES = {'default': 0, 'file': 1, 'memory': 2}
+JOURNAL_MODES = ('delete', 'truncate', 'persist', 'memory', 'wal', 'off')
+
+
+def connection_uri(db_path, read_only=False, immutable=False):
+    """Build a file: URI for a database path"""
+    uri = f"file:{pathname2url(os.path.abspath(db_path))}"
+    options = []
+    if read_only or immutable:
+        options.append("mode=ro")
+    if immutable:
+        options.append("immutable=1")
+    if options:
+        uri += "?" + "&".join(options)
+    return uri
+
+
+def open_connection(db_path, settings=None, check_same_thread=True):
+    """Open a connection and apply the settings of a connection profile"""
+    settings = settings or {}
+    read_only = bool(settings.get('read_only'))
+    immutable = bool(settings.get('immutable'))
+    busy_timeout = settings.get('busy_timeout')
+    timeout = busy_timeout / 1000.0 if busy_timeout else 5.0
+
+    if (read_only or immutable) and db_path != ':memory:':
+        connection = sqlite3.connect(
+            connection_uri(db_path, read_only, immutable), uri=True,
+            timeout=timeout, check_same_thread=check_same_thread
+        )
+    else:
+        connection = sqlite3.connect(db_path, timeout=timeout, check_same_thread=check_same_thread)
+
+    try:
+        apply_pragmas(connection, settings)
+    except (sqlite3.Error, ValueError):
+        connection.close()
+        raise
+    return connection
+
+
+def apply_pragmas(connection, settings):
+    """Apply the PRAGMA part of a connection profile"""
+    if settings.get('mmap_size') is not None:
+        connection.execute(f"PRAGMA mmap_size = {int(settings['mmap_size'])}")
+    if settings.get('cache_size') is not None:
+        connection.execute(f"PRAGMA cache_size = {int(settings['cache_size'])}")
+    if settings.get('temp_store') is not None:
+        temp_store = str(settings['temp_store']).lower()
+        if temp_store not in TEMP_STORE_VALUES:
+            raise ValueError(f"invalid temp_store '{settings['temp_store']}'")
+        connection.execute(f"PRAGMA temp_store = {TEMP_STORE_VALUES[temp_store]}")
+    if settings.get('busy_timeout') is not None:
+        connection.execute(f"PRAGMA busy_timeout = {int(settings['busy_timeout'])}")
+    journal_mode = settings.get('journal_mode')
+    if journal_mode and not (settings.get('read_only') or settings.get('immutable')):
+        if str(journal_mode).lower() not in JOURNAL_MODES:
+            raise ValueError(f"invalid journal_mode '{journal_mode}'")
+        connection.execute(f"PRAGMA journal_mode = {str(journal_mode).lower()}")
+    if settings.get('query_only'):
+        connection.execute("PRAGMA query_only = ON")
@@ -5,45 +5,293 @@ Database operations for Loula's SQLite Viewer
 import sqlite3
 import os
 import json
+import threading
+import time
+from .catalog import SchemaCatalog
+from .connection import open_connection
+from .pool import ParallelExecutor, ReadOnlyPool
+from .profiler import QueryProfiler
+from .query_runner import BackgroundConnect, BackgroundFetch, BackgroundQuery
+from .result_cache import QueryResultCache, estimate_row_size
+from .row_source import TableRowSource
+from .stats import TableStatsCache
+
+
+class ResultStream:
+    """Lazily iterates the rows of an executed query in fetchmany batches"""
+
+    def __init__(self, cursor, batch_size, profile=None, db_manager=None):
+        self.cursor = cursor
+        self.batch_size = max(1, batch_size)
+        self.profile = profile
+        # Set for writes that return rows (... RETURNING): committed on close
+        self.db = db_manager
+        self.columns = [desc[0] for desc in cursor.description]
+        self.rows_fetched = 0
+        self.error = None
+        self._batch = []
+        self._index = 0
+        self._closed = False
+        # Set by capture_into() to store the complete result in a QueryResultCache
+        self._cache = None
+        self._cache_key = None
+        self._captured = None
+        self._captured_bytes = 0
+
+    def capture_into(self, cache, key):
+        """Keep fetched rows so the complete result can be cached once exhausted"""
+        self._cache = cache
+        self._cache_key = key
+        self._captured = []
+        self._captured_bytes = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self.has_more():
+            raise StopIteration
+        row = self._batch[self._index]
+        self._index += 1
+        self.rows_fetched += 1
+        return row
+
+    def has_more(self):
+        """Check for another row, fetching the next batch if needed"""
+        if self._index < len(self._batch):
+            return True
+        if self._closed:
+            return False
+        started_at = time.perf_counter()
+        start_steps = self.profile.db.vm_steps if self.profile else 0
+        try:
+            self._batch = self.cursor.fetchmany(self.batch_size)
+        except sqlite3.Error as e:
+            self.error = f"Error: {e}"
+            self._batch = []
+        if self.profile is not None:
+            self.profile.add_fetch(time.perf_counter() - started_at,
+                                   self.profile.db.vm_steps - start_steps)
+        self._index = 0
+        if self._captured is not None:
+            if self._batch:
+                self._captured.extend(self._batch)
+                self._captured_bytes += sum(estimate_row_size(row) for row in self._batch)
+                if self._captured_bytes > self._cache.max_entry_bytes:
+                    self._captured = None
+            elif self.error is None:
+                self._cache.put(self._cache_key, self.columns, self._captured, self._captured_bytes)
+        if not self._batch:
+            self.close()
+            return False
+        return True
+
+    def close(self):
+        """Release the underlying cursor"""
+        if not self._closed:
+            self._closed = True
+            self._batch = []
+            self._index = 0
+            if self.profile is not None:
+                self.profile.finish(self.rows_fetched, self.error)
+            self._captured = None
+            try:
+                self.cursor.close()
+            except sqlite3.Error:
+                pass
+            connection = self.db.connection if self.db is not None else None
+            if connection is not None and connection.in_transaction:
+                try:
+                    connection.commit()
+                except sqlite3.Error as e:
+                    self.error = self.error or f"Error: {e}"
+                self.db.write_generation += 1
+
+
+class CachedResultStream(ResultStream):
+    """A ResultStream replaying rows from the result cache"""
+
+    def __init__(self, columns, rows, profile=None):
+        self.cursor = None
+        self.batch_size = len(rows)
+        self.profile = profile
+        self.columns = columns
+        self.rows_fetched = 0
+        self.error = None
+        self._batch = rows
+        self._index = 0
+        # Nothing left to fetch or release once the cached rows are consumed
+        self._closed = True
+        self._cache = None
+        self._captured = None
 
 
 class DatabaseManager:
     """Handles all database operations"""
 
-    def __init__(self):
+    def __init__(self, fetch_batch_size=500, progress_steps=1000):
         self.connection = None
         self.db_path = None
         self.db_name = None
+        # Connection profile settings the current database was opened with
+        self.profile = {}
+        self.fetch_batch_size = fetch_batch_size
+        # VM instructions between progress handler calls
+        self.progress_steps = progress_steps
+        self.vm_steps = 0
+        # BackgroundQuery whose statement is running; aborted by the progress handler once cancelled
+        self.running_query = None
+        self.profiler = QueryProfiler(self)
+        self.result_cache = QueryResultCache()
+        # Bumped on every local write so caches can tell the data changed
+        self.write_generation = 0
+        self.table_stats = TableStatsCache(self)
+        self.catalog = SchemaCatalog(self)
+        # Read-only connections for parallel per-table work, opened on demand
+        self._pool = None
+        # Worker threads may ask for the pool at the same time
+        self._pool_lock = threading.Lock()
+        # BackgroundConnect started by connect_in_background, if any
+        self.pending_connect = None
+
+    def connect(self, db_path, db_name, profile=None):
+        """Connect to a SQLite database
 
-    def connect(self, db_path, db_name):
-        """Connect to a SQLite database"""
+        profile is a dict of connection settings (see ConfigManager's
+        connection profiles); None opens the database with SQLite defaults.
+        """
+        self.wait_for_connect()
+        self.pending_connect = None
         try:
-            self.connection = sqlite3.connect(db_path)
-            self.db_path = db_path
-            self.db_name = db_name
-            return True
-        except sqlite3.Error as e:
+            # Queries may run on a worker thread (see BackgroundQuery); access is serialized by the UI
+            connection = open_connection(db_path, profile, check_same_thread=False)
+        except (sqlite3.Error, ValueError) as e:
             print(f"Connection error: {e}")
             return False
+        self.use_connection(connection, db_path, db_name, profile)
+        return True
+
+    def connect_in_background(self, db_path, db_name, profile=None, require_file=False):
+        """Connect and load the table list on a worker thread
+
+        Returns the started BackgroundConnect, also kept in
+        pending_connect. Nothing else may use the database until
+        wait_for_connect() returns True.
+        """
+        self.wait_for_connect()
+        self.pending_connect = BackgroundConnect(self, db_path, db_name, profile, require_file).start()
+        return self.pending_connect
+
+    def is_connecting(self):
+        """Check whether a background connect is still running"""
+        return self.pending_connect is not None and not self.pending_connect.is_done()
+
+    def wait_for_connect(self, timeout=None):
+        """Wait for a background connect; returns False if it is still running"""
+        if self.pending_connect is None:
+            return True
+        return self.pending_connect.wait(timeout)
+
+    def use_connection(self, connection, db_path, db_name, profile=None):
+        """Make an open connection the current one"""
+        if self.connection:
+            self.connection.close()
+        self._close_pool()
+        self.connection = connection
+        self.connection.set_progress_handler(self._on_progress, self.progress_steps)
+        self.profile = dict(profile or {})
+        self.db_path = db_path
+        self.db_name = db_name
+        self.write_generation += 1
+        self.catalog.clear()
 
     def disconnect(self):
         """Close database connection"""
+        self.wait_for_connect()
+        self.pending_connect = None
         if self.connection:
             self.connection.close()
+            self._close_pool()
             self.connection = None
             self.db_path = None
             self.db_name = None
+            self.profile = {}
+            self.write_generation += 1
+            self.catalog.clear()
+
+    def is_read_only(self):
+        """Check whether the current connection refuses writes"""
+        return bool(self.profile.get('read_only') or self.profile.get('immutable')
+                    or self.profile.get('query_only'))
+
+    def get_pool(self):
+        """Get the read-only connection pool for the current database file
 
-    def get_tables(self):
-        """Get list of all tables in the database"""
+        Returns None when there is no file to share (no connection or an
+        in-memory database).
+        """
+        if not self.connection or not self.db_path or self.db_path == ':memory:':
+            return None
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ReadOnlyPool(self.db_path, self.profile)
+            return self._pool
+
+    def _close_pool(self):
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.close()
+
+    def map_tables(self, func, tables=None, progress=None):
+        """Run func(connection, table_name) for many tables in parallel on pooled connections
+
+        Returns {table_name: result or error string}. Without a pool
+        (in-memory databases) the tables are processed in order on the
+        main connection.
+        """
         if not self.connection:
-            return []
+            return {}
+        tables = list(tables if tables is not None else self.get_tables())
+        pool = self.get_pool()
+        if pool is not None:
+            return ParallelExecutor(pool).map_tables(func, tables, progress)
+        results = {}
+        for done, table_name in enumerate(tables, 1):
+            try:
+                results[table_name] = func(self.connection, table_name)
+            except (sqlite3.Error, ValueError) as e:
+                results[table_name] = f"Error: {e}"
+            if progress:
+                progress(done, len(tables))
+        return results
+
+    def _on_progress(self):
+        """SQLite progress handler: counts VM steps, a non-zero return aborts the statement"""
+        self.vm_steps += self.progress_steps
+        query = self.running_query
+        return 1 if query is not None and query.cancelled else 0
+
+    def get_data_version(self):
+        """Get PRAGMA data_version, which changes when other connections commit"""
+        if not self.connection:
+            return None
         try:
-            cursor = self.connection.cursor()
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-            return [row[0] for row in cursor.fetchall()]
+            return self.connection.execute("PRAGMA data_version").fetchone()[0]
         except sqlite3.Error:
+            return None
+
+    def get_table_stats(self, table_name):
+        """Get cached table statistics, or None while they are computed in the background"""
+        return self.table_stats.get(table_name)
+
+    def get_tables(self, name_filter=None):
+        """Get list of all tables in the database, optionally only those whose name contains name_filter"""
+        if not self.connection:
             return []
+        if name_filter:
+            return self.catalog.filter_tables(name_filter)
+        return self.catalog.get_tables()
 
     def get_table_data(self, table_name, limit=1000):
         """Get data from a specific table"""
@@ -56,21 +304,21 @@ class DatabaseManager:
         except sqlite3.Error:
             return []
 
+    def get_row_source(self, table_name, page_size, columns=None, preview_length=None):
+        """Get a windowed, keyset-paginated row source for a table, optionally limited to some columns"""
+        return TableRowSource(self, table_name, page_size, columns=columns, preview_length=preview_length)
+
     def get_table_schema(self, table_name):
         """Get schema information for a table"""
         if not self.connection:
             return []
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute(f"PRAGMA table_info({table_name});")
-            return cursor.fetchall()
-        except sqlite3.Error:
-            return []
+        return self.catalog.get_columns(table_name)
 
     def execute_sql(self, sql, params=None):
         """Execute a SQL statement"""
         if not self.connection:
             return "No database connected"
+        profile = self.profiler.begin(sql)
         try:
             cursor = self.connection.cursor()
             if params:
@@ -79,9 +327,68 @@ class DatabaseManager:
                 cursor.execute(sql)
             if sql.strip().upper().startswith('SELECT'):
                 rows = cursor.fetchall()
+                profile.finish(len(rows))
                 return rows
             else:
                 self.connection.commit()
+                self.write_generation += 1
+                profile.finish(max(cursor.rowcount, 0))
+                return cursor.rowcount
+        except sqlite3.Error as e:
+            profile.finish(error=f"Error: {e}")
+            return f"Error: {e}"
+
+    def stream_sql(self, sql, params=None, batch_size=None, use_cache=False):
+        """Execute a SQL statement, streaming result rows instead of fetching them all
+
+        Returns a ResultStream for statements that produce rows, the row
+        count for other statements, or an error string. With use_cache,
+        read-only queries are answered from (and stored in) the result cache.
+        """
+        if not self.connection:
+            return "No database connected"
+        profile = self.profiler.begin(sql)
+
+        cache_key = None
+        if use_cache and self.result_cache.is_cacheable(sql):
+            cache_key = self.result_cache.make_key(self, sql, params)
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                columns, rows = cached
+                profile.cached = True
+                profile.finish(len(rows))
+                return CachedResultStream(columns, rows, profile)
+
+        try:
+            cursor = self.connection.cursor()
+            if params:
+                cursor.execute(sql, params)
+            else:
+                cursor.execute(sql)
+            profile.executed()
+            if cursor.description is None:
+                self.connection.commit()
+                self.write_generation += 1
+                profile.finish(max(cursor.rowcount, 0))
                 return cursor.rowcount
+            # A write with RETURNING leaves a transaction open until the stream is closed
+            writer = self if self.connection.in_transaction else None
+            stream = ResultStream(cursor, batch_size or self.fetch_batch_size, profile, writer)
+            if cache_key is not None:
+                stream.capture_into(self.result_cache, cache_key)
+            return stream
         except sqlite3.Error as e:
+            profile.finish(error=f"Error: {e}")
             return f"Error: {e}"
+
+    def explain_query_plan(self, sql, params=None):
+        """Get EXPLAIN QUERY PLAN rows for a statement, or an error string"""
+        return self.profiler.explain(sql, params)
+
+    def run_in_background(self, sql, params=None, use_cache=False):
+        """Start a statement on a worker thread, returning a cancellable BackgroundQuery"""
+        return BackgroundQuery(self, sql, params, use_cache).start()
+
+    def fetch_in_background(self, stream, count):
+        """Fetch up to count more rows of a ResultStream on a worker thread, returning a BackgroundFetch"""
+        return BackgroundFetch(self, stream, count).start()
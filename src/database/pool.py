@@ -0,0 +1,162 @@
+"""
+Read-only connection pool for Loula's SQLite Viewer
+
+Database-wide operations (row counts, statistics for every table) run
+per table on a thread pool, each worker using its own read-only
+connection to the same file. sqlite3 releases the GIL while SQLite
+executes a statement, so the work spreads over all cores.
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from .connection import open_connection
+
+
+# Settings copied from the main connection profile to pooled connections
+_POOLED_SETTINGS = ('immutable', 'mmap_size', 'cache_size', 'temp_store', 'busy_timeout')
+
+
+def default_pool_size():
+    """Number of pooled connections: one per core, up to 32"""
+    return max(1, min(32, os.cpu_count() or 1))
+
+
+class ReadOnlyPool:
+    """A bounded set of read-only connections to one database file"""
+
+    def __init__(self, db_path, settings=None, size=None):
+        self.db_path = db_path
+        self.size = size or default_pool_size()
+        self.settings = {key: value for key, value in (settings or {}).items() if key in _POOLED_SETTINGS}
+        self.settings['read_only'] = True
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._in_use = set()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _open(self):
+        # Connections move between worker threads, one thread at a time
+        return open_connection(self.db_path, self.settings, check_same_thread=False)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection, opening a new one while the pool is below its size"""
+        connection = self._acquire()
+        try:
+            yield connection
+        finally:
+            self._release(connection)
+
+    def _acquire(self):
+        with self._lock:
+            if self._closed:
+                raise ValueError("connection pool is closed")
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._opened < self.size
+                if can_open:
+                    self._opened += 1
+            if can_open:
+                try:
+                    connection = self._open()
+                except (sqlite3.Error, ValueError):
+                    with self._lock:
+                        self._opened -= 1
+                    raise
+            else:
+                connection = self._idle.get()
+        if connection is None:
+            # close() wakes the waiters with None; pass it on to the next one
+            self._idle.put(None)
+            raise ValueError("connection pool is closed")
+        with self._lock:
+            self._in_use.add(connection)
+        return connection
+
+    def _release(self, connection):
+        with self._lock:
+            self._in_use.discard(connection)
+            closed = self._closed
+        if closed:
+            connection.close()
+        else:
+            self._idle.put(connection)
+
+    def interrupt(self):
+        """Abort the statements running on borrowed connections"""
+        with self._lock:
+            for connection in self._in_use:
+                connection.interrupt()
+
+    def close(self):
+        """Close idle connections and interrupt borrowed ones, which are closed when returned
+
+        Threads waiting for a connection are woken and get a ValueError.
+        """
+        with self._lock:
+            self._closed = True
+            for connection in self._in_use:
+                connection.interrupt()
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if connection is not None:
+                connection.close()
+        self._idle.put(None)
+
+
+class ParallelExecutor:
+    """Fans per-table work out over a ReadOnlyPool and merges the results"""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.cancelled = False
+
+    def map_tables(self, func, tables, progress=None):
+        """Run func(connection, table_name) for every table in parallel
+
+        Returns {table_name: result}; a table whose work raised a
+        sqlite3.Error maps to an error string. progress, if given, is
+        called as progress(done, total) as tables finish.
+        """
+        tables = list(tables)
+        results = {}
+        if not tables:
+            return results
+
+        # Imported here: concurrent.futures is slow to import and only
+        # needed once database-wide work starts
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
+        def run(table_name):
+            if self.cancelled:
+                return "Cancelled"
+            with self.pool.connection() as connection:
+                return func(connection, table_name)
+
+        with ThreadPoolExecutor(max_workers=min(self.pool.size, len(tables))) as executor:
+            futures = {executor.submit(run, table_name): table_name for table_name in tables}
+            for done, future in enumerate(as_completed(futures), 1):
+                table_name = futures[future]
+                try:
+                    results[table_name] = future.result()
+                except (sqlite3.Error, ValueError) as e:
+                    results[table_name] = f"Error: {e}"
+                if progress:
+                    progress(done, len(tables))
+        # Keep the order the tables were given in
+        return {table_name: results[table_name] for table_name in tables}
+
+    def cancel(self):
+        """Skip tables not started yet and interrupt running statements"""
+        self.cancelled = True
+        self.pool.interrupt()
@@ -0,0 +1,125 @@
+"""
+Query profiling for Loula's SQLite Viewer
+
+Records wall time, rows returned and VM steps for every statement run
+through DatabaseManager.execute_sql/stream_sql, and renders
+EXPLAIN QUERY PLAN output as a tree.
+"""
+
+import sqlite3
+import time
+from collections import deque
+
+
+class QueryProfile:
+    """Timing and counters for a single statement
+
+    Time and VM steps are only counted while SQLite is working: the
+    execute step plus every fetch of a streamed result, not the time a
+    result spends on screen.
+    """
+
+    def __init__(self, db_manager, sql):
+        self.db = db_manager
+        self.sql = sql
+        self.rows = 0
+        self.error = None
+        self.finished = False
+        self.cached = False
+        self._started_at = time.perf_counter()
+        self._start_steps = db_manager.vm_steps
+        self._execute_seconds = None
+        self._execute_steps = None
+        self._fetch_seconds = 0.0
+        self._fetch_steps = 0
+
+    def executed(self):
+        """Mark the end of the execute step"""
+        if self._execute_seconds is None:
+            self._execute_seconds = time.perf_counter() - self._started_at
+            self._execute_steps = self.db.vm_steps - self._start_steps
+
+    def add_fetch(self, seconds, steps):
+        """Account for one fetch of a streamed result"""
+        self._fetch_seconds += seconds
+        self._fetch_steps += steps
+
+    def finish(self, rows=0, error=None):
+        """Record the final counters (only the first call counts)"""
+        if self.finished:
+            return
+        self.executed()
+        self.rows = rows
+        self.error = error
+        self.finished = True
+
+    @property
+    def seconds(self):
+        if self._execute_seconds is None:
+            return time.perf_counter() - self._started_at
+        return self._execute_seconds + self._fetch_seconds
+
+    @property
+    def vm_steps(self):
+        if self._execute_steps is None:
+            return self.db.vm_steps - self._start_steps
+        return self._execute_steps + self._fetch_steps
+
+    def summary(self, rows=None):
+        """One-line description of the profile"""
+        rows = self.rows if rows is None else rows
+        rate = rows / self.seconds if self.seconds > 0 else 0
+        text = f"{self.seconds:.3f}s, {rows} rows ({rate:,.0f} rows/sec), ~{self.vm_steps:,} VM steps"
+        if self.cached:
+            text += " (cached)"
+        if self.error:
+            text += f", {self.error}"
+        return text
+
+
+class QueryProfiler:
+    """Keeps profiles of recent statements and explains query plans"""
+
+    def __init__(self, db_manager, history_size=100):
+        self.db = db_manager
+        self.history = deque(maxlen=history_size)
+
+    def begin(self, sql):
+        """Start profiling a statement"""
+        profile = QueryProfile(self.db, sql)
+        self.history.append(profile)
+        return profile
+
+    @property
+    def last(self):
+        """The most recent profile, or None"""
+        return self.history[-1] if self.history else None
+
+    def explain(self, sql, params=None):
+        """Run EXPLAIN QUERY PLAN, returning (id, parent, detail) rows or an error string"""
+        if not self.db.connection:
+            return "No database connected"
+        try:
+            cursor = self.db.connection.execute(f"EXPLAIN QUERY PLAN {sql}", params or ())
+            return [(row[0], row[1], row[-1]) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            return f"Error: {e}"
+
+
+def format_plan(plan_rows):
+    """Render EXPLAIN QUERY PLAN rows as tree lines, like the sqlite3 shell"""
+    children = {}
+    for node_id, parent, detail in plan_rows:
+        children.setdefault(parent, []).append((node_id, detail))
+
+    lines = ["QUERY PLAN"]
+
+    def walk(parent, prefix):
+        nodes = children.get(parent, [])
+        for i, (node_id, detail) in enumerate(nodes):
+            last = i == len(nodes) - 1
+            lines.append(f"{prefix}{'`--' if last else '|--'}{detail}")
+            walk(node_id, prefix + ("   " if last else "|  "))
+
+    walk(0, "")
+    return lines
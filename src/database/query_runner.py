@@ -0,0 +1,193 @@
+"""
+Background query execution for Loula's SQLite Viewer
+
+Runs a statement on a worker thread so the UI can show elapsed time and
+VM steps (counted by DatabaseManager's progress handler) and cancel the
+query with Connection.interrupt() while it is running. Reconnecting at
+startup runs on a worker thread the same way, so opening a large or
+network-mounted file never delays the first screen.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+from .connection import open_connection
+
+
+class BackgroundQuery:
+    """A single statement executed on a worker thread"""
+
+    def __init__(self, db_manager, sql, params=None, use_cache=False):
+        self.db = db_manager
+        self.sql = sql
+        self.params = params
+        self.use_cache = use_cache
+        self.result = None
+        self.cancelled = False
+        self.started_at = None
+        self.finished_at = None
+        self._thread = None
+        self._start_steps = 0
+
+    def start(self):
+        """Start executing the statement"""
+        self.started_at = time.perf_counter()
+        self._start_steps = self.db.vm_steps
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        connection = self.db.connection
+        self.db.running_query = self
+        try:
+            result = self.db.stream_sql(self.sql, self.params, use_cache=self.use_cache)
+            if hasattr(result, 'has_more'):
+                # Fetch the first batch here so the UI never waits on it
+                result.has_more()
+            self.result = result
+        finally:
+            if self.db.running_query is self:
+                self.db.running_query = None
+            if self.cancelled:
+                if hasattr(self.result, 'close'):
+                    self.result.close()
+                self.result = "Query cancelled"
+                try:
+                    if connection.in_transaction:
+                        connection.rollback()
+                except sqlite3.Error:
+                    pass
+            self.finished_at = time.perf_counter()
+
+    def is_done(self):
+        """Check whether the worker has finished"""
+        return self._thread is not None and not self._thread.is_alive()
+
+    def wait(self, timeout=None):
+        """Block until the worker finishes (or the timeout expires)"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.is_done()
+
+    def cancel(self):
+        """Ask SQLite to abort the running statement (nothing to do once it finished)"""
+        if self.is_done():
+            return
+        # The progress handler also aborts the statement, in case interrupt() races with it starting
+        self.cancelled = True
+        if self.db.connection:
+            self.db.connection.interrupt()
+
+    @property
+    def steps(self):
+        """VM steps executed since the query started"""
+        return self.db.vm_steps - self._start_steps
+
+    @property
+    def elapsed(self):
+        """Seconds since the query started (or its total run time once done)"""
+        if self.started_at is None:
+            return 0.0
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return end - self.started_at
+
+
+class BackgroundFetch(BackgroundQuery):
+    """Fetches the next rows of a ResultStream on a worker thread
+
+    result is the list of rows fetched. After a cancel it holds the rows
+    read so far, and the stream is closed with its error set.
+    """
+
+    def __init__(self, db_manager, stream, count):
+        super().__init__(db_manager, None)
+        self.stream = stream
+        self.count = count
+
+    def _run(self):
+        self.db.running_query = self
+        rows = []
+        try:
+            for row in self.stream:
+                rows.append(row)
+                if len(rows) >= self.count:
+                    break
+            # Look ahead so the UI knows whether more rows follow without fetching itself
+            self.stream.has_more()
+        finally:
+            if self.db.running_query is self:
+                self.db.running_query = None
+            if self.cancelled:
+                self.stream.error = "Query cancelled"
+                self.stream.close()
+            self.result = rows
+            self.finished_at = time.perf_counter()
+
+
+class BackgroundConnect:
+    """Opens a database and loads its table list on a worker thread
+
+    state goes from 'connecting' to 'loading' (schema and table list)
+    and ends as 'ready', 'failed' (see error) or 'missing' when
+    require_file is set and the file does not exist.
+    """
+
+    def __init__(self, db_manager, db_path, db_name, profile=None, require_file=False):
+        self.db = db_manager
+        self.db_path = db_path
+        self.db_name = db_name
+        self.profile = profile
+        self.require_file = require_file
+        self.state = 'connecting'
+        self.error = None
+        self.table_count = None
+        self.started_at = None
+        self.finished_at = None
+        self._thread = None
+
+    def start(self):
+        """Start connecting"""
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            # Even a stat can block on a network mount, so it is done here too
+            if self.require_file and not os.path.exists(self.db_path):
+                self.state = 'missing'
+                return
+            try:
+                connection = open_connection(self.db_path, self.profile, check_same_thread=False)
+            except (sqlite3.Error, ValueError) as e:
+                self.error = f"Connection error: {e}"
+                self.state = 'failed'
+                return
+            self.state = 'loading'
+            self.db.use_connection(connection, self.db_path, self.db_name, self.profile)
+            # Reading the schema pulls its pages from disk into the page cache
+            self.table_count = len(self.db.catalog.get_tables())
+            self.state = 'ready'
+        finally:
+            self.finished_at = time.perf_counter()
+
+    def is_done(self):
+        """Check whether the worker has finished"""
+        return self._thread is not None and not self._thread.is_alive()
+
+    def wait(self, timeout=None):
+        """Block until the worker finishes (or the timeout expires)"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.is_done()
+
+    @property
+    def elapsed(self):
+        """Seconds spent connecting so far"""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.perf_counter()) - self.started_at
@@ -0,0 +1,89 @@
+"""
+Query result cache for Loula's SQLite Viewer
+
+Keeps complete results of read-only queries in a memory-bounded LRU.
+Entries are keyed on the database path, SQL text, parameters and the
+database's change markers (PRAGMA data_version, local writes and file
+mtime), so re-running an unchanged query against an unchanged database
+is answered from memory.
+"""
+
+import os
+import re
+import sys
+from collections import OrderedDict
+from collections.abc import Mapping
+
+
+# Statements whose results may be reused; anything else always runs
+_READ_ONLY_PREFIX = re.compile(r"^\s*(SELECT|VALUES)\b", re.IGNORECASE)
+# Functions whose results change between runs even if the data does not
+_VOLATILE = re.compile(r"random|'now'|current_(date|time|timestamp)|changes\s*\(", re.IGNORECASE)
+
+
+def estimate_row_size(row):
+    """Rough memory footprint of a result row in bytes"""
+    return sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
+
+
+class QueryResultCache:
+    """Memory-bounded LRU of complete query results"""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, max_entry_fraction=0.25):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = int(max_bytes * max_entry_fraction)
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def is_cacheable(sql):
+        """Check whether a statement is a deterministic read-only query"""
+        return bool(_READ_ONLY_PREFIX.match(sql)) and not _VOLATILE.search(sql)
+
+    @staticmethod
+    def make_key(db_manager, sql, params=None):
+        """Build the cache key for a statement against the current database state"""
+        try:
+            mtime = os.path.getmtime(db_manager.db_path)
+        except (OSError, TypeError):
+            mtime = None
+        return (
+            db_manager.db_path,
+            sql.strip(),
+            # Named parameters are keyed on their values too, not just the names
+            tuple(sorted(params.items())) if isinstance(params, Mapping) else tuple(params or ()),
+            db_manager.get_data_version(),
+            db_manager.write_generation,
+            mtime,
+        )
+
+    def get(self, key):
+        """Return (columns, rows) for a key, or None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0], entry[1]
+
+    def put(self, key, columns, rows, size_bytes):
+        """Store a complete result, evicting least recently used entries"""
+        if size_bytes > self.max_entry_bytes:
+            return
+        if key in self._entries:
+            self.size_bytes -= self._entries.pop(key)[2]
+        self._entries[key] = (columns, rows, size_bytes)
+        self.size_bytes += size_bytes
+        while self.size_bytes > self.max_bytes and self._entries:
+            self.size_bytes -= self._entries.popitem(last=False)[1][2]
+
+    def clear(self):
+        """Drop every cached result"""
+        self._entries.clear()
+        self.size_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
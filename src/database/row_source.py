@@ -0,0 +1,451 @@
+"""
+Windowed row source for Loula's SQLite Viewer
+
+Fetches table rows one page at a time using keyset pagination on the
+rowid (or primary key), so paging cost does not grow with table size.
+A row source can be limited to a subset of columns, so wide tables only
+read the columns that are on screen, and filtered or sorted with
+WHERE/ORDER BY clauses that SQLite evaluates (using indexes where it can).
+"""
+
+import re
+import sqlite3
+from collections import OrderedDict
+
+
+# Operators accepted in browser filters; the IS [NOT] NULL forms take no value
+FILTER_OPERATORS = ('=', '!=', '<', '<=', '>', '>=', 'LIKE', 'NOT LIKE', 'GLOB', 'IS NULL', 'IS NOT NULL')
+_FILTER_PATTERN = re.compile(
+    r'^\s*("(?:[^"]|"")+"|[^\s=!<>]+)\s*'
+    r'(<=|>=|!=|<>|==|=|<|>|NOT\s+LIKE\b|LIKE\b|GLOB\b|IS\s+NOT\s+NULL\b|IS\s+NULL\b)\s*(.*?)\s*$',
+    re.IGNORECASE
+)
+# Record previews select three expressions per column; SQLite allows 2000 result columns
+PREVIEW_COLUMNS_PER_QUERY = 600
+
+
+def quote_identifier(name):
+    """Quote an identifier for safe use in SQL text"""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def parse_filter(text, column_names):
+    """Parse "column op value" into a (column, operator, value) filter
+
+    Quoted values are taken literally, unquoted numbers become numbers.
+    Raises ValueError for unknown columns or operators.
+    """
+    match = _FILTER_PATTERN.match(text)
+    if not match:
+        raise ValueError(f"expected 'column operator value', operators: {' '.join(FILTER_OPERATORS)}")
+    column, operator, value = match.groups()
+    if column.startswith('"'):
+        column = column[1:-1].replace('""', '"')
+    names = {name.lower(): name for name in column_names}
+    if column.lower() not in names:
+        raise ValueError(f"no such column: {column}")
+    column = names[column.lower()]
+
+    operator = ' '.join(operator.upper().split())
+    operator = {'<>': '!=', '==': '='}.get(operator, operator)
+    if operator in ('IS NULL', 'IS NOT NULL'):
+        if value:
+            raise ValueError(f"{operator} takes no value")
+        return column, operator, None
+    if not value:
+        raise ValueError(f"missing value after {operator}")
+
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+        value = value[1:-1]
+    else:
+        for convert in (int, float):
+            try:
+                value = convert(value)
+                break
+            except ValueError:
+                continue
+    return column, operator, value
+
+
+def parse_sort(text, column_names):
+    """Parse "column [asc|desc]" into a (column, descending) sort"""
+    parts = text.rsplit(None, 1)
+    descending = False
+    if len(parts) == 2 and parts[1].lower() in ('asc', 'desc'):
+        text, descending = parts[0], parts[1].lower() == 'desc'
+    column = text.strip()
+    if column.startswith('"') and column.endswith('"') and len(column) > 1:
+        column = column[1:-1].replace('""', '"')
+    names = {name.lower(): name for name in column_names}
+    if column.lower() not in names:
+        raise ValueError(f"no such column: {column}")
+    return names[column.lower()], descending
+
+
+def describe_query(filters, sort):
+    """Human readable WHERE/ORDER BY summary of a row source query"""
+    parts = []
+    if filters:
+        conditions = []
+        for column, operator, value in filters:
+            if value is None:
+                conditions.append(f"{column} {operator}")
+            else:
+                conditions.append(f"{column} {operator} {value!r}")
+        parts.append("where " + " and ".join(conditions))
+    if sort:
+        parts.append(f"order by {sort[0]}" + (" desc" if sort[1] else ""))
+    return " ".join(parts)
+
+
+class TableRowSource:
+    """Page-oriented, cached view over the rows of a single table"""
+
+    def __init__(self, db_manager, table_name, page_size, prefetch_pages=2, max_cached_pages=16,
+                 columns=None, filters=None, sort=None, preview_length=None):
+        self.db = db_manager
+        self.table_name = table_name
+        # Column names to select, or None for all columns
+        self.columns = list(columns) if columns is not None else None
+        # (column, operator, value) conditions joined with AND
+        self.filters = list(filters or [])
+        # (column, descending) or None for key order
+        self.sort = sort
+        # Cut TEXT/BLOB values to this many characters/bytes in SQL, or None for full values
+        self.preview_length = preview_length
+        # Error of the last fetch, if it failed
+        self.error = None
+        self._plan_hints = None
+        self.page_size = max(1, page_size)
+        self.prefetch_pages = max(0, prefetch_pages)
+        self.max_cached_pages = max(1 + self.prefetch_pages, max_cached_pages)
+
+        # page index -> list of rows (without key columns)
+        self._pages = OrderedDict()
+        # page index -> key tuple of every row on that page
+        self._page_keys = {}
+        # page index -> key tuple of the last row on that page
+        self._last_keys = {}
+        # index of the last page, once the end of the table has been seen
+        self._last_page = None
+
+        self.key_columns = self._detect_key_columns()
+
+    def _detect_key_columns(self):
+        """Pick the columns used for keyset pagination
+
+        Returns a list of SQL expressions, or an empty list when the
+        relation has no usable key (e.g. views), in which case pages are
+        fetched with LIMIT/OFFSET.
+        """
+        if not self.db.connection:
+            return []
+        try:
+            row = self.db.connection.execute(
+                "SELECT type FROM sqlite_master WHERE name = ?", (self.table_name,)
+            ).fetchone()
+        except sqlite3.Error:
+            row = None
+        if row and row[0] == 'view':
+            return []
+
+        schema = self.db.get_table_schema(self.table_name)
+        column_names = {col[1].lower() for col in schema}
+        quoted = quote_identifier(self.table_name)
+
+        # Prefer the implicit rowid under whichever alias is not shadowed
+        for alias in ('rowid', '_rowid_', 'oid'):
+            if alias in column_names:
+                continue
+            try:
+                self.db.connection.execute(f"SELECT {alias} FROM {quoted} LIMIT 0")
+                return [alias]
+            except sqlite3.Error:
+                break
+
+        # WITHOUT ROWID tables always have a primary key
+        pk_columns = sorted((col for col in schema if col[5]), key=lambda col: col[5])
+        return [quote_identifier(col[1]) for col in pk_columns]
+
+    @property
+    def _anchor_count(self):
+        """Number of leading anchor values (sort value and key) in fetched rows"""
+        if not self.key_columns:
+            return 0
+        return len(self.key_columns) + (1 if self.sort else 0)
+
+    def _filter_clause(self):
+        """Build the filter conditions and their parameters"""
+        conditions = []
+        params = []
+        for column, operator, value in self.filters:
+            if value is None:
+                conditions.append(f"{quote_identifier(column)} {operator}")
+            else:
+                conditions.append(f"{quote_identifier(column)} {operator} ?")
+                params.append(value)
+        return conditions, params
+
+    def _after_clause(self, after_key):
+        """Build the keyset condition selecting rows after an anchor
+
+        Without a sort this compares the key; with a sort it compares
+        (sort column, key), taking care of NULLs, which SQLite puts
+        first in ascending and last in descending order.
+        """
+        keys = self.key_columns
+        key_expr = keys[0] if len(keys) == 1 else f"({', '.join(keys)})"
+        key_placeholders = '?' if len(keys) == 1 else f"({', '.join('?' for _ in keys)})"
+        if not self.sort:
+            return f"{key_expr} > {key_placeholders}", list(after_key)
+
+        column = quote_identifier(self.sort[0])
+        descending = self.sort[1]
+        value, key_values = after_key[0], list(after_key[1:])
+        if value is None:
+            if descending:
+                return f"({column} IS NULL AND {key_expr} < {key_placeholders})", key_values
+            return f"(({column} IS NULL AND {key_expr} > {key_placeholders}) OR {column} IS NOT NULL)", key_values
+        row_value = f"({column}, {', '.join(keys)}) {'<' if descending else '>'} ({', '.join('?' for _ in range(len(keys) + 1))})"
+        if descending:
+            return f"({row_value} OR {column} IS NULL)", [value] + key_values
+        return row_value, [value] + key_values
+
+    def _select_expression(self, name):
+        """Column expression for the page query, cut to a preview when configured"""
+        column = quote_identifier(name)
+        if self.preview_length is None:
+            return column
+        return (f"CASE WHEN typeof({column}) IN ('text', 'blob') "
+                f"THEN substr({column}, 1, {int(self.preview_length)}) ELSE {column} END")
+
+    def _build_query(self, page_index, after_key, limit):
+        """Build the SELECT for limit rows starting at page_index (or after after_key)"""
+        quoted = quote_identifier(self.table_name)
+        if self.columns is not None:
+            projection = ', '.join(self._select_expression(name) for name in self.columns) or 'NULL'
+        else:
+            projection = '*'
+        conditions, params = self._filter_clause()
+        direction = " DESC" if self.sort and self.sort[1] else ""
+
+        if self.key_columns:
+            key_list = ', '.join(self.key_columns)
+            anchors = key_list
+            order = ', '.join(f"{key}{direction}" for key in self.key_columns)
+            if self.sort:
+                anchors = f"{quote_identifier(self.sort[0])}, {key_list}"
+                order = f"{quote_identifier(self.sort[0])}{direction}, {order}"
+            sql = f"SELECT {anchors}, {projection} FROM {quoted}"
+            if after_key is not None:
+                condition, after_params = self._after_clause(after_key)
+                conditions.append(condition)
+                params.extend(after_params)
+            if conditions:
+                sql += " WHERE " + " AND ".join(conditions)
+            sql += f" ORDER BY {order} LIMIT ?"
+            params.append(limit)
+        else:
+            sql = f"SELECT {projection} FROM {quoted}"
+            if conditions:
+                sql += " WHERE " + " AND ".join(conditions)
+            if self.sort:
+                sql += f" ORDER BY {quote_identifier(self.sort[0])}{direction}"
+            sql += " LIMIT ? OFFSET ?"
+            params.extend([limit, page_index * self.page_size])
+        return sql, params
+
+    def _fetch(self, page_index, after_key):
+        """Run a single query starting at page_index, filling the cache"""
+        pages_to_fetch = 1 + self.prefetch_pages
+        limit = self.page_size * pages_to_fetch
+        anchor_count = self._anchor_count
+        sql, params = self._build_query(page_index, after_key, limit)
+
+        try:
+            cursor = self.db.connection.execute(sql, params)
+            rows = cursor.fetchall()
+            self.error = None
+        except sqlite3.Error as e:
+            self.error = f"Error: {e}"
+            rows = []
+
+        for offset in range(pages_to_fetch):
+            index = page_index + offset
+            chunk = rows[offset * self.page_size:(offset + 1) * self.page_size]
+            if not chunk:
+                if offset == 0:
+                    self._last_page = page_index - 1
+                break
+            self._store_page(index, chunk, anchor_count)
+            if len(chunk) < self.page_size:
+                self._last_page = index
+                break
+
+    def _store_page(self, index, rows, key_count):
+        """Cache one page, remembering its last key for the next fetch"""
+        if key_count:
+            keys = [tuple(row[:key_count]) for row in rows]
+            self._last_keys[index] = keys[-1]
+            self._page_keys[index] = keys
+            rows = [row[key_count:] for row in rows]
+        self._pages[index] = rows
+        self._pages.move_to_end(index)
+        while len(self._pages) > self.max_cached_pages:
+            evicted, _ = self._pages.popitem(last=False)
+            self._page_keys.pop(evicted, None)
+
+    def _anchor_for(self, page_index):
+        """Return (start_page, after_key) for the nearest known anchor"""
+        if page_index == 0 or not self.key_columns:
+            return page_index, None
+        for index in range(page_index - 1, -1, -1):
+            if index in self._last_keys:
+                return index + 1, self._last_keys[index]
+        return 0, None
+
+    def get_page(self, page_index):
+        """Return the rows of the given page (cached when possible)"""
+        if page_index < 0:
+            return []
+        if self._last_page is not None and page_index > self._last_page:
+            return []
+
+        while page_index not in self._pages:
+            start, after_key = self._anchor_for(page_index)
+            self._fetch(start, after_key)
+            if start not in self._pages:
+                return []
+            if self._last_page is not None and page_index > self._last_page:
+                return []
+
+        self._pages.move_to_end(page_index)
+        return self._pages[page_index]
+
+    def has_page(self, page_index):
+        """Check whether a page exists without fetching beyond it"""
+        return bool(self.get_page(page_index))
+
+    def set_columns(self, columns):
+        """Change the selected columns
+
+        Cached pages are dropped, but page anchors are kept: the rows on
+        each page stay the same, so scrolling sideways deep into a table
+        is still a single keyset query.
+        """
+        columns = list(columns) if columns is not None else None
+        if columns != self.columns:
+            self.columns = columns
+            self._pages.clear()
+            self._page_keys.clear()
+
+    def set_query(self, filters=None, sort=None):
+        """Change the filter conditions and sort order, starting over from the first page"""
+        filters = list(filters or [])
+        if filters != self.filters or sort != self.sort:
+            self.filters = filters
+            self.sort = sort
+            self.invalidate()
+
+    def plan_hints(self):
+        """Warnings about the current filter/sort that SQLite cannot serve from an index"""
+        if self._plan_hints is not None:
+            return self._plan_hints
+        hints = []
+        if self.filters or self.sort:
+            sql, params = self._build_query(0, None, self.page_size)
+            plan = self.db.explain_query_plan(sql, params)
+            details = [] if isinstance(plan, str) else [row[2] for row in plan]
+            if self.sort and any('TEMP B-TREE' in detail for detail in details):
+                hints.append(f"no index on {self.sort[0]}: sorting needs a full scan")
+            elif self.filters and any(detail.startswith('SCAN') and 'INDEX' not in detail for detail in details):
+                indexed = {name.lower() for name in self.db.catalog.get_indexed_columns(self.table_name)}
+                usable = [column for column, _, _ in self.filters if column.lower() in indexed]
+                if usable:
+                    hints.append(f"filter scans in key order; sort by {usable[0]} to use its index")
+                else:
+                    columns = ', '.join(dict.fromkeys(column for column, _, _ in self.filters))
+                    hints.append(f"no index on {columns}: filter scans the whole table")
+        self._plan_hints = hints
+        return hints
+
+    def row_clause(self, page_index, row_index):
+        """SQL clause and parameters selecting one row of a cached page
+
+        Returns (clause, params, rowid); rowid is None unless the row
+        source pages on the rowid. Relations without a key (views) are
+        addressed by position under the current filter and sort.
+        """
+        if self.key_columns:
+            # Stored anchors start with the sort value when sorted
+            key = self._page_keys[page_index][row_index][-len(self.key_columns):]
+            key_list = ', '.join(self.key_columns)
+            placeholders = ', '.join('?' for _ in self.key_columns)
+            rowid = key[0] if self.key_columns[0] in ('rowid', '_rowid_', 'oid') else None
+            return f"WHERE ({key_list}) = ({placeholders})", list(key), rowid
+
+        conditions, params = self._filter_clause()
+        clause = " WHERE " + " AND ".join(conditions) if conditions else ""
+        if self.sort:
+            clause += f" ORDER BY {quote_identifier(self.sort[0])}{' DESC' if self.sort[1] else ''}"
+        clause += " LIMIT 1 OFFSET ?"
+        params.append(page_index * self.page_size + row_index)
+        return clause, params, None
+
+    def get_record_preview(self, page_index, row_index, preview_length=256):
+        """Describe every column of a row without loading large values
+
+        Returns a list of (value, type, length) per column, where TEXT and
+        BLOB values are cut to preview_length and length is the full size
+        in characters (TEXT) or bytes (BLOB), or None if the row is gone.
+        """
+        rows = self.get_page(page_index)
+        if row_index < 0 or row_index >= len(rows):
+            return None
+        columns = [col[1] for col in self.db.get_table_schema(self.table_name)]
+        row_clause, params, _ = self.row_clause(page_index, row_index)
+        record = []
+        # Very wide tables are read in several queries to stay under SQLite's column limit
+        for start in range(0, len(columns), PREVIEW_COLUMNS_PER_QUERY):
+            parts = []
+            for name in columns[start:start + PREVIEW_COLUMNS_PER_QUERY]:
+                column = quote_identifier(name)
+                parts.append(
+                    f"CASE WHEN typeof({column}) IN ('text', 'blob') "
+                    f"THEN substr({column}, 1, {int(preview_length)}) ELSE {column} END, "
+                    f"typeof({column}), length({column})"
+                )
+            sql = f"SELECT {', '.join(parts)} FROM {quote_identifier(self.table_name)} {row_clause}"
+            try:
+                row = self.db.connection.execute(sql, params).fetchone()
+            except sqlite3.Error:
+                return None
+            if row is None:
+                return None
+            record.extend(tuple(row[i:i + 3]) for i in range(0, len(row), 3))
+        return record
+
+    def page_anchor(self, page_index):
+        """The key a page starts after, or None for the first or an unknown page
+
+        Saved with the browser session, it lets seed_anchor() reopen the
+        page later with a single keyset query.
+        """
+        if page_index <= 0 or not self.key_columns:
+            return None
+        return self._last_keys.get(page_index - 1)
+
+    def seed_anchor(self, page_index, after_key):
+        """Make page_index start after a previously saved key"""
+        if page_index <= 0 or after_key is None or len(after_key) != self._anchor_count:
+            return False
+        self._last_keys[page_index - 1] = tuple(after_key)
+        return True
+
+    def invalidate(self):
+        """Drop all cached pages, e.g. after the table was modified"""
+        self._pages.clear()
+        self._page_keys.clear()
+        self._last_keys.clear()
+        self._last_page = None
+        self._plan_hints = None
@@ -0,0 +1,203 @@
+"""
+Table statistics cache for Loula's SQLite Viewer
+
+Row counts and sizes are expensive on large tables, so they are computed
+once per table on a background thread and cached until the database
+changes (detected through PRAGMA data_version and local writes). The
+work runs on connections from DatabaseManager's read-only pool, and
+statistics for every table can be gathered in parallel.
+"""
+
+import os
+import sqlite3
+import threading
+
+from .row_source import quote_identifier
+
+
+class TableStatsCache:
+    """Caches per-table statistics computed on a worker thread"""
+
+    def __init__(self, db_manager):
+        self.db = db_manager
+        self._stats = {}
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._version = None
+        # (table_name, version) for the worker; a newer request replaces it
+        self._request = None
+        self._worker = None
+
+    def _current_version(self):
+        return (self.db.db_path, self.db.get_data_version(), self.db.write_generation)
+
+    def _check_version(self):
+        """Drop cached statistics if the database changed since they were computed"""
+        version = self._current_version()
+        if version != self._version:
+            with self._lock:
+                self._stats.clear()
+                self._pending.clear()
+                self._request = None
+                self._version = version
+
+    def get(self, table_name):
+        """Return cached statistics for a table, or None while they are computed
+
+        The first call for a table schedules the computation on the
+        worker thread; later calls return the result once it is ready.
+        Only the most recent table waits for the worker: asking for
+        another one drops a request that has not started yet.
+        """
+        if not self.db.connection or not self.db.db_path:
+            return None
+        self._check_version()
+        with self._lock:
+            if table_name in self._stats:
+                return self._stats[table_name]
+            if table_name in self._pending:
+                return None
+            if self._request is not None:
+                self._pending.discard(self._request[0])
+            self._pending.add(table_name)
+            self._request = (table_name, self._version)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, daemon=True)
+                self._worker.start()
+        return None
+
+    def is_pending(self):
+        """Check whether any statistics are still being computed"""
+        with self._lock:
+            return bool(self._pending)
+
+    def invalidate(self, table_name=None):
+        """Forget statistics for one table, or for all tables"""
+        with self._lock:
+            if table_name is None:
+                self._stats.clear()
+            else:
+                self._stats.pop(table_name, None)
+
+    def _run(self):
+        """Worker: compute requested statistics until no request is left"""
+        while True:
+            with self._lock:
+                request, self._request = self._request, None
+                if request is None:
+                    self._worker = None
+                    return
+            self._compute(*request)
+
+    def _compute(self, table_name, version):
+        """Gather statistics on a pooled read-only connection"""
+        stats = self.empty_stats()
+        pool = self.db.get_pool()
+        if pool is not None and os.path.exists(version[0]):
+            try:
+                with pool.connection() as connection:
+                    stats.update(self._collect(connection, table_name))
+            except (sqlite3.Error, ValueError):
+                pass
+
+        with self._lock:
+            self._pending.discard(table_name)
+            if self._version == version:
+                self._stats[table_name] = stats
+
+    def collect_all(self, tables=None, progress=None):
+        """Compute statistics for many tables in parallel, returning {table_name: stats}
+
+        Tables with cached statistics are not recomputed. progress is
+        passed on to ParallelExecutor.map_tables.
+        """
+        if not self.db.connection:
+            return {}
+        tables = list(tables if tables is not None else self.db.get_tables())
+        self._check_version()
+        with self._lock:
+            version = self._version
+            missing = [name for name in tables if name not in self._stats]
+
+        def collect(connection, table_name):
+            stats = self.empty_stats()
+            stats.update(self._collect(connection, table_name))
+            return stats
+
+        for table_name, stats in self.db.map_tables(collect, missing, progress).items():
+            if isinstance(stats, str):
+                stats = dict(self.empty_stats(), error=stats)
+            with self._lock:
+                if self._version == version:
+                    self._stats[table_name] = stats
+        with self._lock:
+            return {name: self._stats.get(name, self.empty_stats()) for name in tables}
+
+    def snapshot(self):
+        """Statistics computed so far, {table_name: stats}, without failed ones"""
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items() if 'error' not in stats}
+
+    def seed(self, stats):
+        """Use statistics saved earlier for an unchanged file instead of recomputing them"""
+        if not self.db.connection:
+            return
+        self._check_version()
+        with self._lock:
+            for table_name, table_stats in stats.items():
+                self._stats.setdefault(table_name, dict(self.empty_stats(), **table_stats))
+
+    @staticmethod
+    def empty_stats():
+        return {'row_count': None, 'page_count': None, 'size_bytes': None, 'indexes': []}
+
+    @staticmethod
+    def _collect(connection, table_name):
+        """Run the statistics queries for one table"""
+        quoted = quote_identifier(table_name)
+        stats = {}
+        stats['row_count'] = connection.execute(f"SELECT COUNT(*) FROM {quoted}").fetchone()[0]
+
+        try:
+            stats['indexes'] = [row[1] for row in connection.execute(f"PRAGMA index_list({quoted})")]
+        except sqlite3.Error:
+            stats['indexes'] = []
+
+        # dbstat is an optional compile-time extension
+        try:
+            pages, size = connection.execute(
+                "SELECT COUNT(*), SUM(pgsize) FROM dbstat WHERE name = ?", (table_name,)
+            ).fetchone()
+            if pages:
+                stats['page_count'] = pages
+                stats['size_bytes'] = size
+        except sqlite3.Error:
+            pass
+        return stats
+
+
+def file_signature(db_path):
+    """Size and modification time of a database file and its WAL
+
+    Saved statistics are only reused while the signature is unchanged.
+    """
+    signature = []
+    for path in (db_path, db_path + '-wal'):
+        try:
+            info = os.stat(path)
+            signature.append([info.st_size, info.st_mtime_ns])
+        except OSError:
+            signature.append(None)
+    return signature
+
+
+def format_size(size_bytes):
+    """Format a byte count for display"""
+    if size_bytes is None:
+        return "?"
+    size = float(size_bytes)
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
@@ -0,0 +1,399 @@
+"""
+Index advisor for Loula's SQLite Viewer
+
+Looks at executed statements (the query history and recent profiles),
+runs EXPLAIN QUERY PLAN on each and, where SQLite scans a whole table,
+builds an automatic index or sorts through a temp B-tree, proposes an
+index on the columns the statement filters or orders on. Like the
+sqlite3 shell's .expert command, each candidate is created on an empty
+in-memory copy of the schema and only kept if the planner picks it.
+The gain of a recommendation can be estimated by timing its statements
+on an in-memory sample of the data with and without the index.
+"""
+
+import re
+import sqlite3
+import time
+
+from src.database.connection import connection_uri
+from src.database.row_source import quote_identifier
+
+
+# Rows per table copied into the in-memory sample used to estimate gains
+GAIN_SAMPLE_ROWS = 100000
+
+_TOKEN = re.compile(
+    r"""\s+|--[^\n]*|/\*.*?\*/|'(?:[^']|'')*'|"(?:[^"]|"")*"|`(?:[^`]|``)*`|\[[^\]]*\]"""
+    r"""|[A-Za-z_][\w$]*|\d+(?:\.\d*)?|[?:@$]\w*|<=|>=|<>|!=|==|\|\||\S""",
+    re.S
+)
+
+# Keywords that end a table alias or start a new clause
+_KEYWORDS = {
+    'SELECT', 'FROM', 'WHERE', 'GROUP', 'ORDER', 'BY', 'HAVING', 'LIMIT', 'OFFSET', 'JOIN', 'INNER',
+    'LEFT', 'RIGHT', 'FULL', 'OUTER', 'CROSS', 'NATURAL', 'ON', 'USING', 'AS', 'UNION', 'EXCEPT',
+    'INTERSECT', 'AND', 'OR', 'NOT', 'SET', 'UPDATE', 'DELETE', 'INTO', 'VALUES', 'WINDOW', 'INDEXED',
+    'RETURNING',
+}
+_EQUALITY = {'=', '==', 'IN', 'IS'}
+_RANGE = {'<', '>', '<=', '>=', 'BETWEEN', 'LIKE', 'GLOB'}
+_ADVISED_STATEMENTS = ('SELECT', 'WITH', 'UPDATE', 'DELETE')
+
+
+def tokenize(sql):
+    """Split a statement into (kind, text) tokens, dropping whitespace and comments
+
+    kind is 'name' for identifiers (quotes removed), 'string' for
+    literals and 'symbol' for everything else. Keywords are names.
+    """
+    tokens = []
+    for match in _TOKEN.finditer(sql):
+        text = match.group()
+        if text[0].isspace() or text.startswith('--') or text.startswith('/*'):
+            continue
+        if text[0] == "'":
+            tokens.append(('string', text))
+        elif text[0] in '"`':
+            tokens.append(('name', text[1:-1].replace(text[0] * 2, text[0])))
+        elif text[0] == '[':
+            tokens.append(('name', text[1:-1]))
+        elif text[0].isalpha() or text[0] == '_':
+            tokens.append(('name', text))
+        else:
+            tokens.append(('symbol', text))
+    return tokens
+
+
+def explain(connection, sql):
+    """EXPLAIN QUERY PLAN details of a statement, binding NULL to its '?' parameters"""
+    try:
+        return [row[-1] for row in connection.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()]
+    except sqlite3.ProgrammingError as e:
+        count = re.search(r"uses (\d+)", str(e))
+        if not count:
+            raise
+        params = [None] * int(count.group(1))
+        return [row[-1] for row in connection.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()]
+
+
+def index_name(table_name, columns):
+    """Name for a recommended index"""
+    return re.sub(r'\W+', '_', f"idx_{table_name}_{'_'.join(columns)}").lower()
+
+
+class IndexAdvisor:
+    """Recommends indexes for statements that scan or sort whole tables"""
+
+    def __init__(self, db_manager):
+        self.db = db_manager
+
+    def collect_statements(self, history=None):
+        """Statements worth advising on: the query history for this database plus recent profiles"""
+        statements = list(history.get_statements(self.db.db_path)) if history else []
+        statements.extend(profile.sql for profile in self.db.profiler.history)
+        advised = []
+        for sql in dict.fromkeys(sql.strip().rstrip(';') for sql in statements if sql):
+            words = sql.split(None, 1)
+            if words and words[0].upper() in _ADVISED_STATEMENTS:
+                advised.append(sql)
+        return advised
+
+    def _tables(self):
+        """{lower-case table name: (table name, [column names])}
+
+        An INTEGER PRIMARY KEY is left out: it is the rowid, which every
+        index already ends with.
+        """
+        tables = {}
+        for name in self.db.catalog.get_tables():
+            columns = self.db.catalog.get_columns(name)
+            keys = [col for col in columns if col[5]]
+            rowid_alias = keys[0][1] if len(keys) == 1 and keys[0][2].upper() == 'INTEGER' else None
+            tables[name.lower()] = (name, [col[1] for col in columns if col[1] != rowid_alias])
+        return tables
+
+    def usage(self, sql, tables):
+        """Columns a statement compares or orders on, per table alias
+
+        Returns {alias: {'table', 'equality', 'range', 'order', 'group'}}
+        with column lists in the order they appear.
+        """
+        tokens = tokenize(sql)
+        upper = [text.upper() if kind == 'name' else text for kind, text in tokens]
+        aliases = {}
+
+        # Tables follow FROM, JOIN, UPDATE and INTO, and commas inside a FROM list
+        in_from = False
+        for i, word in enumerate(upper):
+            if word in ('FROM', 'JOIN', 'UPDATE', 'INTO'):
+                in_from = word in ('FROM', 'JOIN')
+            elif word == ',' and in_from:
+                pass
+            else:
+                if word in _KEYWORDS and word not in ('AS', 'INNER', 'LEFT', 'CROSS', 'OUTER', 'NATURAL'):
+                    in_from = False
+                continue
+            candidate = i + 1
+            if candidate >= len(tokens) or tokens[candidate][0] != 'name':
+                continue
+            entry = tables.get(tokens[candidate][1].lower())
+            if entry is None:
+                continue
+            alias = entry[0]
+            following = candidate + 1
+            if following < len(tokens) and upper[following] == 'AS':
+                following += 1
+            if following < len(tokens) and tokens[following][0] == 'name' and upper[following] not in _KEYWORDS:
+                alias = tokens[following][1]
+            aliases[alias.lower()] = {'table': entry[0], 'columns': {c.lower(): c for c in entry[1]},
+                                      'equality': [], 'range': [], 'order': [], 'group': []}
+        if not aliases:
+            return {}
+
+        clause = None
+        i = 0
+        while i < len(tokens):
+            word = upper[i]
+            if word in ('WHERE', 'ON'):
+                clause = 'filter'
+            elif word in ('ORDER', 'GROUP') and i + 1 < len(tokens) and upper[i + 1] == 'BY':
+                clause = word.lower()
+                i += 2
+                continue
+            elif word in ('SELECT', 'FROM', 'HAVING', 'LIMIT', 'UNION', 'EXCEPT', 'INTERSECT', 'SET',
+                          'RETURNING', 'WINDOW', 'JOIN'):
+                clause = None
+            if clause is None or tokens[i][0] != 'name' or word in _KEYWORDS:
+                i += 1
+                continue
+
+            # alias.column or a bare column of exactly one table
+            if i + 2 < len(tokens) and tokens[i + 1][1] == '.' and tokens[i + 2][0] == 'name':
+                owners = [tokens[i][1].lower()] if tokens[i][1].lower() in aliases else []
+                column = tokens[i + 2][1].lower()
+                end = i + 3
+            else:
+                column = tokens[i][1].lower()
+                owners = [alias for alias, info in aliases.items() if column in info['columns']]
+                end = i + 1
+            if len(owners) != 1 or column not in aliases[owners[0]]['columns']:
+                i = end
+                continue
+            info = aliases[owners[0]]
+            name = info['columns'][column]
+            if clause == 'filter':
+                after = upper[end] if end < len(upper) else None
+                if after == 'NOT' and end + 1 < len(upper):
+                    after = None
+                before = upper[i - 1] if i > 0 else None
+                if after in _EQUALITY or before in ('=', '=='):
+                    kind = 'equality'
+                elif after in _RANGE or before in _RANGE:
+                    kind = 'range'
+                else:
+                    kind = None
+                if kind and name not in info[kind]:
+                    info[kind].append(name)
+            elif name not in info[clause]:
+                info[clause].append(name)
+            i = end
+
+        for info in aliases.values():
+            del info['columns']
+        return aliases
+
+    @staticmethod
+    def candidates(info):
+        """Column lists to try for one table, widest first
+
+        Equality columns, then one range column or the sort columns; then
+        narrower variants for when a join keeps the widest one unusable.
+        """
+        equality = list(info['equality'])
+        extra = info['range'][:1] or info['order'] or info['group']
+        candidates = []
+        for columns in [equality + [name for name in extra if name not in equality],
+                        equality, info['range'][:1], info['order'], info['group']] + [[name] for name in equality]:
+            if columns and columns not in candidates:
+                candidates.append(columns)
+        return candidates
+
+    @staticmethod
+    def plan_problems(details):
+        """{alias: reason} for plan lines showing scans, automatic indexes or temp B-trees"""
+        problems = {}
+        for detail in details:
+            match = re.match(r"SCAN (?:TABLE )?(\S+)(?: AS (\S+))?$", detail)
+            if match:
+                problems[(match.group(2) or match.group(1)).lower()] = "full table scan"
+                continue
+            match = re.match(r"SEARCH (?:TABLE )?(\S+)(?: AS (\S+))? USING AUTOMATIC", detail)
+            if match:
+                problems[(match.group(2) or match.group(1)).lower()] = "automatic index"
+                continue
+            match = re.match(r"USE TEMP B-TREE FOR (ORDER BY|GROUP BY)", detail)
+            if match:
+                problems.setdefault('*', f"temp B-tree for {match.group(1)}")
+        return problems
+
+    def _schema_copy(self):
+        """An empty in-memory database with the tables, indexes and statistics of the current one"""
+        copy = sqlite3.connect(':memory:')
+        for sql, in self.db.connection.execute(
+                "SELECT sql FROM sqlite_master WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%' "
+                "ORDER BY type = 'index'"):
+            try:
+                copy.execute(sql)
+            except sqlite3.Error:
+                # Virtual tables from modules this build lacks, triggers on them, ...
+                pass
+        try:
+            stats = self.db.connection.execute("SELECT tbl, idx, stat FROM sqlite_stat1").fetchall()
+        except sqlite3.Error:
+            stats = []
+        if stats:
+            copy.execute("ANALYZE sqlite_master")
+            copy.executemany("INSERT INTO sqlite_stat1 VALUES (?, ?, ?)", stats)
+            copy.execute("ANALYZE sqlite_master")
+        return copy
+
+    def advise(self, statements, progress=None):
+        """Recommend indexes for statements
+
+        Returns a list of recommendations, each a dict with 'table',
+        'columns', 'name', 'sql' (the CREATE INDEX statement), 'reasons'
+        and 'statements', or an error string. progress, if given, is
+        called as progress(done, total).
+        """
+        if not self.db.connection:
+            return "No database connected"
+        try:
+            tables = self._tables()
+            copy = self._schema_copy()
+        except sqlite3.Error as e:
+            return f"Error: {e}"
+
+        recommendations = {}
+        try:
+            for done, sql in enumerate(statements, 1):
+                if progress:
+                    progress(done, len(statements))
+                try:
+                    problems = self.plan_problems(explain(self.db.connection, sql))
+                except sqlite3.Error:
+                    continue
+                if not problems:
+                    continue
+                usage = self.usage(sql, tables)
+                for alias, info in usage.items():
+                    reason = problems.get(alias)
+                    if reason is None and '*' in problems and (info['order'] or info['group']):
+                        reason = problems['*']
+                    if reason is None:
+                        continue
+                    columns = next((columns for columns in self.candidates(info)
+                                    if self._planner_uses(copy, sql, info['table'], columns)), None)
+                    if columns is None:
+                        continue
+                    key = (info['table'], tuple(columns))
+                    entry = recommendations.setdefault(key, {
+                        'table': info['table'],
+                        'columns': columns,
+                        'name': index_name(info['table'], columns),
+                        'reasons': [],
+                        'statements': [],
+                    })
+                    if reason not in entry['reasons']:
+                        entry['reasons'].append(reason)
+                    entry['statements'].append(sql)
+        finally:
+            copy.close()
+
+        results = []
+        for entry in recommendations.values():
+            column_list = ', '.join(quote_identifier(name) for name in entry['columns'])
+            entry['sql'] = (f"CREATE INDEX {quote_identifier(entry['name'])} "
+                            f"ON {quote_identifier(entry['table'])} ({column_list})")
+            results.append(entry)
+        results.sort(key=lambda entry: len(entry['statements']), reverse=True)
+        return results
+
+    @staticmethod
+    def _planner_uses(copy, sql, table_name, columns):
+        """Create a candidate index on the schema copy and check whether the plan picks it"""
+        name = index_name(table_name, columns)
+        column_list = ', '.join(quote_identifier(column) for column in columns)
+        try:
+            copy.execute(f"CREATE INDEX {quote_identifier(name)} ON {quote_identifier(table_name)} ({column_list})")
+        except sqlite3.Error:
+            return False
+        try:
+            return any(name in detail for detail in explain(copy, sql))
+        except sqlite3.Error:
+            return False
+        finally:
+            copy.execute(f"DROP INDEX {quote_identifier(name)}")
+
+    def estimate_gain(self, recommendation, sample_rows=GAIN_SAMPLE_ROWS):
+        """Time a recommendation's statements on an in-memory sample, without and with the index
+
+        Copies up to sample_rows rows of every table into memory. Only
+        statements without parameters can be timed. Returns a dict with
+        'before' and 'after' seconds and 'statements' (the number timed),
+        or an error string.
+        """
+        if not self.db.connection or not self.db.db_path or self.db.db_path == ':memory:':
+            return "Error: gain estimates need a database file"
+        statements = [sql for sql in recommendation['statements']
+                      if not any(kind == 'symbol' and text[0] in '?:@$' for kind, text in tokenize(sql))]
+        if not statements:
+            return "Error: the statements use parameters and cannot be timed"
+
+        sample = sqlite3.connect(':memory:', uri=True)
+        try:
+            immutable = bool(self.db.profile.get('immutable'))
+            sample.execute("ATTACH DATABASE ? AS source",
+                           (connection_uri(self.db.db_path, read_only=True, immutable=immutable),))
+            objects = sample.execute(
+                "SELECT type, name, sql FROM source.sqlite_master WHERE sql IS NOT NULL "
+                "AND name NOT LIKE 'sqlite_%' AND type IN ('table', 'index') ORDER BY type = 'index'"
+            ).fetchall()
+            for kind, name, sql in objects:
+                try:
+                    sample.execute(sql)
+                    if kind == 'table':
+                        sample.execute(f"INSERT INTO main.{quote_identifier(name)} "
+                                       f"SELECT * FROM source.{quote_identifier(name)} LIMIT ?", (sample_rows,))
+                except sqlite3.Error:
+                    continue
+            sample.commit()
+            sample.execute("DETACH DATABASE source")
+
+            before = self._time_statements(sample, statements)
+            sample.execute(recommendation['sql'])
+            after = self._time_statements(sample, statements)
+        except sqlite3.Error as e:
+            return f"Error: {e}"
+        finally:
+            sample.close()
+        return {'before': before, 'after': after, 'statements': len(statements), 'sample_rows': sample_rows}
+
+    @staticmethod
+    def _time_statements(connection, statements):
+        """Seconds to run every statement once; writes are rolled back"""
+        started_at = time.perf_counter()
+        for sql in statements:
+            connection.execute(sql).fetchall()
+            if connection.in_transaction:
+                connection.rollback()
+        return time.perf_counter() - started_at
+
+
+def format_gain(gain):
+    """One-line description of an estimate_gain result"""
+    if isinstance(gain, str):
+        return gain
+    speedup = gain['before'] / gain['after'] if gain['after'] > 0 else 0
+    plural = 's' if gain['statements'] != 1 else ''
+    return (f"{gain['statements']} statement{plural} on up to {gain['sample_rows']:,} rows per table: "
+            f"{gain['before'] * 1000:.1f} ms -> {gain['after'] * 1000:.1f} ms ({speedup:.1f}x)")
@@ -0,0 +1,266 @@
+"""
+Streaming data export for Loula's SQLite Viewer
+
+Writes a table or query result to CSV, JSONL or a compact columnar file
+while pulling rows from a ResultStream, so memory use stays constant
+regardless of the number of rows exported.
+
+Columnar (.lcol) layout, all integers little-endian:
+    magic b"LCOL\\x01"
+    uint32 header length, JSON header {"columns": [names...]}
+    row groups, each:
+        uint32 row count (0 marks the end of the file)
+        per column: 1-byte type code, uint32 payload length, zlib payload
+            b"i" int64 values, b"f" float64 values: null bitmap + packed array
+            b"j" JSON list (blobs encoded as {"$hex": "..."})
+"""
+
+import csv
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+from itertools import islice
+
+from src.database.database import ResultStream
+from src.database.row_source import quote_identifier
+from .importer import format_rate
+
+EXPORT_FORMATS = ('csv', 'jsonl', 'columnar', 'parquet')
+COLUMNAR_MAGIC = b"LCOL\x01"
+
+
+def load_pyarrow():
+    """Import pyarrow for Parquet export, or return None if it is not installed
+
+    Imported on first use: pyarrow takes longer to load than the rest of
+    the viewer together.
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def detect_export_format(file_path):
+    """Guess the export format from the file extension"""
+    ext = os.path.splitext(file_path)[1].lower().lstrip('.')
+    if ext in ('jsonl', 'ndjson', 'json'):
+        return 'jsonl'
+    if ext in ('lcol', 'col', 'columnar'):
+        return 'columnar'
+    if ext == 'parquet':
+        return 'parquet'
+    return 'csv'
+
+
+def _plain_value(value):
+    """Make a value representable in text formats"""
+    if isinstance(value, bytes):
+        return value.hex()
+    return value
+
+
+def _encode_column(values):
+    """Encode one column of a row group, returning (type code, payload)"""
+    non_null = [v for v in values if v is not None]
+    if non_null and all(type(v) is int for v in non_null) and all(-2**63 <= v < 2**63 for v in non_null):
+        code, typecode = b"i", 'q'
+    elif non_null and all(type(v) is float for v in non_null):
+        code, typecode = b"f", 'd'
+    else:
+        data = [{'$hex': v.hex()} if isinstance(v, bytes) else v for v in values]
+        return b"j", json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+    bitmap = bytearray((len(values) + 7) // 8)
+    packed = array(typecode)
+    for i, value in enumerate(values):
+        if value is None:
+            bitmap[i // 8] |= 1 << (i % 8)
+            packed.append(0)
+        else:
+            packed.append(value)
+    if sys.byteorder == 'big':
+        packed.byteswap()
+    return code, bytes(bitmap) + packed.tobytes()
+
+
+def _decode_column(code, payload, row_count):
+    """Inverse of _encode_column"""
+    if code == b"j":
+        return [bytes.fromhex(v['$hex']) if isinstance(v, dict) and '$hex' in v else v
+                for v in json.loads(payload.decode('utf-8'))]
+    mask_len = (row_count + 7) // 8
+    bitmap = payload[:mask_len]
+    packed = array('q' if code == b"i" else 'd')
+    packed.frombytes(payload[mask_len:])
+    if sys.byteorder == 'big':
+        packed.byteswap()
+    return [None if bitmap[i // 8] & (1 << (i % 8)) else packed[i] for i in range(row_count)]
+
+
+def read_columnar(file_path):
+    """Yield (columns, row) pairs from a columnar export file"""
+    with open(file_path, 'rb') as handle:
+        if handle.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+            raise ValueError("not a columnar export file")
+        header_len = struct.unpack('<I', handle.read(4))[0]
+        columns = json.loads(handle.read(header_len).decode('utf-8'))['columns']
+        while True:
+            row_count = struct.unpack('<I', handle.read(4))[0]
+            if row_count == 0:
+                return
+            column_values = []
+            for _ in columns:
+                code = handle.read(1)
+                length = struct.unpack('<I', handle.read(4))[0]
+                payload = zlib.decompress(handle.read(length))
+                column_values.append(_decode_column(code, payload, row_count))
+            for row in zip(*column_values):
+                yield columns, row
+
+
+class DataExporter:
+    """Streams tables and query results to files"""
+
+    def __init__(self, db_manager, batch_size=10000):
+        self.db = db_manager
+        self.batch_size = batch_size
+
+    def export_table(self, table_name, file_path, file_format=None, progress=None):
+        """Export every row of a table"""
+        sql = f"SELECT * FROM {quote_identifier(table_name)}"
+        return self.export_query(sql, file_path, file_format=file_format, progress=progress)
+
+    def export_source(self, source, file_path, file_format=None, progress=None):
+        """Export a table or view by name, or otherwise run source as a query
+
+        Names are matched exactly (ignoring case), so tables whose names
+        contain spaces are not mistaken for SQL.
+        """
+        names = {name.lower(): name for name in self.db.catalog.get_tables() + self.db.catalog.get_views()}
+        name = source.strip()
+        if name.lower() in names:
+            return self.export_table(names[name.lower()], file_path, file_format=file_format, progress=progress)
+        return self.export_query(source, file_path, file_format=file_format, progress=progress)
+
+    def export_query(self, sql, file_path, params=None, file_format=None, progress=None):
+        """Export the rows of a query
+
+        progress, if given, is called as progress(rows_exported, elapsed_seconds)
+        after every batch. Returns a summary dict with 'rows', 'seconds',
+        'bytes' and 'error' keys.
+        """
+        result = {'rows': 0, 'seconds': 0.0, 'bytes': 0, 'error': None}
+        file_format = file_format or detect_export_format(file_path)
+        if file_format not in EXPORT_FORMATS:
+            result['error'] = f"Unknown format '{file_format}'"
+            return result
+        if file_format == 'parquet' and load_pyarrow() is None:
+            result['error'] = "Parquet export requires pyarrow: pip install pyarrow"
+            return result
+
+        start = time.perf_counter()
+        stream = self._open_read_only_stream(sql, params)
+        if not isinstance(stream, ResultStream):
+            result['error'] = stream if isinstance(stream, str) else "Statement returned no rows"
+            return result
+
+        writer = getattr(self, f"_write_{file_format}")
+        try:
+            def batches():
+                while True:
+                    batch = list(islice(stream, self.batch_size))
+                    if not batch:
+                        return
+                    yield batch
+                    result['rows'] += len(batch)
+                    if progress:
+                        progress(result['rows'], time.perf_counter() - start)
+
+            writer(file_path, stream.columns, batches())
+            if stream.error:
+                result['error'] = stream.error
+            result['bytes'] = os.path.getsize(file_path)
+        except (OSError, ValueError) as e:
+            result['error'] = f"Error: {e}"
+        finally:
+            stream.close()
+            result['seconds'] = time.perf_counter() - start
+        return result
+
+    def _open_read_only_stream(self, sql, params):
+        """Run the export statement with query_only set so it cannot modify data"""
+        connection = self.db.connection
+        if not connection:
+            return "No database connected"
+        previous = connection.execute("PRAGMA query_only").fetchone()[0]
+        connection.execute("PRAGMA query_only = ON")
+        try:
+            return self.db.stream_sql(sql, params, batch_size=self.batch_size)
+        finally:
+            connection.execute(f"PRAGMA query_only = {int(previous)}")
+
+    @staticmethod
+    def _write_csv(file_path, columns, batches):
+        with open(file_path, 'w', newline='', encoding='utf-8') as handle:
+            writer = csv.writer(handle)
+            writer.writerow(columns)
+            for batch in batches:
+                writer.writerows([_plain_value(v) for v in row] for row in batch)
+
+    @staticmethod
+    def _write_jsonl(file_path, columns, batches):
+        with open(file_path, 'w', encoding='utf-8') as handle:
+            for batch in batches:
+                handle.write(''.join(
+                    json.dumps(dict(zip(columns, map(_plain_value, row)))) + '\n' for row in batch
+                ))
+
+    @staticmethod
+    def _write_columnar(file_path, columns, batches):
+        with open(file_path, 'wb') as handle:
+            header = json.dumps({'columns': columns}).encode('utf-8')
+            handle.write(COLUMNAR_MAGIC)
+            handle.write(struct.pack('<I', len(header)))
+            handle.write(header)
+            for batch in batches:
+                handle.write(struct.pack('<I', len(batch)))
+                for values in zip(*batch):
+                    code, payload = _encode_column(values)
+                    payload = zlib.compress(payload, 1)
+                    handle.write(code)
+                    handle.write(struct.pack('<I', len(payload)))
+                    handle.write(payload)
+            handle.write(struct.pack('<I', 0))
+
+    @staticmethod
+    def _write_parquet(file_path, columns, batches):
+        pyarrow = load_pyarrow()
+        writer = None
+        try:
+            for batch in batches:
+                table = pyarrow.Table.from_pydict(
+                    {name: list(values) for name, values in zip(columns, zip(*batch))}
+                )
+                if writer is None:
+                    writer = pyarrow.parquet.ParquetWriter(file_path, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+        if writer is None:
+            raise ValueError("query returned no rows")
+
+
+def format_export_summary(result):
+    """Format an export result for display"""
+    if result['error']:
+        return result['error']
+    size_kb = result['bytes'] / 1024
+    return f"Exported {format_rate(result['rows'], result['seconds'])}, {size_kb:,.1f} KB written"
@@ -0,0 +1,265 @@
+"""
+Bulk data import for Loula's SQLite Viewer
+
+Streams CSV, TSV and JSONL files into a table using executemany in a
+single transaction, so millions of rows can be loaded without building
+one INSERT per record or committing per statement.
+"""
+
+import csv
+import json
+import os
+import sqlite3
+import time
+from itertools import chain, islice
+
+from src.database.row_source import quote_identifier
+
+
+IMPORT_FORMATS = ('csv', 'tsv', 'jsonl')
+
+
+def detect_format(file_path):
+    """Guess the import format from the file extension"""
+    ext = os.path.splitext(file_path)[1].lower().lstrip('.')
+    if ext in ('tsv', 'tab'):
+        return 'tsv'
+    if ext in ('jsonl', 'ndjson', 'json'):
+        return 'jsonl'
+    return 'csv'
+
+
+def column_affinity(declared_type):
+    """Determine SQLite column affinity from a declared type"""
+    decl = (declared_type or '').upper()
+    if 'INT' in decl:
+        return 'INTEGER'
+    if 'CHAR' in decl or 'CLOB' in decl or 'TEXT' in decl:
+        return 'TEXT'
+    if 'BLOB' in decl or not decl:
+        return 'BLOB'
+    if 'REAL' in decl or 'FLOA' in decl or 'DOUB' in decl:
+        return 'REAL'
+    return 'NUMERIC'
+
+
+def convert_value(value, affinity):
+    """Convert a raw file value for the target column affinity
+
+    Empty strings become NULL, except in TEXT columns where '' is kept.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    if not isinstance(value, str):
+        return value
+    if value == '':
+        return '' if affinity == 'TEXT' else None
+    if affinity in ('INTEGER', 'NUMERIC'):
+        try:
+            return int(value)
+        except ValueError:
+            pass
+    if affinity in ('INTEGER', 'REAL', 'NUMERIC'):
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    return value
+
+
+def infer_type(values):
+    """Infer a column type from sample values"""
+    inferred = 'INTEGER'
+    seen = False
+    for value in values:
+        if value is None or value == '':
+            continue
+        seen = True
+        if isinstance(value, int):
+            continue
+        if isinstance(value, float):
+            inferred = 'REAL'
+            continue
+        if not isinstance(value, str):
+            return 'TEXT'
+        try:
+            int(value)
+            continue
+        except ValueError:
+            pass
+        try:
+            float(value)
+            inferred = 'REAL'
+        except ValueError:
+            return 'TEXT'
+    return inferred if seen else 'TEXT'
+
+
+class DataImporter:
+    """Streams delimited and JSONL files into SQLite tables"""
+
+    def __init__(self, db_manager, batch_size=10000, sample_size=1000):
+        self.db = db_manager
+        self.batch_size = batch_size
+        self.sample_size = sample_size
+
+    def _read_records(self, handle, file_format, skipped_keys=None):
+        """Return (column names, iterator of row lists) for an open file
+
+        JSONL columns come from the keys of the first sample_size
+        objects; keys first seen later are added to skipped_keys.
+        """
+        if file_format == 'jsonl':
+            objects = self._read_objects(handle)
+            sample = list(islice(objects, self.sample_size))
+            columns = []
+            for obj in sample:
+                for key in obj:
+                    if key not in columns:
+                        columns.append(key)
+            known = set(columns)
+
+            def rows():
+                for obj in chain(sample, objects):
+                    if skipped_keys is not None and not known.issuperset(obj):
+                        skipped_keys.extend(key for key in obj if key not in known and key not in skipped_keys)
+                    yield [obj.get(col) for col in columns]
+            return columns, rows()
+
+        delimiter = '\t' if file_format == 'tsv' else ','
+        reader = csv.reader(handle, delimiter=delimiter)
+        columns = next(reader, [])
+        return columns, reader
+
+    @staticmethod
+    def _read_objects(handle):
+        """Yield the JSON object on every non-empty line"""
+        for line_number, line in enumerate(handle, 1):
+            if not line.strip():
+                continue
+            try:
+                obj = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"line {line_number}: {e}")
+            if not isinstance(obj, dict):
+                raise ValueError(f"line {line_number}: expected a JSON object, got {type(obj).__name__}")
+            yield obj
+
+    def import_file(self, file_path, table_name, file_format=None, batch_size=None,
+                    fast=False, progress=None):
+        """Import a file into a table, creating the table if it does not exist
+
+        progress, if given, is called as progress(rows_imported, elapsed_seconds)
+        after every batch. Returns a summary dict with 'rows', 'seconds',
+        'created', 'skipped_keys' (JSONL keys not in the columns) and
+        'error' keys.
+        """
+        result = {'rows': 0, 'seconds': 0.0, 'created': False, 'skipped_keys': [], 'error': None}
+        connection = self.db.connection
+        if not connection:
+            result['error'] = "No database connected"
+            return result
+        if not os.path.exists(file_path):
+            result['error'] = f"File '{file_path}' does not exist"
+            return result
+
+        file_format = file_format or detect_format(file_path)
+        if file_format not in IMPORT_FORMATS:
+            result['error'] = f"Unknown format '{file_format}'"
+            return result
+        batch_size = batch_size or self.batch_size
+
+        start = time.perf_counter()
+        saved_pragmas = None
+        try:
+            with open(file_path, 'r', newline='', encoding='utf-8-sig') as handle:
+                columns, rows = self._read_records(handle, file_format, result['skipped_keys'])
+                if not columns:
+                    raise ValueError("no columns found in file")
+
+                # journal_mode cannot change inside a transaction
+                if fast:
+                    saved_pragmas = self._enable_fast_load(connection)
+                if not connection.in_transaction:
+                    connection.execute("BEGIN")
+
+                schema = self.db.get_table_schema(table_name)
+                if not schema:
+                    sample = list(islice(rows, self.sample_size))
+                    rows = chain(sample, rows)
+                    types = [infer_type(row[i] if i < len(row) else None for row in sample)
+                             for i in range(len(columns))]
+                    col_defs = ', '.join(f"{quote_identifier(col)} {col_type}"
+                                         for col, col_type in zip(columns, types))
+                    connection.execute(f"CREATE TABLE {quote_identifier(table_name)} ({col_defs})")
+                    result['created'] = True
+                    schema = self.db.get_table_schema(table_name)
+
+                # Map file columns onto table columns by name
+                table_columns = {col[1].lower(): col for col in schema}
+                mapping = []
+                unmatched = []
+                for i, col in enumerate(columns):
+                    info = table_columns.get(col.lower())
+                    if info is not None:
+                        mapping.append((i, info[1], column_affinity(info[2])))
+                    else:
+                        unmatched.append(col)
+                if unmatched:
+                    raise ValueError(f"file columns not in table '{table_name}': {', '.join(unmatched)}")
+
+                names = ', '.join(quote_identifier(name) for _, name, _ in mapping)
+                placeholders = ', '.join('?' for _ in mapping)
+                sql = f"INSERT INTO {quote_identifier(table_name)} ({names}) VALUES ({placeholders})"
+
+                while True:
+                    batch = [[convert_value(row[i] if i < len(row) else None, affinity)
+                              for i, _, affinity in mapping]
+                             for row in islice(rows, batch_size)]
+                    if not batch:
+                        break
+                    connection.executemany(sql, batch)
+                    result['rows'] += len(batch)
+                    if progress:
+                        progress(result['rows'], time.perf_counter() - start)
+                connection.commit()
+        except (sqlite3.Error, csv.Error, ValueError, OSError) as e:
+            if connection.in_transaction:
+                connection.rollback()
+            result['rows'] = 0
+            result['created'] = False
+            result['error'] = f"Error: {e}"
+        finally:
+            if saved_pragmas:
+                self._restore_pragmas(connection, saved_pragmas)
+            self.db.write_generation += 1
+            result['seconds'] = time.perf_counter() - start
+        return result
+
+    @staticmethod
+    def _enable_fast_load(connection):
+        """Relax durability for the duration of a load, returning the old settings"""
+        saved = {
+            'synchronous': connection.execute("PRAGMA synchronous").fetchone()[0],
+            'journal_mode': connection.execute("PRAGMA journal_mode").fetchone()[0],
+        }
+        connection.execute("PRAGMA synchronous = OFF")
+        connection.execute("PRAGMA journal_mode = MEMORY")
+        return saved
+
+    @staticmethod
+    def _restore_pragmas(connection, saved):
+        """Restore settings changed by _enable_fast_load"""
+        try:
+            connection.execute(f"PRAGMA journal_mode = {saved['journal_mode']}")
+            connection.execute(f"PRAGMA synchronous = {int(saved['synchronous'])}")
+        except sqlite3.Error:
+            pass
+
+
+def format_rate(rows, seconds):
+    """Format a throughput figure as rows/sec"""
+    rate = rows / seconds if seconds > 0 else 0
+    return f"{rows} rows in {seconds:.2f}s ({rate:,.0f} rows/sec)"
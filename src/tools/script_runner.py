@@ -0,0 +1,206 @@
+"""
+SQL script runner for Loula's SQLite Viewer
+
+Streams a .sql file one statement at a time, using
+sqlite3.complete_statement to find where each statement ends, and
+commits in batches of statements instead of after every one. Migration
+and seed files with hundreds of thousands of statements therefore run
+in a few transactions rather than one fsync per statement.
+"""
+
+import heapq
+import os
+import re
+import sqlite3
+import time
+
+
+SCRIPT_BATCH_SIZE = 1000
+
+# Slowest statements and failures kept for the report
+SLOWEST_KEPT = 10
+FAILURES_KEPT = 100
+
+# The runner owns the transactions; these statements in a script are skipped
+_TRANSACTION_STATEMENTS = ('BEGIN', 'COMMIT', 'END', 'ROLLBACK')
+# SQLite refuses these (or PRAGMAs such as journal_mode) inside a transaction;
+# the current batch is committed and they run on their own
+_AUTOCOMMIT_STATEMENTS = ('VACUUM', 'ATTACH', 'DETACH', 'PRAGMA')
+
+_LEADING_COMMENTS = re.compile(r"(?:\s+|--[^\n]*(?:\n|$)|/\*.*?\*/)*", re.S)
+
+
+def iter_statements(handle):
+    """Yield (line number, statement) for every complete statement in a file
+
+    Semicolons inside strings, comments and trigger bodies do not end a
+    statement: a piece only counts once complete_statement accepts it.
+    """
+    buffer = ""
+    start_line = None
+    for line_number, line in enumerate(handle, 1):
+        pieces = line.split(';')
+        for i, piece in enumerate(pieces):
+            ends_statement = i < len(pieces) - 1
+            if start_line is None and piece.strip():
+                start_line = line_number
+            buffer += piece + (';' if ends_statement else '')
+            if ends_statement and sqlite3.complete_statement(buffer):
+                statement = buffer.strip()
+                if statement.strip(';').strip():
+                    yield start_line or line_number, statement
+                buffer = ""
+                start_line = None
+    if _LEADING_COMMENTS.match(buffer).end() < len(buffer):
+        # A last statement without a semicolon (a trailing comment alone is not one)
+        yield start_line or 1, buffer.strip()
+
+
+def first_keyword(sql):
+    """The first word of a statement after any comments, upper-cased"""
+    words = sql[_LEADING_COMMENTS.match(sql).end():].split(None, 1)
+    return words[0].rstrip(';').upper() if words else ""
+
+
+def excerpt(sql, width=80):
+    """A statement on one line, cut to width characters"""
+    text = " ".join(sql.split())
+    return text if len(text) <= width else text[:width - 3] + "..."
+
+
+class ScriptRunner:
+    """Runs .sql files against the connected database in batched transactions"""
+
+    def __init__(self, db_manager, batch_size=SCRIPT_BATCH_SIZE):
+        self.db = db_manager
+        self.batch_size = batch_size
+        self.cancelled = False
+
+    def cancel(self):
+        """Stop after the current statement, keeping batches already committed"""
+        self.cancelled = True
+
+    def run_file(self, file_path, batch_size=None, stop_on_error=True, progress=None):
+        """Run every statement of a .sql file
+
+        Statements are committed every batch_size statements. VACUUM,
+        ATTACH, DETACH and PRAGMA statements commit the current batch and
+        run outside a transaction. With
+        stop_on_error the batch that failed is rolled back and the run
+        stops; otherwise each statement runs inside a savepoint so a
+        failure only undoes that statement. progress, if given, is called
+        as progress(statements, seconds) after every batch.
+
+        Returns a summary dict with 'statements', 'failed', 'skipped',
+        'rows', 'seconds', 'batches', 'slowest' [(seconds, line, sql)],
+        'failures' [(line, sql, error)], 'cancelled' and 'error'.
+        """
+        result = {'statements': 0, 'failed': 0, 'skipped': 0, 'rows': 0, 'seconds': 0.0, 'batches': 0,
+                  'slowest': [], 'failures': [], 'cancelled': False, 'error': None}
+        connection = self.db.connection
+        if not connection:
+            result['error'] = "No database connected"
+            return result
+        if not os.path.exists(file_path):
+            result['error'] = f"File '{file_path}' does not exist"
+            return result
+        batch_size = max(1, batch_size or self.batch_size)
+        self.cancelled = False
+
+        slowest = []
+        in_batch = 0
+        start = time.perf_counter()
+        try:
+            with open(file_path, 'r', encoding='utf-8-sig') as handle:
+                for line_number, sql in iter_statements(handle):
+                    if self.cancelled:
+                        result['cancelled'] = True
+                        break
+                    keyword = first_keyword(sql)
+                    if keyword in _TRANSACTION_STATEMENTS:
+                        result['skipped'] += 1
+                        continue
+                    autocommit = keyword in _AUTOCOMMIT_STATEMENTS
+                    if autocommit and connection.in_transaction:
+                        connection.commit()
+                        result['batches'] += 1
+                        in_batch = 0
+                    elif not autocommit and not connection.in_transaction:
+                        connection.execute("BEGIN")
+
+                    statement_start = time.perf_counter()
+                    error = self._execute(connection, sql, result, savepoint=not stop_on_error and not autocommit)
+                    seconds = time.perf_counter() - statement_start
+
+                    result['statements'] += 1
+                    if not autocommit:
+                        in_batch += 1
+                    entry = (seconds, line_number, excerpt(sql))
+                    if len(slowest) < SLOWEST_KEPT:
+                        heapq.heappush(slowest, entry)
+                    elif seconds > slowest[0][0]:
+                        heapq.heapreplace(slowest, entry)
+
+                    if error:
+                        result['failed'] += 1
+                        if len(result['failures']) < FAILURES_KEPT:
+                            result['failures'].append((line_number, excerpt(sql), error))
+                        if stop_on_error:
+                            if connection.in_transaction:
+                                connection.rollback()
+                            result['error'] = f"Error at line {line_number}: {error}"
+                            break
+
+                    if in_batch >= batch_size:
+                        connection.commit()
+                        result['batches'] += 1
+                        in_batch = 0
+                        if progress:
+                            progress(result['statements'], time.perf_counter() - start)
+                if connection.in_transaction:
+                    connection.commit()
+                    result['batches'] += 1
+        except (sqlite3.Error, OSError, UnicodeDecodeError) as e:
+            if connection.in_transaction:
+                connection.rollback()
+            result['error'] = f"Error: {e}"
+        finally:
+            self.db.write_generation += 1
+            result['seconds'] = time.perf_counter() - start
+            result['slowest'] = sorted(slowest, reverse=True)
+        return result
+
+    @staticmethod
+    def _execute(connection, sql, result, savepoint=False):
+        """Run one statement, returning an error message or None"""
+        if savepoint:
+            connection.execute("SAVEPOINT script_statement")
+        try:
+            cursor = connection.execute(sql)
+            if cursor.description is not None:
+                # Rows of SELECTs in a script are counted, not kept
+                result['rows'] += sum(1 for _ in cursor)
+            else:
+                result['rows'] += max(cursor.rowcount, 0)
+        except sqlite3.Error as e:
+            if savepoint:
+                connection.execute("ROLLBACK TO script_statement")
+                connection.execute("RELEASE script_statement")
+            return str(e)
+        if savepoint:
+            connection.execute("RELEASE script_statement")
+        return None
+
+
+def format_script_summary(result):
+    """One-line summary of a run_file result"""
+    rate = result['statements'] / result['seconds'] if result['seconds'] > 0 else 0
+    text = (f"{result['statements']} statements in {result['seconds']:.2f}s ({rate:,.0f} statements/sec), "
+            f"{result['batches']} transactions, {result['rows']} rows")
+    if result['failed']:
+        text += f", {result['failed']} failed"
+    if result['skipped']:
+        text += f", {result['skipped']} transaction statements skipped"
+    if result['cancelled']:
+        text += " (cancelled)"
+    return text
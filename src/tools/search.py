@@ -0,0 +1,216 @@
+"""
+Global full-text search for Loula's SQLite Viewer
+
+Builds an FTS5 index over the text columns of every table in a sidecar
+database, so "which table contains this value?" is a single indexed
+lookup instead of a LIKE scan per table. The inspected database is only
+attached read-only and never modified.
+
+Each source table gets its own FTS5 table whose rowid is the source
+rowid. Updating the index copies rows with a rowid above the last
+indexed one, which covers the common append-only case; tables whose
+rows were edited or deleted need a rebuild. WITHOUT ROWID tables and
+views are not indexed.
+"""
+
+import json
+import os
+import sqlite3
+import time
+
+from src.database.connection import connection_uri
+from src.database.row_source import quote_identifier
+from src.tools.importer import column_affinity
+
+
+SEARCH_BATCH_SIZE = 50000
+
+
+def make_match_query(text):
+    """Turn user input into an FTS5 query: every word must match, 'word*' matches a prefix"""
+    terms = []
+    for word in text.split():
+        prefix = word.endswith('*')
+        word = word.rstrip('*')
+        if word:
+            terms.append('"' + word.replace('"', '""') + '"' + ('*' if prefix else ''))
+    return ' '.join(terms)
+
+
+class SearchIndex:
+    """FTS5 index over the text columns of a database, kept in a sidecar file"""
+
+    def __init__(self, db_manager, index_path, batch_size=SEARCH_BATCH_SIZE):
+        self.db = db_manager
+        self.index_path = index_path
+        self.batch_size = batch_size
+        self.connection = None
+
+    def open(self):
+        """Open the sidecar database and attach the inspected database read-only"""
+        if self.connection:
+            return
+        directory = os.path.dirname(self.index_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # URI mode so the source can be attached with mode=ro
+        connection = sqlite3.connect(connection_uri(self.index_path), uri=True)
+        try:
+            connection.execute("CREATE TABLE IF NOT EXISTS indexed_tables ("
+                               "table_name TEXT PRIMARY KEY, fts_table TEXT, columns TEXT, max_rowid INTEGER)")
+            immutable = bool(self.db.profile.get('immutable'))
+            connection.execute("ATTACH DATABASE ? AS source",
+                               (connection_uri(self.db.db_path, read_only=True, immutable=immutable),))
+        except sqlite3.Error:
+            connection.close()
+            raise
+        self.connection = connection
+
+    def close(self):
+        """Close the sidecar database"""
+        if self.connection:
+            self.connection.close()
+            self.connection = None
+
+    def is_built(self):
+        """Check whether any table has been indexed"""
+        self.open()
+        return self.connection.execute("SELECT COUNT(*) FROM indexed_tables").fetchone()[0] > 0
+
+    def text_columns(self, table_name, include_numeric=False):
+        """Pick the columns of a table worth indexing"""
+        affinities = ('TEXT',) + (('INTEGER', 'REAL', 'NUMERIC') if include_numeric else ())
+        # Untyped columns often hold text; declared BLOB columns are skipped
+        return [col[1] for col in self.db.get_table_schema(table_name)
+                if not col[2] or column_affinity(col[2]) in affinities]
+
+    def _has_rowid(self, table_name):
+        try:
+            self.db.connection.execute(f"SELECT rowid FROM {quote_identifier(table_name)} LIMIT 0")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def build(self, tables=None, include_numeric=False, progress=None):
+        """Index the given tables (all by default) from scratch
+
+        Returns {'tables', 'rows', 'seconds', 'error'}.
+        """
+        started_at = time.perf_counter()
+        try:
+            self.open()
+            for table_name, fts_table in self.connection.execute(
+                    "SELECT table_name, fts_table FROM indexed_tables").fetchall():
+                self.connection.execute(f"DROP TABLE IF EXISTS {quote_identifier(fts_table)}")
+            self.connection.execute("DELETE FROM indexed_tables")
+            self.connection.commit()
+
+            for number, table_name in enumerate(tables or self.db.get_tables()):
+                columns = self.text_columns(table_name, include_numeric)
+                if not columns or not self._has_rowid(table_name):
+                    continue
+                fts_table = f"fts_{number}"
+                column_list = ', '.join(f"c{i}" for i in range(len(columns)))
+                self.connection.execute(
+                    f"CREATE VIRTUAL TABLE {fts_table} USING fts5({column_list}, tokenize='unicode61')"
+                )
+                self.connection.execute(
+                    "INSERT INTO indexed_tables VALUES (?, ?, ?, NULL)",
+                    (table_name, fts_table, json.dumps(columns))
+                )
+                self.connection.commit()
+        except sqlite3.Error as e:
+            return {'tables': 0, 'rows': 0, 'seconds': time.perf_counter() - started_at, 'error': f"Error: {e}"}
+        result = self.update(progress)
+        result['seconds'] = time.perf_counter() - started_at
+        return result
+
+    def update(self, progress=None):
+        """Index rows added since the last update
+
+        Returns {'tables', 'rows', 'seconds', 'error'}. progress, if given,
+        is called as progress(table_name, rows) after every batch.
+        """
+        started_at = time.perf_counter()
+        total_rows = 0
+        try:
+            self.open()
+            entries = self.connection.execute(
+                "SELECT table_name, fts_table, columns, max_rowid FROM indexed_tables"
+            ).fetchall()
+            for table_name, fts_table, columns, max_rowid in entries:
+                total_rows += self._update_table(table_name, fts_table, json.loads(columns), max_rowid, progress)
+        except sqlite3.Error as e:
+            if self.connection:
+                self.connection.rollback()
+            return {'tables': 0, 'rows': total_rows, 'seconds': time.perf_counter() - started_at,
+                    'error': f"Error: {e}"}
+        return {'tables': len(entries), 'rows': total_rows, 'seconds': time.perf_counter() - started_at,
+                'error': None}
+
+    def _update_table(self, table_name, fts_table, columns, max_rowid, progress):
+        """Copy new rows of one table into its FTS table, one rowid range per transaction
+
+        max_rowid is the last indexed rowid, or None when nothing is indexed yet.
+        """
+        source = f"source.{quote_identifier(table_name)}"
+        source_max = self.connection.execute(f"SELECT MAX(rowid) FROM {source}").fetchone()[0]
+        if max_rowid is not None and (source_max is None or source_max < max_rowid):
+            # Rows at the end were deleted; start this table over
+            self.connection.execute(f"DELETE FROM {fts_table}")
+            max_rowid = None
+
+        column_list = ', '.join(f"c{i}" for i in range(len(columns)))
+        source_columns = ', '.join(quote_identifier(name) for name in columns)
+        rows = 0
+        while source_max is not None and (max_rowid is None or max_rowid < source_max):
+            after = "" if max_rowid is None else "WHERE rowid > ?"
+            params = () if max_rowid is None else (max_rowid,)
+            batch_end = self.connection.execute(
+                f"SELECT MAX(rowid) FROM (SELECT rowid FROM {source} {after} ORDER BY rowid LIMIT ?)",
+                params + (self.batch_size,)
+            ).fetchone()[0]
+            if batch_end is None:
+                break
+            cursor = self.connection.execute(
+                f"INSERT INTO {fts_table}(rowid, {column_list}) "
+                f"SELECT rowid, {source_columns} FROM {source} {after or 'WHERE 1'} AND rowid <= ?",
+                params + (batch_end,)
+            )
+            rows += max(cursor.rowcount, 0)
+            max_rowid = batch_end
+            self.connection.execute("UPDATE indexed_tables SET max_rowid = ? WHERE table_name = ?",
+                                    (max_rowid, table_name))
+            self.connection.commit()
+            if progress:
+                progress(table_name, rows)
+        self.connection.commit()
+        return rows
+
+    def search(self, text, limit=100):
+        """Find rows matching every word of text
+
+        Returns a list of (table_name, rowid, snippet) tuples, best matches
+        first, or an error string.
+        """
+        query = make_match_query(text)
+        if not query:
+            return []
+        try:
+            self.open()
+            entries = self.connection.execute(
+                "SELECT table_name, fts_table FROM indexed_tables"
+            ).fetchall()
+            hits = []
+            for table_name, fts_table in entries:
+                cursor = self.connection.execute(
+                    f"SELECT rowid, rank, snippet({fts_table}, -1, '[', ']', '...', 8) "
+                    f"FROM {fts_table} WHERE {fts_table} MATCH ? ORDER BY rank LIMIT ?",
+                    (query, limit)
+                )
+                for rowid, rank, snippet in cursor:
+                    hits.append((rank, table_name, rowid, snippet))
+        except sqlite3.Error as e:
+            return f"Error: {e}"
+        hits.sort(key=lambda hit: hit[0])
+        return [hit[1:] for hit in hits[:limit]]
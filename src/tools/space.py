@@ -0,0 +1,195 @@
+"""
+Database space analyzer for Loula's SQLite Viewer
+
+Shows where the pages of a database file go: size, unused bytes and
+fragmentation of every table and index from the dbstat virtual table,
+plus file-level page and freelist counts (the only figures available
+when SQLite was built without dbstat). Free space can be given back to
+the file system with VACUUM, or page by page with incremental_vacuum
+on databases using auto_vacuum=INCREMENTAL.
+"""
+
+import os
+import sqlite3
+
+from src.database.stats import format_size
+
+
+AUTO_VACUUM_MODES = {0: 'none', 1: 'full', 2: 'incremental'}
+
+# Pages released per incremental_vacuum step, between progress reports
+INCREMENTAL_VACUUM_STEP = 1000
+
+# dbstat reports the schema table under its 3.33+ name
+SCHEMA_TABLE = 'sqlite_schema' if sqlite3.sqlite_version_info >= (3, 33, 0) else 'sqlite_master'
+
+
+def has_dbstat(connection):
+    """Check whether SQLite was compiled with the dbstat virtual table"""
+    try:
+        connection.execute("SELECT 1 FROM dbstat LIMIT 0")
+        return True
+    except sqlite3.Error:
+        return False
+
+
+def analyze_object(connection, name):
+    """Walk the pages of one table or index through dbstat
+
+    Fragmentation is the share of pages that do not directly follow the
+    previous page of the b-tree in the file, as sqlite3_analyzer counts it.
+    """
+    pages = size = payload = unused = cells = overflow = gaps = 0
+    previous = None
+    for pageno, pagetype, ncell, page_payload, page_unused, pgsize in connection.execute(
+            "SELECT pageno, pagetype, ncell, payload, unused, pgsize FROM dbstat WHERE name = ?", (name,)):
+        pages += 1
+        size += pgsize
+        payload += page_payload
+        unused += page_unused
+        if pagetype == 'leaf':
+            cells += ncell
+        elif pagetype == 'overflow':
+            overflow += 1
+        if previous is not None and pageno != previous + 1:
+            gaps += 1
+        previous = pageno
+    return {
+        'pages': pages,
+        'size_bytes': size,
+        'payload_bytes': payload,
+        'unused_bytes': unused,
+        'leaf_cells': cells,
+        'overflow_pages': overflow,
+        'fragmentation': gaps / (pages - 1) if pages > 1 else 0.0,
+    }
+
+
+class SpaceAnalyzer:
+    """Reports and reclaims space in the connected database file"""
+
+    def __init__(self, db_manager):
+        self.db = db_manager
+
+    def file_summary(self):
+        """Page-level figures for the whole file
+
+        Returns a dict, or an error string.
+        """
+        if not self.db.connection:
+            return "No database connected"
+        try:
+            connection = self.db.connection
+            page_size = connection.execute("PRAGMA page_size").fetchone()[0]
+            page_count = connection.execute("PRAGMA page_count").fetchone()[0]
+            freelist_count = connection.execute("PRAGMA freelist_count").fetchone()[0]
+            auto_vacuum = connection.execute("PRAGMA auto_vacuum").fetchone()[0]
+            dbstat = has_dbstat(connection)
+        except sqlite3.Error as e:
+            return f"Error: {e}"
+        try:
+            file_size = os.path.getsize(self.db.db_path)
+        except (OSError, TypeError):
+            file_size = None
+        return {
+            'page_size': page_size,
+            'page_count': page_count,
+            'freelist_count': freelist_count,
+            'free_bytes': freelist_count * page_size,
+            'file_size': file_size,
+            'auto_vacuum': AUTO_VACUUM_MODES.get(auto_vacuum, str(auto_vacuum)),
+            'dbstat': dbstat,
+        }
+
+    def object_summary(self, progress=None):
+        """Per-object space usage, largest first
+
+        Every table and index is walked on its own pooled connection (see
+        DatabaseManager.map_tables); progress is passed on to it. Returns
+        a list of dicts with 'name', 'type' and 'table' added to the
+        figures of analyze_object, or an error string.
+        """
+        if not self.db.connection:
+            return "No database connected"
+        try:
+            if not has_dbstat(self.db.connection):
+                return "Error: SQLite was built without the dbstat virtual table"
+            objects = {name: (kind, table) for name, kind, table in self.db.connection.execute(
+                "SELECT name, type, tbl_name FROM sqlite_master WHERE rootpage > 0")}
+        except sqlite3.Error as e:
+            return f"Error: {e}"
+        objects[SCHEMA_TABLE] = ('schema', SCHEMA_TABLE)
+
+        summary = []
+        for name, stats in self.db.map_tables(analyze_object, list(objects), progress).items():
+            if isinstance(stats, str):
+                stats = {'error': stats, 'size_bytes': 0}
+            kind, table = objects[name]
+            summary.append(dict(stats, name=name, type=kind, table=table))
+        summary.sort(key=lambda item: item['size_bytes'], reverse=True)
+        return summary
+
+    def vacuum_sql(self, enable_incremental=False):
+        """Statements that rebuild the file, optionally switching to incremental auto-vacuum"""
+        if enable_incremental:
+            return ["PRAGMA auto_vacuum = INCREMENTAL", "VACUUM"]
+        return ["VACUUM"]
+
+    def incremental_vacuum(self, pages=None, progress=None):
+        """Release free pages at the end of an auto_vacuum=INCREMENTAL file
+
+        Runs in steps of INCREMENTAL_VACUUM_STEP pages, committing after
+        each one and calling progress(released, total). Returns the number
+        of pages released, or an error string.
+        """
+        if not self.db.connection:
+            return "No database connected"
+        connection = self.db.connection
+        try:
+            if connection.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                return "Error: incremental vacuum needs auto_vacuum=INCREMENTAL (run a VACUUM that enables it)"
+            free = connection.execute("PRAGMA freelist_count").fetchone()[0]
+            total = free if pages is None else min(pages, free)
+            released = 0
+            while released < total:
+                step = min(INCREMENTAL_VACUUM_STEP, total - released)
+                # The pragma frees one page per step and execute() only steps it once;
+                # executescript() runs it to completion (and commits)
+                connection.executescript(f"PRAGMA incremental_vacuum({int(step)})")
+                remaining = connection.execute("PRAGMA freelist_count").fetchone()[0]
+                if remaining >= free:
+                    break
+                released += free - remaining
+                free = remaining
+                if progress:
+                    progress(released, total)
+        except sqlite3.Error as e:
+            return f"Error: {e}"
+        finally:
+            self.db.write_generation += 1
+        return released
+
+
+def format_object_line(item):
+    """One line of the space report for an object from object_summary"""
+    if item.get('error'):
+        return f"{item['name']} ({item['type']}): {item['error']}"
+    size = item['size_bytes']
+    unused = item['unused_bytes'] / size * 100 if size else 0.0
+    line = (f"{item['name']} ({item['type']}): {format_size(size)}, {item['pages']} pages, "
+            f"{unused:.0f}% unused, {item['fragmentation'] * 100:.0f}% fragmented")
+    if item['overflow_pages']:
+        line += f", {item['overflow_pages']} overflow pages"
+    return line
+
+
+def format_file_summary(summary):
+    """Lines describing the file as a whole"""
+    lines = [
+        f"File: {format_size(summary['file_size'])}, {summary['page_count']} pages of {summary['page_size']} bytes",
+        f"Free pages: {summary['freelist_count']} ({format_size(summary['free_bytes'])}), "
+        f"auto_vacuum: {summary['auto_vacuum']}",
+    ]
+    if not summary['dbstat']:
+        lines.append("dbstat is not available; per-object sizes cannot be shown")
+    return lines
@@ -3,6 +3,11 @@ SQL Tools for Loula's SQLite Viewer
 """
 
 import curses
+import sqlite3
+from src.database.database import ResultStream
+from src.database.profiler import format_plan
+from src.database.row_source import quote_identifier
+from src.database.stats import format_size
 from src.ui.ui_utils import UIUtils
 
 
@@ -23,31 +28,157 @@ class SQLTools:
         title = "SQL Query"
         stdscr.addstr(2, (w - len(title)) // 2, title, curses.A_BOLD | curses.color_pair(2))
 
-        stdscr.addstr(4, 2, "Enter SQL query:", curses.color_pair(5))
+        stdscr.addstr(4, 2, "Enter SQL query (↑↓ history):", curses.color_pair(5))
         stdscr.addstr(5, 2, ">" , curses.color_pair(4))
 
-        # Simple input handling
-        curses.echo()
-        sql = stdscr.getstr(5, 4, w - 6).decode('utf-8')
-        curses.noecho()
+        sql = self.read_sql(stdscr, 5, 4, w - 6)
 
         if sql:
-            result = self.db.execute_sql(sql)
-            stdscr.clear()
-            stdscr.addstr(0, 0, "SQL Result:", curses.A_BOLD)
-            if isinstance(result, list):
-                for i, row in enumerate(result):
-                    y = 2 + i
-                    if y >= h - 2:
-                        break
+            self.display_sql_result(stdscr, self.run_query(stdscr, sql), sql)
+
+    def read_sql(self, stdscr, y, x, width):
+        """Read a SQL statement with history navigation, recording it in the history"""
+        history = self.config.history.get_statements(self.db.db_path)
+        sql = self.ui.input_line(stdscr, y, x, width, history)
+        if sql.strip():
+            self.config.history.add(sql, self.db.db_path)
+        return sql
+
+    def run_query(self, stdscr, sql):
+        """Run a statement in the background, showing progress until it finishes
+
+        Esc or Ctrl-C cancels the query. Returns the same values as
+        DatabaseManager.stream_sql.
+        """
+        if not self.db.connection:
+            return "No database connected"
+        return self.wait_for_query(stdscr, self.db.run_in_background(sql, use_cache=True), sql)
+
+    def fetch_rows(self, stdscr, stream, count, sql=None):
+        """Fetch the next rows of a result in the background, cancellable like run_query"""
+        return self.wait_for_query(stdscr, self.db.fetch_in_background(stream, count),
+                                   sql or "Fetching more rows")
+
+    def wait_for_query(self, stdscr, query, title):
+        """Show elapsed time and VM steps of a BackgroundQuery until it finishes
+
+        Esc or Ctrl-C cancels it. Returns the query's result.
+        """
+        h, w = stdscr.getmaxyx()
+        # Short queries finish before the first progress frame is worth drawing
+        if query.wait(0.05):
+            return query.result
+
+        stdscr.clear()
+        self.ui.draw_main_title(stdscr)
+        stdscr.addstr(3, 2, title[:w - 4], curses.color_pair(5))
+        stdscr.timeout(100)
+        try:
+            while not query.is_done():
+                status = f"Running... {query.elapsed:.1f}s, {query.steps:,} VM steps"
+                if query.cancelled:
+                    status = "Cancelling..."
+                stdscr.addstr(5, 2, status.ljust(w - 4)[:w - 4], curses.color_pair(6))
+                stdscr.addstr(h - 1, 0, "Press Esc or Ctrl-C to cancel"[:w - 1], curses.color_pair(6))
+                stdscr.refresh()
+                try:
+                    key = stdscr.getch()
+                except KeyboardInterrupt:
+                    key = 3
+                if key in (27, 3) and not query.cancelled:
+                    query.cancel()
+            query.wait()
+        finally:
+            stdscr.timeout(-1)
+        return query.result
+
+    def display_sql_result(self, stdscr, result, sql=None):
+        """Show a query result one screen at a time, pulling rows lazily
+
+        The status line shows timing for the statement, and 'e' shows its
+        query plan when the SQL text is given.
+        """
+        h, w = stdscr.getmaxyx()
+        plan_hint = ", 'e' query plan" if sql else ""
+        if not isinstance(result, ResultStream):
+            profile = self.db.profiler.last
+            while True:
+                stdscr.clear()
+                stdscr.addstr(0, 0, "SQL Result:", curses.A_BOLD)
+                stdscr.addstr(2, 2, str(result)[:w - 4])
+                if profile is not None and profile.sql == sql:
+                    stdscr.addstr(h - 2, 0, f"Time: {profile.summary()}"[:w - 1], curses.color_pair(6))
+                stdscr.addstr(h - 1, 0, f"Press any key to continue{plan_hint}"[:w - 1])
+                stdscr.refresh()
+                if stdscr.getch() == ord('e') and sql:
+                    self.show_query_plan(stdscr, sql)
+                    continue
+                return
+
+        rows_per_screen = max(1, h - 4)
+        try:
+            first_row = 1
+            rows = self.fetch_rows(stdscr, result, rows_per_screen, sql)
+            while True:
+                more = result.has_more()
+
+                stdscr.clear()
+                stdscr.addstr(0, 0, "SQL Result:", curses.A_BOLD)
+                header = " | ".join(result.columns)
+                stdscr.addstr(1, 2, header[:w - 4], curses.color_pair(3))
+                for i, row in enumerate(rows):
                     row_str = " | ".join(str(cell) for cell in row)
-                    stdscr.addstr(y, 2, row_str)
-            else:
-                stdscr.addstr(2, 2, str(result))
+                    stdscr.addstr(2 + i, 2, row_str[:w - 4])
+                if result.error:
+                    stdscr.addstr(min(2 + len(rows), h - 3), 2, result.error[:w - 4], curses.color_pair(7))
+                elif not rows:
+                    stdscr.addstr(2, 2, "No rows returned")
+
+                if result.profile is not None:
+                    timing = result.profile.summary(result.rows_fetched)
+                    if more:
+                        timing += " so far"
+                    stdscr.addstr(h - 2, 0, f"Time: {timing}"[:w - 1], curses.color_pair(6))
+
+                if more:
+                    footer = f"Rows {first_row}-{result.rows_fetched}+  Space/↓ next page{plan_hint}, any other key to continue"
+                else:
+                    footer = f"Press any key to continue{plan_hint}"
+                stdscr.addstr(h - 1, 0, footer[:w - 1])
+                stdscr.refresh()
+
+                key = stdscr.getch()
+                if key == ord('e') and sql:
+                    self.show_query_plan(stdscr, sql)
+                elif more and key in (ord(' '), curses.KEY_DOWN, curses.KEY_NPAGE):
+                    first_row = result.rows_fetched + 1
+                    rows = self.fetch_rows(stdscr, result, rows_per_screen, sql)
+                else:
+                    break
+        finally:
+            result.close()
 
-            stdscr.addstr(h - 1, 0, "Press any key to continue")
-            stdscr.refresh()
-            stdscr.getch()
+    def show_query_plan(self, stdscr, sql):
+        """Show EXPLAIN QUERY PLAN for a statement as a tree"""
+        h, w = stdscr.getmaxyx()
+        plan = self.db.explain_query_plan(sql)
+        stdscr.clear()
+        self.ui.draw_main_title(stdscr)
+        title = "Query Plan"
+        stdscr.addstr(2, (w - len(title)) // 2, title, curses.A_BOLD | curses.color_pair(2))
+        if isinstance(plan, str):
+            stdscr.addstr(4, 2, plan[:w - 4], curses.color_pair(7))
+        else:
+            for i, line in enumerate(format_plan(plan)):
+                y = 4 + i
+                if y >= h - 2:
+                    break
+                # Highlight full scans and temporary sorts, the usual tuning targets
+                color = 7 if 'SCAN ' in line or 'TEMP B-TREE' in line else 5
+                stdscr.addstr(y, 2, line[:w - 4], curses.color_pair(color))
+        stdscr.addstr(h - 1, 0, "Press any key to return")
+        stdscr.refresh()
+        stdscr.getch()
 
     def insert_record_tool(self, stdscr):
         """Insert record tool"""
@@ -379,11 +510,28 @@ class SQLTools:
         self.ui.draw_main_title(stdscr)
         stdscr.addstr(2, (w - len(f"Structure of {table_name}")) // 2, f"Structure of {table_name}", curses.A_BOLD | curses.color_pair(2))
 
-        for i, (col_id, col_name, col_type, *_) in enumerate(schema):
+        lines = [(f"{col_name}: {col_type}", 5) for col_id, col_name, col_type, *_ in schema]
+
+        indexes = self.db.catalog.get_indexes(table_name)
+        if indexes:
+            lines.append(("", 5))
+            lines.append(("Indexes:", 3))
+            for index in indexes:
+                unique = " (unique)" if index[2] else ""
+                lines.append((f"  {index[1]}{unique}", 5))
+
+        foreign_keys = self.db.catalog.get_foreign_keys(table_name)
+        if foreign_keys:
+            lines.append(("", 5))
+            lines.append(("Foreign keys:", 3))
+            for fk in foreign_keys:
+                lines.append((f"  {fk[3]} -> {fk[2]}({fk[4]})", 5))
+
+        for i, (line, color) in enumerate(lines):
             y = 4 + i
             if y >= h - 2:
                 break
-            stdscr.addstr(y, 2, f"{col_name}: {col_type}", curses.color_pair(5))
+            stdscr.addstr(y, 2, line[:w - 4], curses.color_pair(color))
 
         stdscr.addstr(h - 1, 0, "Press any key to continue")
         stdscr.refresh()
@@ -398,33 +546,546 @@ class SQLTools:
         title = "Custom SQL Query"
         stdscr.addstr(2, (w - len(title)) // 2, title, curses.A_BOLD | curses.color_pair(2))
 
-        stdscr.addstr(4, 2, "Enter SQL query:", curses.color_pair(5))
+        stdscr.addstr(4, 2, "Enter SQL query (↑↓ history):", curses.color_pair(5))
+        stdscr.addstr(5, 2, ">" , curses.color_pair(4))
+
+        sql = self.read_sql(stdscr, 5, 4, w - 6)
+
+        if not sql:
+            return
+
+        try:
+            self.display_sql_result(stdscr, self.run_query(stdscr, sql), sql)
+        except Exception as e:
+            stdscr.clear()
+            stdscr.addstr(1, 2, f"Error executing SQL: {str(e)}", curses.color_pair(7))
+            stdscr.addstr(h - 1, 0, "Press any key to continue")
+            stdscr.refresh()
+            stdscr.getch()
+
+    def import_data_tool(self, stdscr):
+        """Bulk import tool for CSV/TSV/JSONL files"""
+        from src.tools.importer import DataImporter, IMPORT_FORMATS, detect_format, format_rate
+        h, w = stdscr.getmaxyx()
+        stdscr.clear()
+        self.ui.draw_main_title(stdscr)
+
+        title = "Import Data"
+        stdscr.addstr(2, (w - len(title)) // 2, title, curses.A_BOLD | curses.color_pair(2))
+
+        stdscr.addstr(4, 2, "File path (.csv, .tsv, .jsonl):", curses.color_pair(5))
         stdscr.addstr(5, 2, ">" , curses.color_pair(4))
 
         curses.echo()
-        sql = stdscr.getstr(5, 4, w - 6).decode('utf-8')
+        file_path = stdscr.getstr(5, 4, w - 6).decode('utf-8').strip()
         curses.noecho()
 
-        if not sql:
+        if not file_path:
+            return
+
+        stdscr.addstr(7, 2, "Table name (created if missing):", curses.color_pair(5))
+        stdscr.addstr(8, 2, ">" , curses.color_pair(4))
+
+        curses.echo()
+        table_name = stdscr.getstr(8, 4, w - 6).decode('utf-8').strip()
+        curses.noecho()
+
+        if not table_name:
             return
 
+        default_format = detect_format(file_path)
+        stdscr.addstr(10, 2, f"Format [{default_format}] / batch size [10000] / fast load y/n [n]:", curses.color_pair(5))
+        stdscr.addstr(11, 2, ">" , curses.color_pair(4))
+
+        curses.echo()
+        options = stdscr.getstr(11, 4, w - 6).decode('utf-8').strip().lower().split()
+        curses.noecho()
+
+        file_format = default_format
+        batch_size = None
+        fast = False
+        for option in options:
+            if option in IMPORT_FORMATS:
+                file_format = option
+            elif option.isdigit():
+                batch_size = int(option)
+            elif option in ('y', 'yes', 'fast'):
+                fast = True
+
+        def report(rows, seconds):
+            stdscr.addstr(13, 2, " " * (w - 4))
+            stdscr.addstr(13, 2, f"Importing: {format_rate(rows, seconds)}"[:w - 4], curses.color_pair(6))
+            stdscr.refresh()
+
+        report(0, 0)
+        result = DataImporter(self.db).import_file(
+            file_path, table_name, file_format=file_format,
+            batch_size=batch_size, fast=fast, progress=report
+        )
+
+        stdscr.clear()
+        if result['error']:
+            stdscr.addstr(1, 2, result['error'][:w - 4], curses.color_pair(7))
+        else:
+            created = " (table created)" if result['created'] else ""
+            message = f"Imported {format_rate(result['rows'], result['seconds'])}{created}"
+            stdscr.addstr(1, 2, message[:w - 4], curses.color_pair(3))
+            if result['skipped_keys']:
+                skipped = f"Keys not in the first rows were skipped: {', '.join(result['skipped_keys'])}"
+                stdscr.addstr(2, 2, skipped[:w - 4], curses.color_pair(7))
+
+        stdscr.addstr(h - 1, 0, "Press any key to continue")
+        stdscr.refresh()
+        stdscr.getch()
+
+    def export_data_tool(self, stdscr):
+        """Export a table or query result to CSV/JSONL/columnar files"""
+        from src.tools.exporter import DataExporter, EXPORT_FORMATS, detect_export_format, format_export_summary
+        from src.tools.importer import format_rate
+        h, w = stdscr.getmaxyx()
+        stdscr.clear()
+        self.ui.draw_main_title(stdscr)
+
+        title = "Export Data"
+        stdscr.addstr(2, (w - len(title)) // 2, title, curses.A_BOLD | curses.color_pair(2))
+
+        stdscr.addstr(4, 2, "Table name or SELECT query:", curses.color_pair(5))
+        stdscr.addstr(5, 2, ">" , curses.color_pair(4))
+
+        curses.echo()
+        source = stdscr.getstr(5, 4, w - 6).decode('utf-8').strip()
+        curses.noecho()
+
+        if not source:
+            return
+
+        stdscr.addstr(7, 2, "Output file (.csv, .jsonl, .lcol, .parquet):", curses.color_pair(5))
+        stdscr.addstr(8, 2, ">" , curses.color_pair(4))
+
+        curses.echo()
+        file_path = stdscr.getstr(8, 4, w - 6).decode('utf-8').strip()
+        curses.noecho()
+
+        if not file_path:
+            return
+
+        default_format = detect_export_format(file_path)
+        stdscr.addstr(10, 2, f"Format ({', '.join(EXPORT_FORMATS)}) [{default_format}]:", curses.color_pair(5))
+        stdscr.addstr(11, 2, ">" , curses.color_pair(4))
+
+        curses.echo()
+        file_format = stdscr.getstr(11, 4, w - 6).decode('utf-8').strip().lower() or default_format
+        curses.noecho()
+
+        def report(rows, seconds):
+            stdscr.addstr(13, 2, " " * (w - 4))
+            stdscr.addstr(13, 2, f"Exporting: {format_rate(rows, seconds)}"[:w - 4], curses.color_pair(6))
+            stdscr.refresh()
+
+        report(0, 0)
+        exporter = DataExporter(self.db)
+        result = exporter.export_source(source, file_path, file_format=file_format, progress=report)
+
+        stdscr.clear()
+        color = 7 if result['error'] else 3
+        stdscr.addstr(1, 2, format_export_summary(result)[:w - 4], curses.color_pair(color))
+        stdscr.addstr(h - 1, 0, "Press any key to continue")
+        stdscr.refresh()
+        stdscr.getch()
+
+    def global_search_tool(self, stdscr):
+        """Search every table through a full-text index kept beside the config"""
+        from src.tools.search import SearchIndex
+        h, w = stdscr.getmaxyx()
+        if not self.db.connection:
+            stdscr.clear()
+            stdscr.addstr(1, 2, "No database connected", curses.color_pair(7))
+            stdscr.addstr(h - 1, 0, "Press any key to continue")
+            stdscr.getch()
+            return
+
+        index = SearchIndex(self.db, self.config.get_search_index_path(self.db.db_path))
         try:
-            result = self.db.execute_sql(sql)
+            self.prepare_search_index(stdscr, index)
+            text = ""
+            while True:
+                stdscr.clear()
+                self.ui.draw_main_title(stdscr)
+                title = "Global Search"
+                stdscr.addstr(2, (w - len(title)) // 2, title, curses.A_BOLD | curses.color_pair(2))
+                stdscr.addstr(4, 2, "Words to find ('word*' prefix, /rebuild to reindex, empty to go back):", curses.color_pair(5))
+                stdscr.addstr(5, 2, ">", curses.color_pair(4))
+                text = self.ui.input_line(stdscr, 5, 4, w - 6).strip()
+                if not text:
+                    return
+                if text == '/rebuild':
+                    self.prepare_search_index(stdscr, index, rebuild=True)
+                    continue
+                self.show_search_hits(stdscr, text, index.search(text))
+        finally:
+            index.close()
+
+    def prepare_search_index(self, stdscr, index, rebuild=False):
+        """Build the search index on first use, otherwise add rows inserted since the last search"""
+        h, w = stdscr.getmaxyx()
+        stdscr.clear()
+        self.ui.draw_main_title(stdscr)
+
+        def report(table_name, rows):
+            stdscr.addstr(5, 2, " " * (w - 4))
+            stdscr.addstr(5, 2, f"Indexing {table_name}: {rows} rows"[:w - 4], curses.color_pair(6))
+            stdscr.refresh()
+
+        try:
+            if rebuild or not index.is_built():
+                stdscr.addstr(3, 2, "Build a search index over text columns of all tables?", curses.color_pair(5))
+                stdscr.addstr(4, 2, "y = text columns, a = all columns, any other key to cancel", curses.color_pair(6))
+                stdscr.refresh()
+                key = stdscr.getch()
+                if key not in (ord('y'), ord('a')):
+                    return
+                result = index.build(include_numeric=key == ord('a'), progress=report)
+            else:
+                stdscr.addstr(3, 2, "Updating search index...", curses.color_pair(6))
+                stdscr.refresh()
+                result = index.update(progress=report)
+        except (sqlite3.Error, OSError) as e:
+            result = {'error': f"Error: {e}"}
+
+        if result['error']:
+            stdscr.addstr(7, 2, result['error'][:w - 4], curses.color_pair(7))
+            stdscr.addstr(h - 1, 0, "Press any key to continue")
+            stdscr.getch()
+
+    def show_search_hits(self, stdscr, text, hits):
+        """List search hits; Enter opens the row"""
+        h, w = stdscr.getmaxyx()
+        selected = 0
+        top = 0
+        while True:
             stdscr.clear()
-            stdscr.addstr(0, 0, "SQL Result:", curses.A_BOLD)
-            if isinstance(result, list):
-                for i, row in enumerate(result):
-                    y = 2 + i
-                    if y >= h - 2:
-                        break
-                    row_str = " | ".join(str(cell) for cell in row)
-                    stdscr.addstr(y, 2, row_str)
+            stdscr.addstr(0, 0, f"Search: {text}"[:w - 1], curses.A_BOLD)
+            if isinstance(hits, str):
+                stdscr.addstr(2, 2, hits[:w - 4], curses.color_pair(7))
+            elif not hits:
+                stdscr.addstr(2, 2, "No matches")
             else:
-                stdscr.addstr(2, 2, str(result))
-        except Exception as e:
+                visible = max(1, h - 4)
+                top = min(max(top, selected - visible + 1), selected)
+                for i, (table_name, rowid, snippet) in enumerate(hits[top:top + visible]):
+                    line = f"{table_name} #{rowid}: {snippet}"[:w - 6]
+                    if top + i == selected:
+                        stdscr.addstr(2 + i, 2, f"> {line}", curses.A_REVERSE | curses.color_pair(4))
+                    else:
+                        stdscr.addstr(2 + i, 2, f"  {line}", curses.color_pair(5))
+                stdscr.addstr(h - 2, 0, f"{len(hits)} hits"[:w - 1], curses.color_pair(6))
+            stdscr.addstr(h - 1, 0, "↑↓ select, Enter open row, any other key for a new search"[:w - 1], curses.color_pair(6))
+            stdscr.refresh()
+
+            key = stdscr.getch()
+            if isinstance(hits, list) and hits and key == curses.KEY_UP:
+                selected = max(0, selected - 1)
+            elif isinstance(hits, list) and hits and key == curses.KEY_DOWN:
+                selected = min(len(hits) - 1, selected + 1)
+            elif isinstance(hits, list) and hits and key in (10, 13):
+                table_name, rowid, _ = hits[selected]
+                sql = f"SELECT * FROM {quote_identifier(table_name)} WHERE rowid = ?"
+                self.display_sql_result(stdscr, self.db.stream_sql(sql, [rowid]))
+            else:
+                return
+
+    def space_analyzer_tool(self, stdscr):
+        """Show which tables and indexes use the file's pages, and reclaim free space"""
+        from src.tools.space import SpaceAnalyzer, format_file_summary, format_object_line
+        h, w = stdscr.getmaxyx()
+        if not self.db.connection:
             stdscr.clear()
-            stdscr.addstr(1, 2, f"Error executing SQL: {str(e)}", curses.color_pair(7))
+            stdscr.addstr(1, 2, "No database connected", curses.color_pair(7))
+            stdscr.addstr(h - 1, 0, "Press any key to continue")
+            stdscr.getch()
+            return
+
+        analyzer = SpaceAnalyzer(self.db)
+        message = None
+        while True:
+            stdscr.clear()
+            self.ui.draw_main_title(stdscr)
+            title = "Space Analyzer"
+            stdscr.addstr(2, (w - len(title)) // 2, title, curses.A_BOLD | curses.color_pair(2))
+            stdscr.addstr(4, 2, "Analyzing...", curses.color_pair(6))
+            stdscr.refresh()
+
+            def report(done, total):
+                stdscr.addstr(4, 2, f"Analyzing... {done}/{total} tables and indexes"[:w - 4], curses.color_pair(6))
+                stdscr.refresh()
 
+            summary = analyzer.file_summary()
+            if isinstance(summary, str):
+                lines = [summary]
+            else:
+                lines = format_file_summary(summary)
+                if summary['dbstat']:
+                    objects = analyzer.object_summary(progress=report)
+                    if isinstance(objects, str):
+                        lines.append(objects)
+                    else:
+                        lines.append("")
+                        lines.extend(format_object_line(item) for item in objects)
+
+            key = self.show_space_report(stdscr, lines, message)
+            message = None
+            if key in (ord('v'), ord('a')):
+                message = self.run_vacuum(stdscr, analyzer, enable_incremental=key == ord('a'))
+            elif key == ord('i'):
+                message = self.run_incremental_vacuum(stdscr, analyzer)
+            elif key != ord('r'):
+                return
+
+    def show_space_report(self, stdscr, lines, message=None):
+        """Scroll through the space report; returns the key that closed it"""
+        h, w = stdscr.getmaxyx()
+        top = 0
+        visible = max(1, h - 7)
+        while True:
+            stdscr.clear()
+            self.ui.draw_main_title(stdscr)
+            title = "Space Analyzer"
+            stdscr.addstr(2, (w - len(title)) // 2, title, curses.A_BOLD | curses.color_pair(2))
+            for i, line in enumerate(lines[top:top + visible]):
+                color = 7 if line.startswith("Error") else 5
+                stdscr.addstr(4 + i, 2, line[:w - 4], curses.color_pair(color))
+            if message:
+                color = 7 if message.startswith("Error") else 3
+                stdscr.addstr(h - 2, 0, message[:w - 1], curses.color_pair(color))
+            stdscr.addstr(h - 1, 0, "↑↓ scroll, v VACUUM, a VACUUM + incremental auto-vacuum, "
+                                    "i incremental vacuum, r refresh, Esc back"[:w - 1], curses.color_pair(6))
+            stdscr.refresh()
+
+            key = stdscr.getch()
+            if key == curses.KEY_UP:
+                top = max(0, top - 1)
+            elif key == curses.KEY_DOWN:
+                top = max(0, min(len(lines) - visible, top + 1))
+            else:
+                return key
+
+    def confirm_write(self, stdscr, question):
+        """Ask before a write; refuses right away on read-only connections"""
+        h, w = stdscr.getmaxyx()
+        if self.db.is_read_only():
+            return False, "Database is open read-only; reconnect with a writable profile first"
+        stdscr.addstr(h - 2, 0, " " * (w - 1))
+        stdscr.addstr(h - 2, 0, f"{question} (y/n)"[:w - 1], curses.color_pair(7))
+        stdscr.refresh()
+        return stdscr.getch() in (ord('y'), ord('Y')), None
+
+    def run_vacuum(self, stdscr, analyzer, enable_incremental=False):
+        """Rebuild the file with VACUUM, showing progress; returns a status message"""
+        question = "Rebuild the whole file with VACUUM?"
+        if enable_incremental:
+            question = "Switch to auto_vacuum=INCREMENTAL and rebuild the file with VACUUM?"
+        confirmed, message = self.confirm_write(stdscr, question)
+        if not confirmed:
+            return message
+
+        before = analyzer.file_summary()
+        for sql in analyzer.vacuum_sql(enable_incremental):
+            result = self.run_query(stdscr, sql)
+            if isinstance(result, str):
+                return result
+        after = analyzer.file_summary()
+        if isinstance(before, str) or isinstance(after, str) or before['file_size'] is None:
+            return "VACUUM finished"
+        saved = before['file_size'] - (after['file_size'] or 0)
+        return f"VACUUM finished, file is {format_size(after['file_size'])} ({format_size(max(saved, 0))} released)"
+
+    def run_incremental_vacuum(self, stdscr, analyzer):
+        """Release free pages with incremental_vacuum; returns a status message"""
+        h, w = stdscr.getmaxyx()
+        confirmed, message = self.confirm_write(stdscr, "Release all free pages with incremental_vacuum?")
+        if not confirmed:
+            return message
+
+        def report(released, total):
+            stdscr.addstr(h - 2, 0, " " * (w - 1))
+            stdscr.addstr(h - 2, 0, f"Released {released}/{total} pages"[:w - 1], curses.color_pair(6))
+            stdscr.refresh()
+
+        result = analyzer.incremental_vacuum(progress=report)
+        if isinstance(result, str):
+            return result
+        return f"Released {result} free pages"
+
+    def index_advisor_tool(self, stdscr):
+        """Recommend indexes for executed statements that scan or sort whole tables"""
+        from src.tools.advisor import IndexAdvisor, format_gain
+        h, w = stdscr.getmaxyx()
+        stdscr.clear()
+        self.ui.draw_main_title(stdscr)
+        title = "Index Advisor"
+        stdscr.addstr(2, (w - len(title)) // 2, title, curses.A_BOLD | curses.color_pair(2))
+        if not self.db.connection:
+            stdscr.addstr(4, 2, "No database connected", curses.color_pair(7))
+            stdscr.addstr(h - 1, 0, "Press any key to continue")
+            stdscr.getch()
+            return
+
+        advisor = IndexAdvisor(self.db)
+        statements = advisor.collect_statements(self.config.history)
+
+        def report(done, total):
+            stdscr.addstr(4, 2, f"Checking query plans... {done}/{total}"[:w - 4], curses.color_pair(6))
+            stdscr.refresh()
+
+        recommendations = advisor.advise(statements, progress=report)
+        if isinstance(recommendations, str) or not recommendations:
+            message = recommendations or f"No index recommendations for {len(statements)} executed statements"
+            stdscr.addstr(4, 2, " " * (w - 4))
+            stdscr.addstr(4, 2, message[:w - 4], curses.color_pair(7 if isinstance(recommendations, str) else 3))
+            stdscr.addstr(h - 1, 0, "Press any key to continue")
+            stdscr.getch()
+            return
+
+        selected = 0
+        message = None
+        while True:
+            stdscr.clear()
+            self.ui.draw_main_title(stdscr)
+            stdscr.addstr(2, (w - len(title)) // 2, title, curses.A_BOLD | curses.color_pair(2))
+            stdscr.addstr(3, 2, f"{len(recommendations)} recommendations from {len(statements)} statements"[:w - 4],
+                          curses.color_pair(5))
+            visible = max(1, (h - 7) // 2)
+            top = max(0, selected - visible + 1)
+            for i, entry in enumerate(recommendations[top:top + visible]):
+                y = 5 + i * 2
+                attr = curses.A_REVERSE | curses.color_pair(4) if top + i == selected else curses.color_pair(5)
+                stdscr.addstr(y, 2, entry['sql'][:w - 4], attr)
+                count = len(entry['statements'])
+                detail = f"{', '.join(entry['reasons'])}; {count} statement{'s' if count != 1 else ''}"
+                if 'gain' in entry:
+                    detail += f"; {format_gain(entry['gain'])}"
+                stdscr.addstr(y + 1, 4, detail[:w - 6], curses.color_pair(6))
+            if message:
+                color = 7 if message.startswith("Error") or message.startswith("Database") else 3
+                stdscr.addstr(h - 2, 0, message[:w - 1], curses.color_pair(color))
+            stdscr.addstr(h - 1, 0, "↑↓ select, Enter statements, g estimate gain, c create index, Esc back"[:w - 1],
+                          curses.color_pair(6))
+            stdscr.refresh()
+
+            key = stdscr.getch()
+            message = None
+            entry = recommendations[selected]
+            if key == curses.KEY_UP:
+                selected = max(0, selected - 1)
+            elif key == curses.KEY_DOWN:
+                selected = min(len(recommendations) - 1, selected + 1)
+            elif key in (10, 13):
+                self.show_advised_statements(stdscr, entry)
+            elif key == ord('g'):
+                stdscr.addstr(h - 2, 0, "Timing statements on an in-memory sample..."[:w - 1], curses.color_pair(6))
+                stdscr.refresh()
+                entry['gain'] = advisor.estimate_gain(entry)
+            elif key == ord('c'):
+                confirmed, message = self.confirm_write(stdscr, f"Create {entry['name']}?")
+                if confirmed:
+                    result = self.db.execute_sql(entry['sql'])
+                    message = result if isinstance(result, str) else f"Created index {entry['name']}"
+            else:
+                return
+
+    def show_advised_statements(self, stdscr, entry):
+        """List the statements behind a recommendation"""
+        h, w = stdscr.getmaxyx()
+        stdscr.clear()
+        stdscr.addstr(0, 0, entry['sql'][:w - 1], curses.A_BOLD)
+        y = 2
+        for sql in entry['statements']:
+            if y >= h - 2:
+                break
+            stdscr.addstr(y, 2, " ".join(sql.split())[:w - 4], curses.color_pair(5))
+            y += 1
+        stdscr.addstr(h - 1, 0, "Press any key to return")
+        stdscr.refresh()
+        stdscr.getch()
+
+    def run_script_tool(self, stdscr):
+        """Run a .sql file statement by statement in batched transactions"""
+        from src.tools.script_runner import SCRIPT_BATCH_SIZE, ScriptRunner, format_script_summary
+        h, w = stdscr.getmaxyx()
+        stdscr.clear()
+        self.ui.draw_main_title(stdscr)
+
+        title = "Run SQL Script"
+        stdscr.addstr(2, (w - len(title)) // 2, title, curses.A_BOLD | curses.color_pair(2))
+        if not self.db.connection:
+            stdscr.addstr(4, 2, "No database connected", curses.color_pair(7))
+            stdscr.addstr(h - 1, 0, "Press any key to continue")
+            stdscr.getch()
+            return
+
+        stdscr.addstr(4, 2, "Script file (.sql):", curses.color_pair(5))
+        stdscr.addstr(5, 2, ">", curses.color_pair(4))
+        file_path = self.ui.input_line(stdscr, 5, 4, w - 6).strip()
+        if not file_path:
+            return
+
+        stdscr.addstr(7, 2, f"Statements per transaction [{SCRIPT_BATCH_SIZE}] / continue on errors y/n [n]:",
+                      curses.color_pair(5))
+        stdscr.addstr(8, 2, ">", curses.color_pair(4))
+        options = self.ui.input_line(stdscr, 8, 4, w - 6).strip().lower().split()
+        batch_size = None
+        stop_on_error = True
+        for option in options:
+            if option.isdigit():
+                batch_size = int(option)
+            elif option in ('y', 'yes', 'continue'):
+                stop_on_error = False
+
+        confirmed, message = self.confirm_write(stdscr, f"Run {file_path} against {self.db.db_name}?")
+        if not confirmed:
+            if message:
+                stdscr.addstr(10, 2, message[:w - 4], curses.color_pair(7))
+                stdscr.addstr(h - 1, 0, "Press any key to continue")
+                stdscr.getch()
+            return
+
+        runner = ScriptRunner(self.db)
+
+        def report(statements, seconds):
+            rate = statements / seconds if seconds > 0 else 0
+            stdscr.addstr(10, 2, " " * (w - 4))
+            stdscr.addstr(10, 2, f"Running: {statements} statements ({rate:,.0f}/sec)"[:w - 4], curses.color_pair(6))
+            stdscr.addstr(h - 1, 0, "Press Esc to stop after the current batch"[:w - 1], curses.color_pair(6))
+            stdscr.refresh()
+            if stdscr.getch() == 27:
+                runner.cancel()
+
+        stdscr.nodelay(True)
+        try:
+            report(0, 0)
+            result = runner.run_file(file_path, batch_size=batch_size, stop_on_error=stop_on_error, progress=report)
+        finally:
+            stdscr.nodelay(False)
+
+        stdscr.clear()
+        color = 7 if result['error'] or result['failed'] else 3
+        stdscr.addstr(1, 2, format_script_summary(result)[:w - 4], curses.color_pair(color))
+        y = 2
+        if result['error']:
+            stdscr.addstr(y, 2, result['error'][:w - 4], curses.color_pair(7))
+            y += 1
+        lines = []
+        if result['failures']:
+            lines.append(("Failures:", curses.A_BOLD))
+            lines.extend((f"  line {line}: {error} - {sql}", curses.color_pair(7))
+                         for line, sql, error in result['failures'])
+        if result['slowest']:
+            lines.append(("Slowest statements:", curses.A_BOLD))
+            lines.extend((f"  {seconds * 1000:8.2f} ms  line {line}: {sql}", curses.color_pair(5))
+                         for seconds, line, sql in result['slowest'])
+        for text, attr in lines[:max(0, h - y - 3)]:
+            y += 1
+            stdscr.addstr(y, 2, text[:w - 4], attr)
         stdscr.addstr(h - 1, 0, "Press any key to continue")
         stdscr.refresh()
         stdscr.getch()
@@ -0,0 +1,60 @@
+"""
+Damage-tracked rendering for Loula's SQLite Viewer
+
+A FrameWindow wraps a curses window. Each frame is drawn into a line
+list instead of the window; when the frame ends only the lines that
+differ from the previous frame are repainted, and the window is marked
+with noutrefresh() so several windows go out in a single doupdate().
+"""
+
+import curses
+
+
+class FrameWindow:
+    """Curses window that only repaints lines changed since the last frame"""
+
+    def __init__(self, win):
+        self.win = win
+        self._previous = None
+        self._current = {}
+
+    def begin_frame(self):
+        """Start drawing a new frame"""
+        self._current = {}
+
+    def addstr(self, y, x, text, attr=0):
+        """Queue text for line y of the current frame"""
+        self._current.setdefault(y, []).append((x, text, attr))
+
+    def end_frame(self):
+        """Repaint changed lines and stage the window for doupdate()"""
+        previous = self._previous or {}
+        h, w = self.win.getmaxyx()
+        lines = set(previous) | set(self._current)
+        for y in sorted(lines):
+            segments = self._current.get(y)
+            if self._previous is not None and previous.get(y) == segments:
+                continue
+            if y < 0 or y >= h:
+                continue
+            try:
+                self.win.move(y, 0)
+                self.win.clrtoeol()
+            except curses.error:
+                continue
+            for x, text, attr in segments or ():
+                if x >= w:
+                    continue
+                try:
+                    self.win.addstr(y, x, text[:w - x], attr)
+                except curses.error:
+                    # Writing the bottom-right cell moves the cursor off the window
+                    pass
+        self._previous = self._current
+        self.win.noutrefresh()
+
+    def invalidate(self):
+        """Force a full repaint, e.g. after another screen drew over the window"""
+        self._previous = None
+        self.win.erase()
+        self.win.touchwin()
@@ -54,6 +54,44 @@ class ConnectionScreens:
             elif key == ord('q'):
                 return None
 
+    def select_profile_screen(self, stdscr, current=None):
+        """Connection profile selection screen"""
+        h, w = stdscr.getmaxyx()
+        names = self.config.get_profile_names()
+        selected = names.index(current) if current in names else names.index(self.config.default_profile) \
+            if self.config.default_profile in names else 0
+
+        while True:
+            stdscr.clear()
+            self.ui.draw_main_title(stdscr)
+            title = "Select Connection Profile"
+            stdscr.addstr(2, (w - len(title)) // 2, title, curses.A_BOLD | curses.color_pair(2))
+
+            for i, name in enumerate(names):
+                y = 4 + i
+                if y >= h - 4:
+                    break
+                if i == selected:
+                    stdscr.addstr(y, 2, f"> {name}", curses.A_REVERSE | curses.color_pair(4))
+                else:
+                    stdscr.addstr(y, 2, f"  {name}", curses.color_pair(5))
+
+            settings = self.config.get_profile_settings(names[selected])
+            details = ", ".join(f"{key}={value}" for key, value in settings.items()) or "SQLite defaults"
+            stdscr.addstr(h - 3, 2, details[:w - 4], curses.color_pair(3))
+            stdscr.addstr(h - 1, 0, "Use ↑↓ to select profile, Enter to confirm, 'q' to cancel", curses.color_pair(6))
+            stdscr.refresh()
+
+            key = stdscr.getch()
+            if key == curses.KEY_UP:
+                selected = (selected - 1) % len(names)
+            elif key == curses.KEY_DOWN:
+                selected = (selected + 1) % len(names)
+            elif key == 10 or key == 13:  # Enter
+                return names[selected]
+            elif key == ord('q') or key == 27:
+                return None
+
     def connection_screen(self, stdscr):
         """Database connection screen"""
         h, w = stdscr.getmaxyx()
@@ -117,14 +155,14 @@ class ConnectionScreens:
                 y = 4 + i
                 if y >= h - 2:
                     break
-                name = db['name']
+                name = f"{db['name']} [{self.config.get_database_profile_name(db)}]"
                 color = db.get('color', 3)
                 if i == selected:
                     stdscr.addstr(y, 2, f"> {name}", curses.A_REVERSE | curses.color_pair(4))
                 else:
                     stdscr.addstr(y, 2, f"  {name}", curses.color_pair(color))
 
-            stdscr.addstr(h - 1, 0, "Use ↑↓ to select, Enter to connect, 'd' to delete, Escape to cancel", curses.color_pair(6))
+            stdscr.addstr(h - 1, 0, "Use ↑↓ to select, Enter to connect, 'p' profile, 'd' to delete, Escape to cancel", curses.color_pair(6))
             stdscr.refresh()
 
             key = stdscr.getch()
@@ -134,7 +172,7 @@ class ConnectionScreens:
                 selected = (selected + 1) % len(saved_dbs)
             elif key == 10 or key == 13:  # Enter
                 db = saved_dbs[selected]
-                if self.db.connect(db['path'], db['name']):
+                if self.db.connect(db['path'], db['name'], self.config.get_connection_profile(db)):
                     self.config.set_last_connected(db)
                     self.ui.db_color = db.get('color', 3)  # Update the database color
                     stdscr.clear()
@@ -143,6 +181,11 @@ class ConnectionScreens:
                     stdscr.refresh()
                     stdscr.getch()
                     return
+            elif key == ord('p'):  # Change connection profile
+                db = saved_dbs[selected]
+                profile_name = self.select_profile_screen(stdscr, self.config.get_database_profile_name(db))
+                if profile_name:
+                    self.config.set_database_profile(db['path'], profile_name)
             elif key == ord('d'):  # Delete
                 self.config.remove_saved_database(saved_dbs[selected]['path'])
                 saved_dbs = self.config.get_saved_databases()
@@ -195,9 +238,14 @@ class ConnectionScreens:
         if color is None:
             return
 
+        # Select connection profile
+        profile_name = self.select_profile_screen(stdscr)
+        if profile_name is None:
+            return
+
         # Connect
-        if self.db.connect(path, name):
-            db_info = {'path': path, 'name': name, 'color': color}
+        if self.db.connect(path, name, self.config.get_profile_settings(profile_name)):
+            db_info = {'path': path, 'name': name, 'color': color, 'profile': profile_name}
             self.config.add_saved_database(db_info)
             self.config.set_last_connected(db_info)
             self.ui.db_color = color  # Update the database color
@@ -3,6 +3,12 @@ Table Browser for Loula's SQLite Viewer
 """
 
 import curses
+import sqlite3
+from src.database.blob_reader import HEX_BYTES_PER_LINE, ValueReader, hex_dump_line
+from src.database.row_source import describe_query, parse_filter, parse_sort
+from src.database.stats import file_signature, format_size
+from .render import FrameWindow
+from .table_format import MAX_COLUMN_WIDTH, cell_text
 from .ui_utils import UIUtils
 
 
@@ -33,9 +39,9 @@ class TableBrowser:
         left_width = max(20, w // 4)
         right_width = w - left_width - 1
 
-        # Create windows starting from line 2
-        left_win = curses.newwin(h - 2, left_width, 2, 0)
-        right_win = curses.newwin(h - 2, right_width, 2, left_width + 1)
+        # Create windows starting from line 2; only lines that change between frames are repainted
+        left_win = FrameWindow(curses.newwin(h - 2, left_width, 2, 0))
+        right_win = FrameWindow(curses.newwin(h - 2, right_width, 2, left_width + 1))
 
         # Get tables
         tables = self.db.get_tables()
@@ -43,52 +49,127 @@ class TableBrowser:
             return
 
         selected_table = 0
+        list_top = 0  # First table shown in the scrolling list
+        list_height = max(1, h - 12)  # Leave space for statistics and instructions
+        table_filter = ""  # Type-to-filter text for the table list
         table_page = 0
+        column_offset = 0  # First scrollable column shown in the right panel
+        column_widths = {}  # Column name -> width measured on screen, for the selected table
+        measured_page = None  # (page rows, column names) already measured into column_widths
+        row_filters = []  # (column, operator, value) conditions run by SQLite
+        row_sort = None  # (column, descending) or None for storage order
+        message = None  # Error from the last filter/sort prompt
         selected_row = 0  # Track selected row in the current table
         rows_per_page = h - 8  # Leave space for headers and instructions (adjusted for title)
         table_selected = False  # Track if a table has been selected
+        row_source = None  # Windowed row source for the selected table
+
+        # Where we were the last time this database was browsed
+        session = self.config.get_session(self.db.db_path)
+        saved_view = session.get('view') or {}  # Table view restored when its table is opened again
+        restore = None  # Saved view to apply once the row source exists
+        saved_stats = session.get('stats') or {}
+        if saved_stats.get('signature') == file_signature(self.db.db_path):
+            self.db.table_stats.seed(saved_stats.get('tables') or {})
+        if session.get('table') in tables:
+            selected_table = tables.index(session['table'])
 
         while True:
-            # Clear windows
-            left_win.clear()
-            right_win.clear()
+            # Start new frames
+            left_win.begin_frame()
+            right_win.begin_frame()
 
             # Draw left panel (table list)
             left_win.addstr(0, 0, "=" * left_width, curses.color_pair(1))
-            left_win.addstr(1, 1, "Tables", curses.A_BOLD | curses.color_pair(2))
-
-            for i, table in enumerate(tables):
-                if i >= h - 6:  # Leave space for instructions (adjusted for title)
-                    break
-                y = 2 + i  # Start table list right after the title
+            if table_filter:
+                list_title = f"Filter: {table_filter}_ ({len(tables)})"
+            else:
+                list_title = f"Tables ({len(tables)})"
+            left_win.addstr(1, 1, list_title[:left_width - 2], curses.A_BOLD | curses.color_pair(2))
+
+            # Only the visible slice of the table list is drawn; scroll to keep the selection in view
+            if selected_table < list_top:
+                list_top = selected_table
+            elif selected_table >= list_top + list_height:
+                list_top = selected_table - list_height + 1
+            for i in range(list_top, min(len(tables), list_top + list_height)):
+                y = 2 + i - list_top  # Start table list right after the title
                 if i == selected_table:
-                    left_win.addstr(y, 1, f"> {table}", curses.A_REVERSE | curses.color_pair(4))
+                    left_win.addstr(y, 1, f"> {tables[i]}", curses.A_REVERSE | curses.color_pair(4))
                 else:
-                    left_win.addstr(y, 1, f"  {table}", curses.color_pair(5))
+                    left_win.addstr(y, 1, f"  {tables[i]}", curses.color_pair(5))
+
+            # Statistics for the highlighted table, computed in the background
+            if tables:
+                stats = self.db.get_table_stats(tables[selected_table])
+                self.draw_table_stats(left_win, h - 9, left_width, stats)
+            else:
+                stats = None
+                left_win.addstr(3, 1, "No matching tables", curses.color_pair(7))
 
-            left_win.addstr(h - 4, 1, "↑↓ select table" if not table_selected else "Table selected", curses.color_pair(6))
+            left_win.addstr(h - 4, 1, "↑↓ select, type to filter" if not table_selected else "Table selected", curses.color_pair(6))
             left_win.addstr(h - 3, 1, "Enter select" if not table_selected else "Esc back", curses.color_pair(6))
 
             # Draw right panel (table data)
             if table_selected:
                 current_table = tables[selected_table]
-                data = self.db.get_table_data(current_table, limit=1000)  # Get more data for pagination
+                schema = self.db.get_table_schema(current_table)
+                if row_source is None or row_source.table_name != current_table:
+                    # Long TEXT/BLOB values are cut in SQL; the grid never needs more than a column width
+                    row_source = self.db.get_row_source(current_table, rows_per_page,
+                                                        preview_length=MAX_COLUMN_WIDTH * 2)
+                    column_widths.clear()
+                    if restore:
+                        column_widths.update(restore.get('column_widths') or {})
+                row_source.set_query(row_filters, row_sort)
+                if restore:
+                    # Reopen the saved page with one keyset query from its anchor
+                    if table_page and (restore.get('page_size') != rows_per_page
+                                       or not row_source.seed_anchor(table_page, restore.get('anchor'))):
+                        table_page = 0
+                        selected_row = 0
+                    restore = None
+
+                # Only the columns that fit are fetched; widths measured on screen refine the window
+                for _ in range(3):
+                    visible_schema, column_offset, scroll_columns = self.column_window(
+                        schema, column_offset, right_width, column_widths)
+                    row_source.set_columns([col[1] for col in visible_schema] or None)
+                    page_data = row_source.get_page(table_page)
+                    # The row source returns the same list until the page is refetched
+                    names = tuple(col[1] for col in visible_schema)
+                    if measured_page is not None and measured_page[0] is page_data and measured_page[1] == names:
+                        break
+                    measured = dict(zip(names, self.ui.table_formatter.column_widths(page_data, visible_schema)))
+                    measured_page = (page_data, names)
+                    if all(column_widths.get(name) == width for name, width in measured.items()):
+                        break
+                    column_widths.update(measured)
 
                 right_win.addstr(0, 0, "=" * right_width, curses.color_pair(1))
                 title = f"{current_table} (Page {table_page + 1})"
-                right_win.addstr(1, 1, title, curses.A_BOLD | curses.color_pair(2))
-
-                if data:
-                    # Calculate pagination
+                shown_columns = len(visible_schema) - (len(schema) - scroll_columns)
+                if shown_columns < scroll_columns:
+                    title += f" Columns {column_offset + 1}-{column_offset + shown_columns} of {scroll_columns}"
+                right_win.addstr(1, 1, title[:right_width - 2], curses.A_BOLD | curses.color_pair(2))
+
+                # Active filter/sort, and a warning when no index supports it
+                if message or row_source.error:
+                    right_win.addstr(2, 1, (message or row_source.error)[:right_width - 2], curses.color_pair(7))
+                elif row_filters or row_sort:
+                    query_info = describe_query(row_filters, row_sort)
+                    hints = row_source.plan_hints()
+                    if hints:
+                        query_info += " - " + "; ".join(hints)
+                    right_win.addstr(2, 1, query_info[:right_width - 2], curses.color_pair(7 if hints else 6))
+
+                if page_data:
                     start_idx = table_page * rows_per_page
-                    end_idx = start_idx + rows_per_page
-                    page_data = data[start_idx:end_idx]
 
                     # Display column headers and data with proper formatting
                     try:
-                        schema = self.db.get_table_schema(current_table)
-                        if schema:
-                            headers, formatted_rows = self.ui.format_table_data(page_data, schema, right_width)
+                        if visible_schema:
+                            headers, formatted_rows = self.ui.format_table_data(page_data, visible_schema, right_width)
 
                             # Display headers
                             right_win.addstr(3, 1, headers[0], curses.A_BOLD | curses.color_pair(3))
@@ -126,21 +207,26 @@ class TableBrowser:
                         data_start_y = 3
                         right_win.addstr(3, 1, f"Error displaying table: {str(e)}", curses.color_pair(7))
 
-                    # Pagination info
-                    total_pages = (len(data) + rows_per_page - 1) // rows_per_page
-                    if total_pages > 1:
-                        page_info = f"Page {table_page + 1}/{total_pages} ({len(data)} rows)"
+                    # Pagination info, using the cached row count once it is known (unfiltered only)
+                    total_records = stats['row_count'] if stats and not row_filters else None
+                    has_next = row_source.has_page(table_page + 1)
+                    if total_records is not None:
+                        total_pages = (total_records + rows_per_page - 1) // rows_per_page
+                        if total_pages > 1:
+                            page_info = f"Page {table_page + 1}/{total_pages} ({total_records} rows)"
+                            right_win.addstr(h - 5, 1, page_info, curses.color_pair(6))
+                    elif table_page > 0 or has_next:
+                        page_info = f"Page {table_page + 1}" + (" (more →)" if has_next else " (last)")
                         right_win.addstr(h - 5, 1, page_info, curses.color_pair(6))
 
                     # Record position indicator
-                    current_page_data = data[start_idx:end_idx]
-                    if current_page_data:
-                        total_records = len(data)
-                        current_record_global = start_idx + selected_row + 1  # 1-based indexing
-                        record_info = f"Record {current_record_global} of {total_records}"
-                        right_win.addstr(h - 6, 1, record_info, curses.color_pair(6))
+                    current_record_global = start_idx + selected_row + 1  # 1-based indexing
+                    record_info = f"Record {current_record_global}"
+                    if total_records is not None:
+                        record_info += f" of {total_records}"
+                    right_win.addstr(h - 6, 1, record_info, curses.color_pair(6))
                 else:
-                    right_win.addstr(3, 1, "No data in table", curses.color_pair(7))
+                    right_win.addstr(3, 1, "No matching rows" if row_filters else "No data in table", curses.color_pair(7))
             else:
                 # No table selected - show instructions
                 right_win.addstr(0, 0, "=" * right_width, curses.color_pair(1))
@@ -150,104 +236,354 @@ class TableBrowser:
 
             # Instructions
             if table_selected:
-                right_win.addstr(h - 4, 1, "↑↓ select record", curses.color_pair(6))
-                right_win.addstr(h - 3, 1, "Enter view, ←→ page, Esc back", curses.color_pair(6))
+                right_win.addstr(h - 4, 1, "↑↓ select record, f filter, s sort, x clear", curses.color_pair(6))
+                right_win.addstr(h - 3, 1, "Enter view, ←→ page, < > columns, Esc back", curses.color_pair(6))
             else:
                 right_win.addstr(h - 4, 1, "Select a table first", curses.color_pair(6))
                 right_win.addstr(h - 3, 1, "", curses.color_pair(6))
 
-            # Refresh windows
-            left_win.refresh()
-            right_win.refresh()
+            # Repaint changed lines of both windows in one terminal update
+            left_win.end_frame()
+            right_win.end_frame()
+            curses.doupdate()
+
+            # Poll while statistics are being computed so they appear without a keypress
+            stdscr.timeout(200 if self.db.table_stats.is_pending() else -1)
 
             # Handle input
             key = stdscr.getch()
 
             if not table_selected:
                 # Table selection mode
-                if key == curses.KEY_UP:
+                if key == curses.KEY_UP and tables:
                     selected_table = (selected_table - 1) % len(tables)
-                elif key == curses.KEY_DOWN:
+                elif key == curses.KEY_DOWN and tables:
                     selected_table = (selected_table + 1) % len(tables)
-                elif key == 10 or key == 13:  # Enter - select table
+                elif key == curses.KEY_PPAGE:
+                    selected_table = max(0, selected_table - list_height)
+                elif key == curses.KEY_NPAGE:
+                    selected_table = max(0, min(len(tables) - 1, selected_table + list_height))
+                elif key == curses.KEY_HOME:
+                    selected_table = 0
+                elif key == curses.KEY_END:
+                    selected_table = max(0, len(tables) - 1)
+                elif (key == 10 or key == 13) and tables:  # Enter - select table
                     table_selected = True
                     selected_row = 0
                     table_page = 0
-                elif key == 27:  # Escape
-                    break
+                    if saved_view.get('table') == tables[selected_table]:
+                        restore = saved_view
+                        row_filters, row_sort = self.saved_query(restore, tables[selected_table])
+                        table_page = max(0, restore.get('page', 0))
+                        selected_row = max(0, min(restore.get('row', 0), rows_per_page - 1))
+                        column_offset = max(0, restore.get('column_offset', 0))
+                elif key == 27:  # Escape - clear the filter first, then leave
+                    if not table_filter:
+                        break
+                    table_filter = ""
+                    tables, selected_table = self.filter_tables(tables, selected_table, table_filter)
+                elif key in (curses.KEY_BACKSPACE, 127, 8):
+                    if table_filter:
+                        table_filter = table_filter[:-1]
+                        tables, selected_table = self.filter_tables(tables, selected_table, table_filter)
+                elif 32 <= key < 127:  # Printable character - narrow the list
+                    table_filter += chr(key)
+                    tables, selected_table = self.filter_tables(tables, selected_table, table_filter)
             else:
                 # Record selection mode
                 if key == curses.KEY_UP:
                     if selected_row > 0:
                         selected_row -= 1
                 elif key == curses.KEY_DOWN:
-                    current_page_data = data[start_idx:end_idx] if data else []
-                    if selected_row < len(current_page_data) - 1:
+                    if selected_row < len(page_data) - 1:
                         selected_row += 1
                 elif key == curses.KEY_LEFT:
                     if table_page > 0:
                         table_page -= 1
                         selected_row = 0  # Reset row selection when changing pages
                 elif key == curses.KEY_RIGHT:
-                    data = self.db.get_table_data(current_table, limit=1000)
-                    max_pages = (len(data) + rows_per_page - 1) // rows_per_page
-                    if table_page < max_pages - 1:
+                    if row_source.has_page(table_page + 1):
                         table_page += 1
                         selected_row = 0  # Reset row selection when changing pages
+                elif key in (ord('<'), ord(','), curses.KEY_SLEFT):  # Scroll columns left
+                    column_offset = max(0, column_offset - 1)
+                elif key in (ord('>'), ord('.'), curses.KEY_SRIGHT):  # Scroll columns right
+                    column_offset += 1
+                elif key in (ord('f'), ord('s')):  # Filter or sort, run by SQLite
+                    column_names = [col[1] for col in schema]
+                    # Nested screens read keys blocking; the stats poll is re-armed at the top of the loop
+                    stdscr.timeout(-1)
+                    if key == ord('f'):
+                        text = self.prompt(stdscr, "Filter (column op value): ")
+                    else:
+                        text = self.prompt(stdscr, "Sort by (column [desc]): ")
+                    left_win.invalidate()
+                    right_win.invalidate()
+                    message = None
+                    try:
+                        if text and key == ord('f'):
+                            row_filters = row_filters + [parse_filter(text, column_names)]
+                        elif text:
+                            row_sort = parse_sort(text, column_names)
+                        table_page = 0
+                        selected_row = 0
+                    except ValueError as e:
+                        message = f"Error: {e}"
+                elif key == ord('x'):  # Clear filter and sort
+                    row_filters = []
+                    row_sort = None
+                    message = None
+                    table_page = 0
+                    selected_row = 0
                 elif key == 10 or key == 13:  # Enter - view selected record
-                    if data:
-                        current_page_data = data[start_idx:end_idx]
-                        if selected_row < len(current_page_data):
-                            selected_record = current_page_data[selected_row]
-                            self.view_record_details(stdscr, current_table, selected_record, schema)
+                    if selected_row < len(page_data):
+                        stdscr.timeout(-1)
+                        self.view_record_details(stdscr, row_source, table_page, selected_row, schema)
+                        left_win.invalidate()
+                        right_win.invalidate()
                 elif key == 27:  # Escape - back to table selection
+                    anchor = row_source.page_anchor(table_page)
+                    if anchor and any(isinstance(value, bytes) for value in anchor):
+                        anchor = None  # Not stored; the saved page then reopens at the start
+                    saved_view = {
+                        'table': current_table,
+                        'filters': [list(condition) for condition in row_filters],
+                        'sort': list(row_sort) if row_sort else None,
+                        'page': table_page,
+                        'page_size': rows_per_page,
+                        'anchor': list(anchor) if anchor else None,
+                        'row': selected_row,
+                        'column_offset': column_offset,
+                        'column_widths': dict(column_widths),
+                    }
                     table_selected = False
                     selected_row = 0
-
-    def view_record_details(self, stdscr, table_name, record, schema):
-        """View detailed information for a selected record"""
+                    column_offset = 0
+                    row_filters = []
+                    row_sort = None
+                    message = None
+                    row_source = None
+
+        stdscr.timeout(-1)
+        self.config.save_session(self.db.db_path, {
+            'table': tables[selected_table] if tables else session.get('table'),
+            'view': saved_view,
+            'stats': {'signature': file_signature(self.db.db_path), 'tables': self.db.table_stats.snapshot()},
+        })
+
+    def saved_query(self, view, table_name):
+        """Filters and sort of a saved view, dropping any that no longer fit the table"""
+        column_names = [col[1] for col in self.db.get_table_schema(table_name)]
+        try:
+            filters = [(column, operator, value) for column, operator, value in view.get('filters') or []
+                       if column in column_names]
+            sort = view.get('sort')
+            sort = (sort[0], bool(sort[1])) if sort and sort[0] in column_names else None
+        except (TypeError, ValueError):
+            return [], None
+        return filters, sort
+
+    def prompt(self, stdscr, label):
+        """Read a line of input on the bottom row of the screen"""
         h, w = stdscr.getmaxyx()
-        stdscr.clear()
-        self.ui.draw_main_title(stdscr)
-
-        # Title
-        title = f"Record Details - {table_name}"
-        stdscr.addstr(2, (w - len(title)) // 2, title, curses.A_BOLD | curses.color_pair(2))
+        stdscr.addstr(h - 1, 0, " " * (w - 1))
+        stdscr.addstr(h - 1, 0, label, curses.A_BOLD | curses.color_pair(6))
+        return self.ui.input_line(stdscr, h - 1, len(label), w - len(label) - 1).strip()
+
+    def column_window(self, schema, column_offset, width, column_widths):
+        """Pick the columns that fit in the data panel
+
+        Primary key columns stay frozen on the left; the remaining columns
+        scroll horizontally starting at column_offset. Columns not measured
+        yet (missing from column_widths) are assumed to be MAX_COLUMN_WIDTH
+        wide. Returns the visible schema rows, the clamped offset and the
+        number of scrollable columns.
+        """
+        frozen = sorted((col for col in schema if col[5]), key=lambda col: col[5])
+        scrollable = [col for col in schema if not col[5]]
+        if not scrollable:
+            return list(schema), 0, 0
+
+        def needed(col):
+            return column_widths.get(col[1], MAX_COLUMN_WIDTH) + 3  # Plus the separator
+
+        free_width = width - 4 - sum(needed(col) for col in frozen)
+        column_offset = max(0, min(column_offset, len(scrollable) - 1))
+        visible = []
+        for col in scrollable[column_offset:]:
+            free_width -= needed(col)
+            if free_width < 0 and visible:
+                break
+            visible.append(col)
+        return frozen + visible, column_offset, len(scrollable)
+
+    def filter_tables(self, tables, selected_table, table_filter):
+        """Apply a table list filter, keeping the highlighted table selected if it still matches"""
+        current = tables[selected_table] if tables else None
+        tables = self.db.get_tables(table_filter)
+        try:
+            return tables, tables.index(current)
+        except ValueError:
+            return tables, 0
+
+    def draw_table_stats(self, win, y, width, stats):
+        """Draw the statistics block for the highlighted table"""
+        win.addstr(y, 1, "─" * (width - 2), curses.color_pair(1))
+        if stats is None:
+            lines = ["Rows: counting..."]
+        else:
+            rows = stats['row_count']
+            lines = [f"Rows: {rows if rows is not None else '?'}"]
+            if stats['page_count']:
+                lines.append(f"Size: {format_size(stats['size_bytes'])} ({stats['page_count']} pages)")
+            indexes = stats['indexes']
+            lines.append(f"Indexes: {', '.join(indexes) if indexes else 'none'}")
+        for i, line in enumerate(lines):
+            win.addstr(y + 1 + i, 1, line[:width - 2], curses.color_pair(3))
+
+    def view_record_details(self, stdscr, row_source, page_index, row_index, schema):
+        """View detailed information for a selected record
+
+        Only a preview of each TEXT/BLOB value is loaded; Enter opens a
+        pager that reads the selected value in chunks.
+        """
+        h, w = stdscr.getmaxyx()
+        record = row_source.get_record_preview(page_index, row_index, preview_length=w)
+        selected = 0
+        top = 0
 
-        if schema and record:
-            # Display each field with its value
-            for i, (col_info, value) in enumerate(zip(schema, record)):
+        while True:
+            stdscr.clear()
+            self.ui.draw_main_title(stdscr)
+
+            # Title
+            title = f"Record Details - {row_source.table_name}"
+            stdscr.addstr(2, (w - len(title)) // 2, title, curses.A_BOLD | curses.color_pair(2))
+
+            if not record:
+                stdscr.addstr(4, 2, "Record no longer exists", curses.color_pair(7))
+                stdscr.addstr(h - 1, 0, "Press any key to return to table browser", curses.color_pair(6))
+                stdscr.refresh()
+                stdscr.getch()
+                return
+
+            # Display each field with its value, two lines per field
+            visible = max(1, (h - 6) // 2)
+            top = min(max(top, selected - visible + 1), selected)
+            for i, (col_info, (value, value_type, length)) in enumerate(zip(schema[top:top + visible], record[top:top + visible])):
                 y = 4 + i * 2
-                if y >= h - 2:
-                    break
-
-                # Field name
                 field_name = col_info[1]  # Column name
                 field_type = col_info[2]  # Column type
-                stdscr.addstr(y, 2, f"{field_name} ({field_type}):", curses.A_BOLD | curses.color_pair(3))
+                size = ""
+                if value_type == 'blob':
+                    size = f" [BLOB, {format_size(length)}]"
+                elif value_type == 'text' and length > w - 10:
+                    size = f" [TEXT, {length} chars]"
+                attr = curses.A_REVERSE if top + i == selected else curses.A_BOLD
+                stdscr.addstr(y, 2, f"{field_name} ({field_type}):{size}"[:w - 4], attr | curses.color_pair(3))
+
+                # Field value, from the preview only
+                if value_type == 'blob':
+                    shown = value[:(w - 13) // 3]
+                    value_str = ' '.join(f"{byte:02x}" for byte in shown)
+                    if length > len(shown):
+                        value_str += " ..."
+                else:
+                    value_str = cell_text(value, w - 10)
+                    if len(value_str) > w - 10 or (value_type == 'text' and length > len(value_str)):
+                        value_str = value_str[:w - 13] + "..."
+                stdscr.addstr(y + 1, 4, value_str, curses.color_pair(5))
 
-                # Field value
-                value_str = str(value) if value is not None else "NULL"
-                # Handle long values by wrapping or truncating
-                if len(value_str) > w - 10:
-                    value_str = value_str[:w-13] + "..."
+            # Instructions
+            stdscr.addstr(h - 1, 0, "↑↓ select field, Enter view value, Esc to return"[:w - 1], curses.color_pair(6))
+            stdscr.refresh()
 
-                stdscr.addstr(y + 1, 4, value_str, curses.color_pair(5))
-        else:
-            # Fallback for records without schema
-            stdscr.addstr(4, 2, "Record data:", curses.A_BOLD | curses.color_pair(3))
-            for i, value in enumerate(record):
-                y = 6 + i
-                if y >= h - 2:
-                    break
-                value_str = str(value) if value is not None else "NULL"
-                if len(value_str) > w - 10:
-                    value_str = value_str[:w-13] + "..."
-                stdscr.addstr(y, 4, f"Field {i+1}: {value_str}", curses.color_pair(5))
-
-        # Instructions
-        stdscr.addstr(h - 1, 0, "Press any key to return to table browser", curses.color_pair(6))
-        stdscr.refresh()
+            key = stdscr.getch()
+            if key == -1:
+                continue  # A timed-out read is not a keypress
+            elif key == curses.KEY_UP:
+                selected = max(0, selected - 1)
+            elif key == curses.KEY_DOWN:
+                selected = min(len(record) - 1, selected + 1)
+            elif key == curses.KEY_PPAGE:
+                selected = max(0, selected - visible)
+            elif key == curses.KEY_NPAGE:
+                selected = min(len(record) - 1, selected + visible)
+            elif key == curses.KEY_HOME:
+                selected = 0
+            elif key == curses.KEY_END:
+                selected = len(record) - 1
+            elif key in (10, 13):
+                if record[selected][1] in ('text', 'blob'):
+                    self.view_value(stdscr, row_source, page_index, row_index, schema[selected][1])
+            else:
+                return
+
+    def view_value(self, stdscr, row_source, page_index, row_index, column):
+        """Page through one TEXT/BLOB value, reading only the part on screen
 
-        # Wait for user input
-        stdscr.getch()
+        BLOBs are shown as a hex dump, TEXT as wrapped lines.
+        """
+        h, w = stdscr.getmaxyx()
+        try:
+            row_clause, params, rowid = row_source.row_clause(page_index, row_index)
+            reader = ValueReader.open(self.db.connection, row_source.table_name, column, row_clause, params, rowid)
+        except (sqlite3.Error, ValueError) as e:
+            stdscr.clear()
+            stdscr.addstr(1, 2, f"Error: {e}"[:w - 4], curses.color_pair(7))
+            stdscr.addstr(h - 1, 0, "Press any key to continue")
+            stdscr.getch()
+            return
+
+        hex_mode = reader.value_type == 'blob'
+        # Bytes per screen line: a hex dump row, or a line of text
+        line_bytes = HEX_BYTES_PER_LINE if hex_mode else max(1, w - 4)
+        lines_per_screen = max(1, h - 4)
+        last_offset = max(0, (reader.length - 1) // line_bytes * line_bytes)
+        offset = 0
+        try:
+            while True:
+                chunk = reader.read(offset, line_bytes * lines_per_screen)
+                stdscr.clear()
+                header = f"{row_source.table_name}.{column} - {reader.value_type.upper()}, {format_size(reader.length)}"
+                stdscr.addstr(0, 0, header[:w - 1], curses.A_BOLD | curses.color_pair(2))
+                for i in range(lines_per_screen):
+                    data = chunk[i * line_bytes:(i + 1) * line_bytes]
+                    if not data:
+                        break
+                    if hex_mode:
+                        line = hex_dump_line(offset + i * line_bytes, data)
+                    else:
+                        line = data.decode('utf-8', errors='replace').replace('\n', ' ').replace('\t', ' ')
+                    stdscr.addstr(2 + i, 2, line[:w - 4], curses.color_pair(5))
+                end = min(reader.length, offset + len(chunk))
+                status = f"Bytes {offset}-{end} of {reader.length}"
+                stdscr.addstr(h - 2, 0, status[:w - 1], curses.color_pair(6))
+                stdscr.addstr(h - 1, 0, "↑↓ line, PgUp/PgDn page, Home/End, 'h' hex/text, Esc to return"[:w - 1],
+                              curses.color_pair(6))
+                stdscr.refresh()
+
+                key = stdscr.getch()
+                if key == -1:
+                    continue  # A timed-out read is not a keypress
+                elif key == curses.KEY_DOWN:
+                    offset = min(last_offset, offset + line_bytes)
+                elif key == curses.KEY_UP:
+                    offset = max(0, offset - line_bytes)
+                elif key in (curses.KEY_NPAGE, ord(' ')):
+                    offset = min(last_offset, offset + line_bytes * lines_per_screen)
+                elif key == curses.KEY_PPAGE:
+                    offset = max(0, offset - line_bytes * lines_per_screen)
+                elif key == curses.KEY_HOME:
+                    offset = 0
+                elif key == curses.KEY_END:
+                    offset = max(0, last_offset - line_bytes * (lines_per_screen - 1))
+                elif key == ord('h'):
+                    hex_mode = not hex_mode
+                    line_bytes = HEX_BYTES_PER_LINE if hex_mode else max(1, w - 4)
+                    last_offset = max(0, (reader.length - 1) // line_bytes * line_bytes)
+                    offset = offset // line_bytes * line_bytes
+                else:
+                    return
+        finally:
+            reader.close()
@@ -0,0 +1,108 @@
+"""
+Table formatting for Loula's SQLite Viewer
+
+Turns pages of rows into aligned text lines. Every cell is converted to
+text once, cut to the column width limit before any expensive work, and
+finished pages are cached so redrawing an unchanged page costs nothing.
+"""
+
+from collections import OrderedDict
+
+
+MAX_COLUMN_WIDTH = 20  # Max chars per column
+MIN_COLUMN_WIDTH = 5
+
+
+def cell_text(value, limit):
+    """Text of a cell value, at most limit + 1 characters long
+
+    Only a prefix of long TEXT and BLOB values is converted, so the
+    extra character just tells the caller the value was truncated.
+    """
+    if value is None:
+        return "NULL"
+    if isinstance(value, str):
+        text = value[:limit + 1]
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        text = str(bytes(value[:limit + 1]))
+    else:
+        text = str(value)[:limit + 1]
+    # Keep each row on a single screen line
+    if '\n' in text or '\r' in text or '\t' in text:
+        text = text.replace('\r', ' ').replace('\n', ' ').replace('\t', ' ')
+    return text
+
+
+def fit(text, width):
+    """Pad or truncate text to exactly width characters"""
+    if len(text) > width:
+        return text[:width - 3] + "..."
+    return text.ljust(width)
+
+
+class TableFormatter:
+    """Formats pages of rows, caching the result of recently shown pages"""
+
+    def __init__(self, max_cached_pages=8, max_column_width=MAX_COLUMN_WIDTH):
+        self.max_cached_pages = max_cached_pages
+        self.max_column_width = max_column_width
+        self._pages = OrderedDict()
+
+    def format(self, data, schema, max_width):
+        """Return ([header, separator], rows) for a page of rows"""
+        if not data or not schema:
+            return [], []
+
+        col_names = [col[1] for col in schema]
+        # Entries keep a reference to their page, so an id is not reused while cached
+        key = (id(data), len(data), max_width, tuple(col_names))
+        entry = self._pages.get(key)
+        if entry is not None and entry[0] is data:
+            self._pages.move_to_end(key)
+            return entry[1]
+
+        result = self._format(data, col_names, max_width)
+        self._pages[key] = (data, result)
+        while len(self._pages) > self.max_cached_pages:
+            self._pages.popitem(last=False)
+        return result
+
+    def column_widths(self, data, schema):
+        """Return the natural width of each column of a page, before any shrinking"""
+        return self._measure(data, [col[1] for col in schema])[0]
+
+    def _measure(self, data, col_names):
+        """Convert every cell once, returning (widths, cell texts)"""
+        limit = self.max_column_width
+        column_count = len(col_names)
+        col_widths = [min(len(name), limit) for name in col_names]
+        cells = []
+        for row in data:
+            texts = [cell_text(value, limit) for value in row[:column_count]]
+            for i, text in enumerate(texts):
+                if len(text) > col_widths[i]:
+                    col_widths[i] = min(len(text), limit)
+            cells.append(texts)
+        return col_widths, cells
+
+    def _format(self, data, col_names, max_width):
+        # Convert every visible cell once and measure it in the same pass
+        col_widths, cells = self._measure(data, col_names)
+
+        # If too wide, reduce column widths proportionally
+        total_width = sum(col_widths) + len(col_widths) * 3 + 1
+        if total_width > max_width - 4:
+            scale_factor = (max_width - 4 - len(col_widths) * 3 - 1) / sum(col_widths)
+            col_widths = [max(MIN_COLUMN_WIDTH, int(width * scale_factor)) for width in col_widths]
+
+        formatted_header = " │ ".join(fit(name, width) for name, width in zip(col_names, col_widths))
+        formatted_separator = "─┼─".join("─" * width for width in col_widths)
+        formatted_rows = [
+            " │ ".join(fit(text, width) for text, width in zip(texts, col_widths))
+            for texts in cells
+        ]
+        return [formatted_header, formatted_separator], formatted_rows
+
+    def clear(self):
+        """Drop all cached pages"""
+        self._pages.clear()
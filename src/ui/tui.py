@@ -3,13 +3,9 @@ Text User Interface for Loula's SQLite Viewer
 """
 
 import curses
-import os
 from src.database.database import DatabaseManager
 from src.config.config import ConfigManager
 from src.ui.ui_utils import UIUtils
-from src.ui.screens import ConnectionScreens
-from src.tools.tools import SQLTools
-from src.ui.table_browser import TableBrowser
 
 
 class SQLiteTUI:
@@ -24,16 +20,41 @@ class SQLiteTUI:
 
         # Load last connected database
         last_db = self.config.get_last_connected()
-        if last_db and os.path.exists(last_db.get('path', '')):
-            self.db.connect(last_db['path'], last_db['name'])
+        if last_db and last_db.get('path'):
+            # Opened on a worker thread so the main menu is usable right away
+            self.db.connect_in_background(last_db['path'], last_db['name'],
+                                          self.config.get_connection_profile(last_db), require_file=True)
             self.db_color = last_db.get('color', 3)
 
         # Initialize utility classes
         self.ui = UIUtils(self.db, self.config)
         self.ui.db_color = self.db_color
-        self.connection_screens = ConnectionScreens(self.db, self.config, self.ui)
-        self.sql_tools = SQLTools(self.db, self.config, self.ui)
-        self.table_browser = TableBrowser(self.db, self.config, self.ui)
+        # Screens are imported and created on first use to keep startup fast
+        self._connection_screens = None
+        self._sql_tools = None
+        self._table_browser = None
+        self.on_first_frame = None
+
+    @property
+    def connection_screens(self):
+        if self._connection_screens is None:
+            from src.ui.screens import ConnectionScreens
+            self._connection_screens = ConnectionScreens(self.db, self.config, self.ui)
+        return self._connection_screens
+
+    @property
+    def sql_tools(self):
+        if self._sql_tools is None:
+            from src.tools.tools import SQLTools
+            self._sql_tools = SQLTools(self.db, self.config, self.ui)
+        return self._sql_tools
+
+    @property
+    def table_browser(self):
+        if self._table_browser is None:
+            from src.ui.table_browser import TableBrowser
+            self._table_browser = TableBrowser(self.db, self.config, self.ui)
+        return self._table_browser
 
     def save_database_to_list(self):
         """Add current database to saved databases"""
@@ -62,8 +83,8 @@ class SQLiteTUI:
     def split_screen_table_browser(self, stdscr):
         return self.table_browser.split_screen_table_browser(stdscr)
 
-    def view_record_details(self, stdscr, table_name, record, schema):
-        return self.table_browser.view_record_details(stdscr, table_name, record, schema)
+    def view_record_details(self, stdscr, row_source, page_index, row_index, schema):
+        return self.table_browser.view_record_details(stdscr, row_source, page_index, row_index, schema)
 
     # SQL Tools methods - delegate to SQLTools
     def sql_input_screen(self, stdscr):
@@ -90,6 +111,24 @@ class SQLiteTUI:
     def custom_sql_tool(self, stdscr):
         return self.sql_tools.custom_sql_tool(stdscr)
 
+    def import_data_tool(self, stdscr):
+        return self.sql_tools.import_data_tool(stdscr)
+
+    def export_data_tool(self, stdscr):
+        return self.sql_tools.export_data_tool(stdscr)
+
+    def global_search_tool(self, stdscr):
+        return self.sql_tools.global_search_tool(stdscr)
+
+    def space_analyzer_tool(self, stdscr):
+        return self.sql_tools.space_analyzer_tool(stdscr)
+
+    def index_advisor_tool(self, stdscr):
+        return self.sql_tools.index_advisor_tool(stdscr)
+
+    def run_script_tool(self, stdscr):
+        return self.sql_tools.run_script_tool(stdscr)
+
     # UI methods - delegate to UIUtils
     def draw_menu(self, stdscr, title, options, selected):
         return self.ui.draw_menu(stdscr, title, options, selected)
@@ -107,6 +146,12 @@ class SQLiteTUI:
             "Drop Table",
             "View Table Structure",
             "Custom SQL Query",
+            "Run SQL Script",
+            "Import Data",
+            "Export Data",
+            "Global Search",
+            "Space Analyzer",
+            "Index Advisor",
             "Back to Main Menu"
         ]
         selected = 0
@@ -133,10 +178,46 @@ class SQLiteTUI:
                 elif selected == 6:
                     self.custom_sql_tool(stdscr)
                 elif selected == 7:
+                    self.run_script_tool(stdscr)
+                elif selected == 8:
+                    self.import_data_tool(stdscr)
+                elif selected == 9:
+                    self.export_data_tool(stdscr)
+                elif selected == 10:
+                    self.global_search_tool(stdscr)
+                elif selected == 11:
+                    self.space_analyzer_tool(stdscr)
+                elif selected == 12:
+                    self.index_advisor_tool(stdscr)
+                elif selected == 13:
                     break
             elif key == ord('q'):
                 break
 
+    def wait_for_connect(self, stdscr, redraw):
+        """Wait for the startup reconnect before using the database
+
+        Returns False if Escape was pressed while waiting.
+        """
+        if not self.db.is_connecting():
+            return True
+        h, w = stdscr.getmaxyx()
+        stdscr.timeout(100)
+        try:
+            while self.db.is_connecting():
+                redraw()
+                try:
+                    stdscr.addstr(h - 2, 2, "Waiting for the database to open... (Esc to go back)"[:w - 3],
+                                  curses.color_pair(6))
+                except curses.error:
+                    pass
+                stdscr.refresh()
+                if stdscr.getch() == 27:
+                    return False
+        finally:
+            stdscr.timeout(-1)
+        return True
+
     def read_me_screen(self, stdscr):
         """Display the Read Me/Developer Note screen"""
         h, w = stdscr.getmaxyx()
@@ -261,14 +342,26 @@ class SQLiteTUI:
         while True:
             if self.current_menu == 'main':
                 self.draw_menu(stdscr, "Main Menu", main_options, self.selected_option)
+                if self.on_first_frame:
+                    # Startup profiling: report the first frame, optionally exit
+                    on_first_frame, self.on_first_frame = self.on_first_frame, None
+                    if on_first_frame():
+                        break
 
+                # Redraw while reconnecting so the status line stays current
+                stdscr.timeout(100 if self.db.is_connecting() else -1)
                 key = stdscr.getch()
+                stdscr.timeout(-1)
 
                 if key == curses.KEY_UP:
                     self.selected_option = (self.selected_option - 1) % len(main_options)
                 elif key == curses.KEY_DOWN:
                     self.selected_option = (self.selected_option + 1) % len(main_options)
                 elif key == 10 or key == 13:  # Enter
+                    if self.selected_option in (0, 1, 2, 3, 5):
+                        if not self.wait_for_connect(stdscr, lambda: self.draw_menu(
+                                stdscr, "Main Menu", main_options, self.selected_option)):
+                            continue
                     if self.selected_option == 0:  # Connect
                         self.connection_screen(stdscr)
                     elif self.selected_option == 1:  # Browse Tables
@@ -286,6 +379,11 @@ class SQLiteTUI:
                 elif key == ord('q'):
                     break
 
-    def run(self):
-        """Run the TUI"""
+    def run(self, on_first_frame=None):
+        """Run the TUI
+
+        on_first_frame, if given, is called once the main menu has been
+        drawn for the first time; the TUI exits if it returns True.
+        """
+        self.on_first_frame = on_first_frame
         curses.wrapper(self.main_loop)
@@ -3,6 +3,7 @@ UI Utility functions for Loula's SQLite Viewer
 """
 
 import curses
+from .table_format import TableFormatter
 
 
 class UIUtils:
@@ -12,6 +13,7 @@ class UIUtils:
         self.db = db_manager
         self.config = config_manager
         self.db_color = 3  # Default green
+        self.table_formatter = TableFormatter()
 
     def draw_main_title(self, stdscr, title_color=None):
         """Draw the main 'Loula's SQLite Viewer' title"""
@@ -60,7 +62,20 @@ class UIUtils:
                 pass
 
         # Draw database status
-        if self.db.db_name:
+        pending = self.db.pending_connect
+        if pending is not None and pending.state in ('connecting', 'loading', 'failed'):
+            if pending.state == 'failed':
+                status = f"Database: None - could not reopen {pending.db_name}: {pending.error}"
+                color = 7
+            else:
+                step = "opening" if pending.state == 'connecting' else "loading tables"
+                status = f"Database: {pending.db_name} ({step}... {pending.elapsed:.1f}s)"
+                color = 6
+            try:
+                stdscr.addstr(3, 0, status[:w - 1], curses.color_pair(color))
+            except curses.error:
+                pass
+        elif self.db.db_name:
             status = f"Database: {self.db.db_name}"
             try:
                 stdscr.addstr(3, 0, status, curses.color_pair(getattr(self, 'db_color', 3)))
@@ -89,62 +104,65 @@ class UIUtils:
 
         stdscr.refresh()
 
+    def input_line(self, stdscr, y, x, width, history=None):
+        """Read a line of text with editing and ↑↓ history navigation
+
+        Returns the entered text, or an empty string if Escape was pressed.
+        Input is read blocking, whatever timeout the caller had set.
+        """
+        stdscr.timeout(-1)
+        history = list(history or [])
+        history_index = len(history)
+        text = ""
+        cursor = 0
+        curses.curs_set(1)
+        try:
+            while True:
+                # Scroll horizontally so the cursor stays visible
+                offset = max(0, cursor - width + 1)
+                try:
+                    stdscr.addstr(y, x, text[offset:offset + width].ljust(width))
+                    stdscr.move(y, x + cursor - offset)
+                except curses.error:
+                    pass
+                stdscr.refresh()
+
+                try:
+                    key = stdscr.get_wch()
+                except curses.error:
+                    continue  # No input
+                if key in ('\n', '\r') or key == curses.KEY_ENTER:
+                    return text
+                elif key == '\x1b':
+                    return ""
+                elif key in (curses.KEY_BACKSPACE, '\x7f', '\x08'):
+                    if cursor > 0:
+                        text = text[:cursor - 1] + text[cursor:]
+                        cursor -= 1
+                elif key == curses.KEY_DC:
+                    text = text[:cursor] + text[cursor + 1:]
+                elif key == curses.KEY_LEFT:
+                    cursor = max(0, cursor - 1)
+                elif key == curses.KEY_RIGHT:
+                    cursor = min(len(text), cursor + 1)
+                elif key in (curses.KEY_HOME, '\x01'):
+                    cursor = 0
+                elif key in (curses.KEY_END, '\x05'):
+                    cursor = len(text)
+                elif key == curses.KEY_UP and history_index > 0:
+                    history_index -= 1
+                    text = history[history_index]
+                    cursor = len(text)
+                elif key == curses.KEY_DOWN and history_index < len(history):
+                    history_index += 1
+                    text = history[history_index] if history_index < len(history) else ""
+                    cursor = len(text)
+                elif isinstance(key, str) and key.isprintable():
+                    text = text[:cursor] + key + text[cursor:]
+                    cursor += 1
+        finally:
+            curses.curs_set(0)
+
     def format_table_data(self, data, schema, max_width):
         """Format table data with proper column alignment"""
-        if not data or not schema:
-            return [], []
-
-        # Get column names
-        col_names = [col[1] for col in schema]
-
-        # Calculate column widths
-        col_widths = []
-        for i, col_name in enumerate(col_names):
-            # Start with column name length
-            max_col_width = len(col_name)
-
-            # Check data in this column
-            for row in data:
-                if i < len(row):
-                    cell_content = str(row[i]) if row[i] is not None else "NULL"
-                    max_col_width = max(max_col_width, len(cell_content))
-
-            # Limit column width to prevent overflow
-            max_col_width = min(max_col_width, 20)  # Max 20 chars per column
-            col_widths.append(max_col_width)
-
-        # Calculate total width needed
-        total_width = sum(col_widths) + len(col_widths) * 3 + 1  # spaces between columns
-
-        # If too wide, reduce column widths proportionally
-        if total_width > max_width - 4:
-            scale_factor = (max_width - 4 - len(col_widths) * 3 - 1) / sum(col_widths)
-            col_widths = [max(5, int(width * scale_factor)) for width in col_widths]
-
-        # Format header
-        header_parts = []
-        for i, col_name in enumerate(col_names):
-            width = col_widths[i]
-            if len(col_name) > width:
-                col_name = col_name[:width-3] + "..."
-            header_parts.append(f"{col_name:<{width}}")
-
-        formatted_header = " │ ".join(header_parts)
-        formatted_separator = "─┼─".join("─" * width for width in col_widths)
-
-        # Format data rows
-        formatted_rows = []
-        for row in data:
-            row_parts = []
-            for i, cell in enumerate(row):
-                if i >= len(col_widths):
-                    break
-                width = col_widths[i]
-                cell_content = str(cell) if cell is not None else "NULL"
-                if len(cell_content) > width:
-                    cell_content = cell_content[:width-3] + "..."
-                row_parts.append(f"{cell_content:<{width}}")
-
-            formatted_rows.append(" │ ".join(row_parts))
-
-        return [formatted_header, formatted_separator], formatted_rows
+        return self.table_formatter.format(data, schema, max_width)